@@ -0,0 +1,90 @@
+"""
+Simulação em lote do PacManNJ usando vários processos.
+
+Cada jogo é identificado por uma seed: o labirinto (gerar_labirinto) e os
+fantasmas (Game._create_entities) são criados dentro do processo trabalhador,
+e só uma linha compacta de inteiros volta para o processo principal.
+Com cache, cada processo usa um MazePool sem thread de fundo: seeds repetidas
+entre execuções leem o labirinto pronto do banco em vez de gerá-lo de novo.
+"""
+import sys
+import time
+import multiprocessing
+from array import array
+from simulation import HeadlessGame, DEFAULT_MAX_TICKS
+from maze_pool import MazePool
+
+GHOST_TYPES = ("blinky", "pinky", "inky", "clyde")
+COLUMNS = ("seed", "score", "ticks", "pellets", "win") + tuple(f"deaths_{t}" for t in GHOST_TYPES)
+
+_pool = None  # Um MazePool por processo trabalhador
+
+def _pool_do_processo(cache):
+    global _pool
+    if _pool is None: _pool = MazePool(db_path=cache, background=False)
+    return _pool
+
+def simular_jogo(seed, max_ticks=DEFAULT_MAX_TICKS, cache=None):
+    """Roda um jogo headless com a seed dada e retorna uma linha da tabela."""
+    maze_pool = _pool_do_processo(cache) if cache else None
+    r = HeadlessGame(seed=seed, maze_pool=maze_pool).run(max_ticks)
+    deaths = r["deaths_by_ghost"]
+    return (seed, r["score"], r["ticks"], r["pellets_eaten"], int(r["win"])) + tuple(deaths.get(t, 0) for t in GHOST_TYPES)
+
+def _simular_jogo_args(args):
+    return simular_jogo(*args)
+
+class ResultTable:
+    """Tabela de resultados em colunas (array de inteiros), compacta para dezenas de milhares de jogos."""
+    def __init__(self):
+        self.columns = {name: array('i') for name in COLUMNS}
+
+    def __len__(self):
+        return len(self.columns["seed"])
+
+    def append(self, row):
+        for name, value in zip(COLUMNS, row):
+            self.columns[name].append(value)
+
+    def column(self, name):
+        return self.columns[name]
+
+    def summary(self):
+        """Média, mínimo e máximo de cada coluna (exceto a seed)."""
+        n = len(self)
+        if n == 0: return {}
+        return {
+            name: {"mean": sum(col) / n, "min": min(col), "max": max(col)}
+            for name, col in self.columns.items() if name != "seed"
+        }
+
+    def to_csv(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(",".join(COLUMNS) + "\n")
+            for row in zip(*(self.columns[name] for name in COLUMNS)):
+                f.write(",".join(map(str, row)) + "\n")
+
+def simular_lote(n_jogos, seed=0, processos=None, max_ticks=DEFAULT_MAX_TICKS, chunksize=16, cache=None):
+    """
+    Distribui n_jogos (seeds seed..seed+n_jogos-1) num pool de processos.
+    cache: caminho do banco com o cache de labirintos (None para gerar todos).
+    """
+    tabela = ResultTable()
+    tarefas = [(seed + i, max_ticks, cache) for i in range(n_jogos)]
+    if processos == 1:
+        for args in tarefas: tabela.append(_simular_jogo_args(args))
+        return tabela
+    with multiprocessing.Pool(processos) as pool:
+        for row in pool.imap(_simular_jogo_args, tarefas, chunksize):
+            tabela.append(row)
+    return tabela
+
+if __name__ == "__main__":
+    n_jogos = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    processos = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    t0 = time.perf_counter()
+    tabela = simular_lote(n_jogos, processos=processos)
+    elapsed = time.perf_counter() - t0
+    print(f"{len(tabela)} jogos em {elapsed:.2f}s ({len(tabela) / elapsed:.1f} jogos/s)")
+    for name, stats in tabela.summary().items():
+        print(f"  {name:<14} média={stats['mean']:9.2f}  min={stats['min']:6d}  max={stats['max']:6d}")
@@ -0,0 +1,504 @@
+"""
+Benchmarks de desempenho do PacManNJ.
+
+Uso: python benchmarks.py [nome ...]   (sem argumentos roda todos)
+"""
+import sys
+import time
+import random
+from config import FPS
+from maze_generator import gerar_labirinto
+from simulation import HeadlessGame
+from pathfinding import bfs_next_step, find_nearest_walkable_global, DistanceField, NearestWalkableMap, GhostPlanner
+
+def _celulas_caminhaveis(maze):
+    return [(x, y) for y, row in enumerate(maze) for x, cell in enumerate(row) if cell != 1]
+
+def bench_pathfinding(n_labirintos=20, consultas=2000, seed=0):
+    """Compara bfs_next_step com DistanceField.next_step em vários labirintos gerados."""
+    random.seed(seed)
+    tempo_bfs = tempo_montagem = tempo_consulta = 0.0
+    total = 0
+    for _ in range(n_labirintos):
+        maze = gerar_labirinto()
+        livres = _celulas_caminhaveis(maze)
+        pares = [(random.choice(livres), random.choice(livres)) for _ in range(consultas)]
+
+        t0 = time.perf_counter()
+        passos_bfs = [bfs_next_step(a, b, maze) for a, b in pares]
+        tempo_bfs += time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        field = DistanceField(maze, precalcular=True)
+        tempo_montagem += time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        passos_field = [field.next_step(a, b) for a, b in pares]
+        tempo_consulta += time.perf_counter() - t0
+
+        # Empates podem escolher passos diferentes; ambos precisam estar num caminho mínimo.
+        for (a, b), p1, p2 in zip(pares, passos_bfs, passos_field):
+            d = field.distance(a, b)
+            for dx, dy in (p1, p2):
+                if a != b:
+                    assert field.distance((a[0] + dx, a[1] + dy), b) == d - 1, "Passo fora do caminho mínimo"
+        total += len(pares)
+
+    print(f"Pathfinding: {n_labirintos} labirintos, {total} consultas")
+    print(f"  bfs_next_step:         {tempo_bfs * 1e6 / total:8.2f} us/consulta")
+    print(f"  DistanceField (montar): {tempo_montagem * 1e3 / n_labirintos:8.2f} ms/labirinto")
+    print(f"  DistanceField (consulta): {tempo_consulta * 1e6 / total:6.2f} us/consulta")
+    print(f"  Ganho nas consultas: {tempo_bfs / max(tempo_consulta, 1e-9):.1f}x")
+
+def bench_nearest_walkable(n_labirintos=20, consultas=5000, seed=0):
+    """Compara find_nearest_walkable_global com NearestWalkableMap (inclui alvos fora do labirinto)."""
+    random.seed(seed)
+    tempo_busca = tempo_montagem = tempo_consulta = 0.0
+    total = 0
+    for _ in range(n_labirintos):
+        maze = gerar_labirinto()
+        rows, cols = len(maze), len(maze[0])
+        pontos = [(random.randint(-cols, 2 * cols), random.randint(-rows, 2 * rows)) for _ in range(consultas)]
+
+        t0 = time.perf_counter()
+        esperado = [find_nearest_walkable_global(maze, x, y) for x, y in pontos]
+        tempo_busca += time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        mapa = NearestWalkableMap(maze)
+        tempo_montagem += time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        obtido = [mapa.lookup(x, y) for x, y in pontos]
+        tempo_consulta += time.perf_counter() - t0
+
+        assert obtido == esperado, "NearestWalkableMap divergiu da busca"
+        total += len(pontos)
+
+    print(f"Célula caminhável mais próxima: {n_labirintos} labirintos, {total} consultas")
+    print(f"  find_nearest_walkable_global: {tempo_busca * 1e6 / total:8.2f} us/consulta")
+    print(f"  NearestWalkableMap (montar):  {tempo_montagem * 1e3 / n_labirintos:8.2f} ms/labirinto")
+    print(f"  NearestWalkableMap (consulta): {tempo_consulta * 1e6 / total:7.2f} us/consulta")
+
+def bench_headless(n_jogos=10, seed=0):
+    """Mede ticks por segundo da simulação sem tela com o controlador guloso."""
+    random.seed(seed)
+    ticks = tempo = 0
+    for _ in range(n_jogos):
+        r = HeadlessGame().run()
+        ticks += r["ticks"]; tempo += r["ticks"] / r["tps"]
+    print(f"Simulação headless: {n_jogos} jogos, {ticks} ticks")
+    print(f"  {ticks / tempo:,.0f} ticks/s ({ticks / tempo / FPS:,.0f}x tempo real a {FPS} FPS)")
+
+def bench_render(quadros=600, seed=0):
+    """Compara o redesenho parcial (dirty rects) com o redesenho completo de cada quadro."""
+    import os
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    from game import Game
+    from simulation import GreedyController
+    for modo in ("parcial", "completo"):
+        game = Game("bench", seed=seed)
+        game._save_score = lambda: None
+        controller = GreedyController()
+        for _ in range(quadros):
+            t0 = time.perf_counter()
+            direction = controller(game)
+            if direction is not None: game._apply_input(direction)
+            game._update()
+            if modo == "completo": game._surface_clean = False
+            game._draw()
+            game.frame_times.record(time.perf_counter() - t0)
+        print(f"Desenho {modo:<8}: {game.frame_times.report()}")
+
+def bench_particles(n_particulas=5000, ticks=60, seed=0):
+    """
+    Compara a lista de dicts antiga com o ParticleSystem (emissão, atualização e
+    leitura das posições, que o desenho faz a cada quadro).
+    """
+    import math
+    from particles import ParticleSystem
+    rng = random.Random(seed)
+    iniciais = []
+    for _ in range(n_particulas):
+        angle, speed = rng.uniform(0, 2 * math.pi), rng.uniform(1, 5)
+        iniciais.append((300.0, 300.0, math.cos(angle) * speed, math.sin(angle) * speed, rng.randint(15, 90)))
+
+    t0 = time.perf_counter()
+    dicts = [{'x': x, 'y': y, 'dx': dx, 'dy': dy, 'life': life} for x, y, dx, dy, life in iniciais]
+    for _ in range(ticks):
+        for p in dicts:
+            p['x'] += p['dx']; p['y'] += p['dy']; p['life'] -= 1
+        dicts = [p for p in dicts if p['life'] > 0]
+        posicoes = [(p['x'], p['y']) for p in dicts]
+    tempo_dicts = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    system = ParticleSystem(capacity=n_particulas)
+    for p in iniciais: system.emit(*p)
+    for _ in range(ticks):
+        system.update()
+        posicoes = system.positions()
+    tempo_arrays = time.perf_counter() - t0
+
+    assert len(dicts) == len(system), "Os dois sistemas deveriam manter as mesmas partículas"
+    print(f"Partículas: {n_particulas} partículas, {ticks} ticks")
+    print(f"  lista de dicts: {tempo_dicts * 1e3 / ticks:7.3f} ms/tick")
+    print(f"  ParticleSystem: {tempo_arrays * 1e3 / ticks:7.3f} ms/tick")
+
+def bench_maze(tamanhos=(31, 101, 251, 501, 1001), repeticoes=3, seed=0):
+    """Mede o tempo de gerar_labirinto em função do tamanho da grade."""
+    print("Geração de labirinto:")
+    for n in tamanhos:
+        rng = random.Random(seed)
+        t0 = time.perf_counter()
+        for _ in range(repeticoes): gerar_labirinto(n, n, rng=rng)
+        tempo = (time.perf_counter() - t0) / repeticoes
+        print(f"  {n:>5}x{n:<5}: {tempo * 1e3:9.2f} ms  ({tempo * 1e9 / (n * n):6.0f} ns/célula)")
+
+def bench_maze_pool(jogos=20, seed=0):
+    """Compara gerar o labirinto de cada jogo com pegá-lo da reserva ou do cache em disco."""
+    import os, tempfile
+    from maze_pool import MazePool
+    rng = random.Random(seed)
+    t0 = time.perf_counter()
+    for _ in range(jogos): gerar_labirinto(rng=random.Random(rng.randrange(2**63)))
+    tempo_gerando = (time.perf_counter() - t0) / jogos
+    with tempfile.TemporaryDirectory() as pasta:
+        pool = MazePool(tamanho=jogos, db_path=os.path.join(pasta, "cache.db"), background=False)
+        pool.fill()
+        seeds = []
+        t0 = time.perf_counter()
+        for _ in range(jogos):
+            seeds.append(pool.take_seed()); pool.get(seeds[-1])
+        tempo_reserva = (time.perf_counter() - t0) / jogos
+        pool.close()
+        pool = MazePool(db_path=os.path.join(pasta, "cache.db"), background=False)
+        for s in seeds: pool.get(s)  # Pedidas por seed: gravadas no disco
+        t0 = time.perf_counter()
+        for s in seeds: pool.get(s)
+        tempo_disco = (time.perf_counter() - t0) / jogos
+        pool.close()
+    print(f"Labirinto no início do jogo ({jogos} jogos):")
+    print(f"  gerando:           {tempo_gerando * 1e3:7.3f} ms/jogo")
+    print(f"  da reserva:        {tempo_reserva * 1e3:7.3f} ms/jogo")
+    print(f"  do cache em disco: {tempo_disco * 1e3:7.3f} ms/jogo")
+
+def bench_occupancy(n_fantasmas=(4, 16, 64), passos=200, seed=0):
+    """Tempo de mover todos os fantasmas com e sem o índice de ocupação, para vários tamanhos de bando."""
+    from entities import Ghost
+    from occupancy import OccupancyGrid
+    print("Movimento dos fantasmas (índice de ocupação):")
+    for n in n_fantasmas:
+        tempos = {}
+        for modo in ("lista", "índice"):
+            game = HeadlessGame(seed=seed)
+            livres = _celulas_caminhaveis(game.maze)
+            rng = random.Random(seed)
+            game.ghosts = [Ghost(*rng.choice(livres), (255, 0, 0), rng.choice(("blinky", "pinky", "inky", "clyde")), game.rng) for _ in range(n)]
+            for g in game.ghosts: g.state = "chase"
+            occupancy = OccupancyGrid(game.ghosts) if modo == "índice" else None
+            t0 = time.perf_counter()
+            for _ in range(passos):
+                for g in game.ghosts:
+                    g.update(game.maze, game.player, game.ghosts, game.ghosts[0], game.distance_field, game.nearest_walkable, occupancy)
+            tempos[modo] = (time.perf_counter() - t0) / passos
+        print(f"  {n:>3} fantasmas: lista {tempos['lista'] * 1e3:7.3f} ms/passo, índice {tempos['índice'] * 1e3:7.3f} ms/passo")
+
+def bench_planning(n_fantasmas=(4, 32, 128), tamanho=101, ticks=30, seed=0):
+    """
+    Planejamento de muitos fantasmas num labirinto grande: um BFS por fantasma
+    contra o GhostPlanner (uma busca reversa por alvo distinto em cada tick).
+    """
+    rng = random.Random(seed)
+    maze = gerar_labirinto(tamanho, tamanho, rng=rng)
+    livres = _celulas_caminhaveis(maze)
+    nearest = NearestWalkableMap(maze)
+    offsets = [(0, 0), (4, 0), (0, -4), (-4, 4)]  # Alvos ao redor do jogador, como Blinky/Pinky/Inky/Clyde
+    print(f"Planejamento em {tamanho}x{tamanho}, {ticks} ticks (jogador andando, 4 alvos por tick):")
+    for n in n_fantasmas:
+        fantasmas = [rng.choice(livres) for _ in range(n)]
+        jogadores = [rng.choice(livres) for _ in range(ticks)]
+        alvos_por_tick = [[nearest.lookup(px + ox, py + oy) for ox, oy in offsets] for px, py in jogadores]
+
+        t0 = time.perf_counter()
+        for alvos in alvos_por_tick:
+            for i, g in enumerate(fantasmas): bfs_next_step(g, alvos[i % 4], maze)
+        tempo_bfs = (time.perf_counter() - t0) / ticks
+
+        planner = GhostPlanner(DistanceField(maze, max_tabelas=16))
+        t0 = time.perf_counter()
+        for alvos in alvos_por_tick:
+            planner.begin_tick()
+            for i, g in enumerate(fantasmas): planner.next_step(g, alvos[i % 4])
+        tempo_planner = (time.perf_counter() - t0) / ticks
+        por_tick = planner.stats()["por_tick"]
+        print(f"  {n:>4} fantasmas: BFS por fantasma {tempo_bfs * 1e3:8.2f} ms/tick | "
+              f"planejador {tempo_planner * 1e3:7.2f} ms/tick ({por_tick['buscas']:.1f} buscas/tick)")
+
+def bench_swarm(n_fantasmas=(4, 64, 256), ticks=3000, seed=1):
+    """Jogo sem tela com enxames de fantasmas: Ghost.update por fantasma contra o GhostSwarm em lote."""
+    from simulation import HeadlessGame
+    print(f"Enxames de fantasmas ({ticks} ticks, tempo real = {FPS} ticks/s):")
+    for n in n_fantasmas:
+        tps = {}
+        for swarm in (False, True):
+            game = HeadlessGame(seed=seed, n_ghosts=n, swarm=swarm)
+            tps[swarm] = game.run(max_ticks=ticks)["tps"]
+        print(f"  {n:>4} fantasmas: individual {tps[False]:9,.0f} ticks/s | "
+              f"lote {tps[True]:9,.0f} ticks/s ({tps[True] / FPS:,.0f}x tempo real)")
+
+def bench_vec_env(n_envs=32, passos=200, ticks_por_passo=8, processos=(2, 4)):
+    """Ticks de jogo por segundo do ambiente vetorizado: no processo atual e com processos trabalhadores."""
+    import os
+    from vec_env import VecEnv, SubprocVecEnv
+    rng = random.Random(0)
+    acoes = [[rng.randrange(1, 5) for _ in range(n_envs)] for _ in range(passos)]
+    print(f"Ambiente vetorizado ({n_envs} jogos, {passos} passos de {ticks_por_passo} ticks, {os.cpu_count()} CPUs):")
+    for nome, criar in [("no processo", lambda: VecEnv(n_envs, ticks_por_passo=ticks_por_passo))] + [
+            (f"{p} processos", lambda p=p: SubprocVecEnv(n_envs, p, ticks_por_passo=ticks_por_passo)) for p in processos]:
+        with criar() as env:
+            env.reset(seed=0)
+            t0 = time.perf_counter()
+            for a in acoes: env.step(a)
+            tempo = time.perf_counter() - t0
+        print(f"  {nome:<12} {passos * n_envs * ticks_por_passo / tempo:10,.0f} ticks/s")
+
+def bench_entities(n=100_000, seed=0):
+    """Custo de criação e memória por entidade: classes com __slots__ contra subclasses com __dict__."""
+    import tracemalloc
+    from entities import Player, Ghost
+    from config import COLOR_BLINKY
+    fabricas = {
+        "Ghost": lambda cls, rng: cls(1, 1, COLOR_BLINKY, "blinky", rng),
+        "Player": lambda cls, rng: cls(1, 1, rng),
+    }
+    print(f"Entidades ({n} instâncias):")
+    for nome, cls in (("Ghost", Ghost), ("Player", Player)):
+        for variante, klass in (("__slots__", cls), ("__dict__", type(nome + "Dict", (cls,), {}))):
+            rng = random.Random(seed)
+            t0 = time.perf_counter()
+            entidades = [fabricas[nome](klass, rng) for _ in range(n)]
+            tempo = time.perf_counter() - t0
+            del entidades
+            tracemalloc.start()
+            entidades = [fabricas[nome](klass, rng) for _ in range(n)]
+            memoria = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del entidades
+            print(f"  {nome:<6} {variante:<9}: {tempo * 1e9 / n:7.0f} ns/entidade, {memoria / n:6.0f} bytes/entidade")
+
+ORCAMENTO_INICIO_MS = 150  # Importar as ferramentas sem tela não pode passar disso
+
+def bench_startup(modulos=("engine", "simulation", "batch", "game", "ui"), repeticoes=3):
+    """
+    Tempo de importação a frio de cada módulo (num interpretador novo) e quais
+    bibliotecas gráficas ele carrega. Os módulos sem tela devem ficar dentro de
+    ORCAMENTO_INICIO_MS e não carregar pygame nem PyQt6.
+    """
+    import subprocess
+    codigo = ("import sys, time; t0 = time.perf_counter(); import {0}; "
+              "print(time.perf_counter() - t0, ','.join(m for m in ('pygame', 'PyQt6') if m in sys.modules))")
+    print(f"Início a frio (melhor de {repeticoes}, orçamento sem tela {ORCAMENTO_INICIO_MS} ms):")
+    for modulo in modulos:
+        tempos, graficos = [], ""
+        for _ in range(repeticoes):
+            saida = subprocess.run([sys.executable, "-c", codigo.format(modulo)], capture_output=True, text=True)
+            if saida.returncode != 0: break
+            tempo, _, graficos = saida.stdout.strip().splitlines()[-1].partition(" ")
+            tempos.append(float(tempo))
+        if not tempos:
+            print(f"  {modulo:<10}: não importou ({saida.stderr.strip().splitlines()[-1]})")
+            continue
+        ms = min(tempos) * 1e3
+        sem_tela = modulo in ("engine", "simulation", "batch")
+        status = ("OK" if ms <= ORCAMENTO_INICIO_MS and not graficos else "ACIMA") if sem_tela else ""
+        print(f"  {modulo:<10}: {ms:7.1f} ms  gráficos: {graficos or '-':<14} {status}")
+
+def bench_scores(n=20_000, n_sincrono=500):
+    """Gravação de placares: uma conexão e um commit por placar (como antes) contra o ScoreStore em lotes."""
+    import os, sqlite3, tempfile
+    from utils import ScoreStore, SQL_UPSERT_PLACAR
+    from database_setup import SQL_CRIAR_PLACARES
+    with tempfile.TemporaryDirectory() as pasta:
+        path = os.path.join(pasta, "placar.db")
+        conn = sqlite3.connect(path); conn.execute(SQL_CRIAR_PLACARES); conn.close()
+        t0 = time.perf_counter()
+        for i in range(n_sincrono):
+            conn = sqlite3.connect(path)
+            conn.execute(SQL_UPSERT_PLACAR, (f"j{i}", i)); conn.commit(); conn.close()
+        tempo_sincrono = (time.perf_counter() - t0) / n_sincrono
+
+        store = ScoreStore(path)
+        t0 = time.perf_counter()
+        for i in range(n): store.save(f"s{i}", i)
+        tempo_fila = (time.perf_counter() - t0) / n
+        store.flush()
+        tempo_total = (time.perf_counter() - t0) / n
+        lotes = store.lotes
+        store.close()
+    print(f"Placares ({n} no ScoreStore, {n_sincrono} síncronos):")
+    print(f"  síncrono:              {tempo_sincrono * 1e6:9.1f} us/placar (bloqueia o jogo)")
+    print(f"  ScoreStore (save):     {tempo_fila * 1e6:9.1f} us/placar (bloqueia o jogo)")
+    print(f"  ScoreStore (no disco): {tempo_total * 1e6:9.1f} us/placar, {lotes} lotes")
+
+def bench_leaderboard(n=1_000_000, consultas=200):
+    """Consultas do ranking com n placares: primeira página, página funda (por chave), posição e vizinhança."""
+    import os, random, sqlite3, tempfile
+    from utils import ScoreStore
+    from database_setup import SQL_CRIAR_PLACARES
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as pasta:
+        path = os.path.join(pasta, "placar.db")
+        conn = sqlite3.connect(path); conn.execute(SQL_CRIAR_PLACARES)
+        conn.executemany("INSERT INTO placares (nome, score) VALUES (?, ?)",
+                         ((f"p{i}", rng.randrange(1_000_000)) for i in range(n)))
+        conn.commit(); conn.close()
+        t0 = time.perf_counter()
+        store = ScoreStore(path)  # Cria os índices que faltarem
+        tempo_indice = time.perf_counter() - t0
+        nomes = [f"p{rng.randrange(n)}" for _ in range(consultas)]
+        meio = store.page(1, after=(500_000, 0))[0]
+
+        def medir(func):
+            t0 = time.perf_counter()
+            for nome in nomes: func(nome)
+            return (time.perf_counter() - t0) / consultas * 1000
+        tempos = {
+            "primeira página": medir(lambda nome: store.page(10)),
+            "página no meio": medir(lambda nome: store.page(10, after=(meio[2], meio[0]))),
+            "rank(nome)": medir(store.rank),
+            "around(nome, 5)": medir(store.around),
+            "top da semana": medir(lambda nome: store.page(10, periodo="semana")),
+        }
+        store.close()
+    print(f"Ranking com {n} placares (índices criados em {tempo_indice:.1f} s):")
+    for nome, ms in tempos.items(): print(f"  {nome:<16} {ms:8.3f} ms/consulta")
+
+def bench_large_map(chunks=(8, 64, 256), ticks=3000, seed=3):
+    """Latência por tick e pico de memória do mapa grande: o custo deve depender da tela, não do tamanho do mapa."""
+    import tracemalloc
+    from large_map import HeadlessLargeMap, TAMANHO_CHUNK
+    print(f"Mapa grande em pedaços ({ticks} ticks):")
+    for n in chunks:
+        game = HeadlessLargeMap(seed=seed, chunks=n)
+        tempos = []
+        for _ in range(ticks):
+            t0 = time.perf_counter()
+            game.step()
+            tempos.append(time.perf_counter() - t0)
+            if game.game_over: break
+        gerados = sum(game.maze.gerados)
+        game.close()
+        # O tracemalloc deixa cada alocação mais lenta: a memória é medida numa segunda rodada igual
+        tracemalloc.start()
+        game = HeadlessLargeMap(seed=seed, chunks=n)
+        game.run(max_ticks=len(tempos))
+        pico = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        game.close()
+        tempos.sort()
+        pct = lambda p: tempos[min(len(tempos) - 1, int(p / 100 * len(tempos)))] * 1000
+        lado = n * TAMANHO_CHUNK
+        print(f"  {lado:>5}x{lado:<5} ({lado * lado / 1e6:6.2f} M células): p50 {pct(50):5.2f} ms | p99 {pct(99):6.2f} ms | "
+              f"pior {tempos[-1] * 1000:6.2f} ms | pico {pico / 2**20:5.1f} MB | {gerados} pedaços gerados")
+
+def bench_dynamic_field(tamanhos=(101, 301, 601, 1001), alvos=8, edicoes=200, edicoes_recalcular=10, seed=0):
+    """
+    Portas que abrem e fecham num labirinto grande com alvos guardados: conserto
+    incremental (DynamicDistanceField.set_wall) contra refazer as tabelas a cada
+    edição (medido só nas primeiras edicoes_recalcular, que já bastam para a média).
+    """
+    from pathfinding import DynamicDistanceField
+    print(f"Labirinto com paredes que mudam ({alvos} alvos guardados, portas fechando e reabrindo):")
+    for n in tamanhos:
+        rng = random.Random(seed)
+        maze = gerar_labirinto(n, n, rng=random.Random(seed))
+        livres = _celulas_caminhaveis(maze)
+        pontos = rng.sample(livres, alvos)
+        portas = [c for c in rng.sample(livres, edicoes // 2) if c not in pontos]
+        # Cada porta reabre logo depois que a próxima fecha
+        sequencia = [(portas[0], True)]
+        for antes, c in zip(portas, portas[1:]): sequencia += [(c, True), (antes, False)]
+        tempos = {}
+        for modo, lista in (("incremental", sequencia), ("recalcular", sequencia[:edicoes_recalcular])):
+            field = DynamicDistanceField(maze)
+            for alvo in pontos: field.distance(alvo, alvo)
+            t0 = time.perf_counter()
+            for pos, parede in lista:
+                if modo == "incremental":
+                    field.set_wall(pos, parede)
+                else:
+                    guardados = list(field._tabelas)
+                    field._tabelas.clear()
+                    field.set_wall(pos, parede)
+                    for t in guardados: field._tabela(t)
+            tempos[modo] = (time.perf_counter() - t0) / len(lista) * 1000
+            if modo == "incremental": reparos = field.reparos / len(lista) / alvos
+        print(f"  {n:>4}x{n:<4}: incremental {tempos['incremental']:7.3f} ms/edição ({reparos:7.1f} células/tabela) | "
+              f"recalcular {tempos['recalcular']:8.2f} ms/edição ({tempos['recalcular'] / tempos['incremental']:,.0f}x)")
+
+def bench_hpa(tamanhos=((31, 28), (101, 101), (301, 301), (1001, 1001), (2000, 2000)), consultas=40, consultas_bfs=3, seed=0):
+    """
+    Escala do HPA* (HierarchicalPlanner) de 31x28 até 2000x2000: tempo de
+    construção, memória das tabelas e latência de next_step para alvos
+    aleatórios e para alvos a até 20 células (o caso dos fantasmas), contra
+    bfs_next_step e a memória de uma tabela do DistanceField.
+    """
+    from hpa import HierarchicalPlanner
+    print(f"Busca hierárquica (HPA*), {consultas} consultas por tamanho:")
+    for linhas, colunas in tamanhos:
+        rng = random.Random(seed)
+        maze = gerar_labirinto(linhas, colunas, rng=random.Random(seed))
+        livres = _celulas_caminhaveis(maze)
+        t0 = time.perf_counter()
+        hpa = HierarchicalPlanner(maze)
+        construcao = time.perf_counter() - t0
+        longe = [(rng.choice(livres), rng.choice(livres)) for _ in range(consultas)]
+        perto = []
+        for _ in range(consultas):
+            x, y = rng.choice(livres)
+            perto.append(((x, y), find_nearest_walkable_global(maze, x + rng.randint(-20, 20), y + rng.randint(-20, 20))))
+
+        def latencias(func, pares):
+            tempos = []
+            for a, b in pares:
+                t0 = time.perf_counter()
+                func(a, b)
+                tempos.append((time.perf_counter() - t0) * 1000)
+            tempos.sort()
+            return tempos[len(tempos) // 2], tempos[min(len(tempos) - 1, int(0.99 * len(tempos)))]
+        p50_longe, p99_longe = latencias(hpa.next_step, longe)
+        p50_perto, p99_perto = latencias(hpa.next_step, perto)
+        bfs = latencias(lambda a, b: bfs_next_step(a, b, maze), longe[:consultas_bfs])[0]
+        stats = hpa.stats()
+        celulas = len(maze) * len(maze[0])
+        print(f"  {len(maze):>4}x{len(maze[0]):<4}: construção {construcao:6.2f} s | {stats['entradas']:>6} entradas | "
+              f"tabelas {stats['bytes'] / 2**20:6.2f} MB (DistanceField: {celulas * 5 / 2**20:6.2f} MB por alvo)")
+        print(f"             next_step longe p50 {p50_longe:7.2f} ms p99 {p99_longe:7.2f} ms | "
+              f"perto p50 {p50_perto:6.2f} ms p99 {p99_perto:6.2f} ms | bfs_next_step {bfs:8.1f} ms")
+
+BENCHMARKS = {
+    "pathfinding": bench_pathfinding,
+    "nearest": bench_nearest_walkable,
+    "headless": bench_headless,
+    "render": bench_render,
+    "particles": bench_particles,
+    "maze": bench_maze,
+    "pool": bench_maze_pool,
+    "occupancy": bench_occupancy,
+    "planning": bench_planning,
+    "swarm": bench_swarm,
+    "vec_env": bench_vec_env,
+    "entities": bench_entities,
+    "startup": bench_startup,
+    "scores": bench_scores,
+    "leaderboard": bench_leaderboard,
+    "large_map": bench_large_map,
+    "dynamic_field": bench_dynamic_field,
+    "hpa": bench_hpa,
+}
+
+if __name__ == "__main__":
+    nomes = sys.argv[1:] or list(BENCHMARKS)
+    for nome in nomes:
+        BENCHMARKS[nome]()
@@ -6,7 +6,9 @@ ROWS, COLS = 31, 28
 HUD_HEIGHT = 60
 WIDTH, HEIGHT = COLS * CELL_SIZE, ROWS * CELL_SIZE + HUD_HEIGHT
 DATABASE_FILE = "scores.db"
-FPS = 30
+FPS = 30  # Ticks de simulação por segundo (passo fixo)
+RENDER_FPS = 60  # Limite de quadros desenhados por segundo (0 = sem limite)
+MAX_FRAME_SKIP = 5  # Máximo de ticks simulados entre dois quadros antes de descartar o atraso
 INITIAL_LIVES = 3
 
 # Ajustes de Gameplay
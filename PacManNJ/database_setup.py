@@ -2,6 +2,21 @@ import sqlite3
 import os
 from config import DATABASE_FILE
 
+SQL_CRIAR_PLACARES = """
+CREATE TABLE IF NOT EXISTS placares (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nome VARCHAR(12) NOT NULL UNIQUE, 
+    score INTEGER NOT NULL,
+    data_registro TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+# Índices do placar: ranking geral (score, com id desempatando) e rankings por período
+SQL_INDICES_PLACARES = [
+    "CREATE INDEX IF NOT EXISTS idx_placares_score ON placares (score DESC, id);",
+    "CREATE INDEX IF NOT EXISTS idx_placares_data ON placares (data_registro, score);",
+]
+
 def criar_banco():
     """
     Cria o arquivo do banco de dados SQLite e a tabela 'placares' 
@@ -20,14 +35,8 @@ def criar_banco():
         conn = sqlite3.connect(DATABASE_FILE)
         cursor = conn.cursor()
         
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS placares (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nome VARCHAR(12) NOT NULL UNIQUE, 
-            score INTEGER NOT NULL,
-            data_registro TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-        """)
+        cursor.execute(SQL_CRIAR_PLACARES)
+        for sql in SQL_INDICES_PLACARES: cursor.execute(sql)
         
         conn.commit()
         print("Tabela 'placares' (com nomes únicos) criada com sucesso.")
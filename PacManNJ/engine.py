@@ -0,0 +1,159 @@
+"""
+Lógica do jogo PacManNJ, sem nenhuma dependência gráfica.
+
+GameEngine guarda o estado de uma partida (labirinto, entidades, vidas) e
+avança um tick por vez. Game (game.py) acrescenta janela, teclado e desenho
+com pygame; HeadlessGame (simulation.py) roda a mesma lógica sem tela.
+Importar este módulo não carrega pygame nem PyQt.
+"""
+import random
+from config import *
+from utils import salvar_placar
+from maze_generator import gerar_labirinto
+from grid import MazeGrid
+from pathfinding import DistanceField, NearestWalkableMap, GhostPlanner
+from entities import Player, Ghost
+from replay import ReplayRecorder
+from occupancy import OccupancyGrid
+from swarm import GhostSwarm
+
+class GameEngine:
+    """Estado e regras de uma partida (COMPOSIÇÃO de labirinto, jogador e fantasmas)."""
+    def __init__(self, player_name, seed=None, record=False, maze_pool=None, profiler=None, n_ghosts=4, swarm=False):
+        self.player_name = player_name
+        # n_ghosts > 4 repete Blinky, Pinky, Inky e Clyde; swarm=True avança todos em lote (swarm.py)
+        self.n_ghosts = n_ghosts
+        self.use_swarm = swarm
+        self.maze_pool = maze_pool
+        self.seed = seed if seed is not None else self._random_seed()
+        self.recorder = ReplayRecorder(self.seed) if record else None
+        self.is_running = True
+        self.frame = 0
+        self.profiler = profiler
+        self._new_game()
+        if profiler is not None: self._instrument()
+
+    def _instrument(self):
+        """Mede os subsistemas da lógica e acompanha o trabalho de pathfinding."""
+        p = self.profiler
+        p.instrument(self, ["_update_player", "_update_ghosts", "_check_collisions"])
+        p.track("buscas_bfs", lambda: self.distance_field.buscas)
+        p.track("consultas_caminho", lambda: self.planner.total["consultas"])
+
+    def _random_seed(self):
+        # Com uma reserva de labirintos, prefere uma seed cujo labirinto já está pronto
+        return self.maze_pool.take_seed() if self.maze_pool else random.randrange(2**63)
+
+    def _new_game(self):
+        # O labirinto depende só da seed; a lógica do jogo usa um fluxo separado
+        if self.maze_pool: self.maze = MazeGrid(self.maze_pool.get(self.seed))
+        else: self.maze = MazeGrid(gerar_labirinto(rng=random.Random(self.seed)))
+        self.rng = random.Random(self.seed + 1)
+        self.distance_field = DistanceField(self.maze)
+        self.nearest_walkable = NearestWalkableMap(self.maze)
+        self.planner = GhostPlanner(self.distance_field)
+        self._create_entities()
+        self.lives = INITIAL_LIVES
+        self.game_over = False; self.win = False; self.started = False
+        self.is_paused_for_death = False; self.death_countdown = 0
+        self.super_intro_countdown = 0; self.player_move_timer = 0; self.ghost_move_timer = 0
+
+    def _player_start(self):
+        return self.nearest_walkable.lookup(COLS // 2, ROWS - 5)
+
+    def _create_entities(self):
+        px, py = self._player_start()
+        self.player = Player(px, py, self.rng)
+        cx, cy = self.maze.ghost_house or (COLS//2, ROWS//2)
+        kinds = [
+            (cx, cy, COLOR_BLINKY, "blinky"),
+            (cx - 1, cy, COLOR_PINKY, "pinky"),
+            (cx + 1, cy, COLOR_INKY, "inky"),
+            (cx, cy - 1, COLOR_CLYDE, "clyde")
+        ]
+        if self.use_swarm:
+            self.swarm = GhostSwarm(self.distance_field, self.nearest_walkable, self.rng)
+            self.ghosts = [self.swarm.add(*kinds[i % 4]) for i in range(self.n_ghosts)]
+            self.occupancy = self.swarm
+        else:
+            self.swarm = None
+            self.ghosts = [Ghost(*kinds[i % 4], self.rng) for i in range(self.n_ghosts)]
+            self.occupancy = OccupancyGrid(self.ghosts)
+        self.blinky = next((g for g in self.ghosts if g.type == "blinky"), None)
+
+    def _apply_input(self, direction):
+        """Aplica uma tecla do jogador: qualquer tecla inicia o jogo, setas mudam a direção."""
+        self.started = True
+        if self.recorder: self.recorder.key(direction)
+        if direction is not None: self.player.try_set_direction(*direction, self.maze)
+
+    def _update(self):
+        if self.recorder: self.recorder.end_tick()
+        if self.game_over: return
+        if self.super_intro_countdown > 0: self.super_intro_countdown -= 1; return
+        if self.is_paused_for_death:
+            self.player.update(self.frame)
+            if not self.player.is_dying: self._handle_player_death_end()
+            return
+        if not self.started: return
+        self._update_player(); self._update_ghosts(); self._check_collisions(); self._check_win_condition()
+        self.frame += 1
+
+    def _update_player(self):
+        self.player_move_timer += 1
+        if self.player_move_timer >= PLAYER_MOVE_DELAY:
+            self.player_move_timer = 0
+            event = self.player.move(self.maze)
+            if event == "SUPER_MODE_START":
+                self.super_intro_countdown = int(FPS * 1.5)
+                for g in self.ghosts:
+                    if g.state != "eaten": g.state = "vulnerable"; g.vul_timer = SUPER_MODE_DURATION
+        self.player.update(self.frame)
+
+    def _update_ghosts(self):
+        waiting = enumerate(self.ghosts) if self.swarm is None else self.swarm.em_casa()
+        for i, g in waiting:
+            # Os fantasmas extras dos enxames saem junto com os do mesmo tipo, um por movimento
+            if g.state == "house" and self.frame > ((i % 4) * 90 + 60 + (i // 4) * GHOST_MOVE_DELAY): g.state = "chase"
+        self.ghost_move_timer += 1
+        if self.ghost_move_timer >= GHOST_MOVE_DELAY:
+            self.ghost_move_timer = 0
+            # Um único planejamento por tick: cada alvo distinto é resolvido uma vez para todos
+            self.planner.begin_tick()
+            if self.swarm is not None: self.swarm.step(self.player, self.planner); return
+            for g in self.ghosts: g.update(self.maze, self.player, self.ghosts, self.blinky, self.planner, self.nearest_walkable, self.occupancy)
+
+    def _check_collisions(self):
+        hits = self.occupancy.at(self.player.x, self.player.y)
+        if not hits: return
+        # Na ordem da lista de fantasmas, como antes do índice (importa quando há mais de um na célula)
+        for g in sorted(hits, key=self.ghosts.index):
+            if g.state == "vulnerable": g.state = "eaten"; self.player.score += 200
+            elif g.state != "eaten": self._handle_player_death(g); break
+
+    def _handle_player_death(self, killer=None):
+        self.lives -= 1
+        self.player.start_dying()
+        self.is_paused_for_death = True
+
+    def _handle_player_death_end(self):
+        self.is_paused_for_death = False
+        if self.lives > 0: self._reset_positions()
+        else: self.game_over = True; self.win = False; self._save_score()
+
+    def _reset_positions(self):
+        self.started = False
+        px, py = self._player_start()
+        self.player.x, self.player.y = px, py; self.player.dx, self.player.dy = 0, 0
+        self.player.super_timer = 0; self.player.blood_trail.clear()
+        for g in self.ghosts:
+            g.x, g.y = g.spawn_x, g.spawn_y
+            g.state = "house"
+        self.occupancy.rebuild(self.ghosts)
+
+    def _check_win_condition(self):
+        if self.maze.pellets_left == 0:
+            self.game_over = True; self.win = True; self._save_score()
+
+    def _save_score(self):
+        salvar_placar(self.player_name, self.player.score)
@@ -1,45 +1,84 @@
-import pygame
 import math
 import random
-import collections
 from config import *
-from pathfinding import bfs_next_step, find_nearest_walkable_global
+from lazy import lazy_import
+from pathfinding import bfs_next_step, find_nearest_walkable_global, CANTOS
+from sprites import sprite_cache, alpha_bucket
+from particles import ParticleSystem
+
+# Só os métodos de desenho usam pygame; a lógica das entidades roda sem ele
+pygame = lazy_import("pygame")
+
+def _render_circle(color, radius, alpha=255):
+    s = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+    pygame.draw.circle(s, (*color, alpha), (radius, radius), radius)
+    return s
 
 class GameObject:
-    
-    def __init__(self, x, y):
+    # __slots__: sem __dict__ por instância; simulações em lote criam milhões de entidades
+    __slots__ = ("x", "y", "rng", "anim_phase")
+
+    def __init__(self, x, y, rng=None):
         self.x, self.y = x, y
-        self.anim_phase = random.uniform(0, 2 * math.pi)
+        # Gerador do jogo (random.Random); usar sempre ele na lógica mantém o jogo reproduzível
+        self.rng = rng if rng is not None else random
+        self.anim_phase = self.rng.uniform(0, 2 * math.pi)
 
-    def draw(self, screen, frame):
+    def draw(self, screen, frame, camera=(0, 0)):
         raise NotImplementedError
 
     def update(self, *args, **kwargs):
         raise NotImplementedError
     
-    def get_pixel_pos(self):
+    def world_pixel_pos(self):
         return (self.x * CELL_SIZE + CELL_SIZE // 2, self.y * CELL_SIZE + CELL_SIZE // 2)
 
+    def get_pixel_pos(self, camera=(0, 0)):
+        """
+        Centro da entidade na tela: posição no mundo menos camera, o canto superior
+        esquerdo da tela em pixels do mundo (só muda no modo de mapa grande).
+        """
+        cam_x, cam_y = camera
+        return (self.x * CELL_SIZE + CELL_SIZE // 2 - cam_x, self.y * CELL_SIZE + CELL_SIZE // 2 - cam_y)
+
+    def draw_rects(self, camera=(0, 0)):
+        """Retângulos (em pixels da tela) que o último draw pode ter pintado, para o redesenho parcial."""
+        rect = pygame.Rect(0, 0, 2 * CELL_SIZE, 2 * CELL_SIZE)
+        rect.center = self.get_pixel_pos(camera)
+        return [rect]
+
 class Player(GameObject):
     """Classe que representa o jogador."""
-    def __init__(self, x, y):
-        super().__init__(x, y) 
+    __slots__ = ("dx", "dy", "score", "super_timer", "is_dying", "death_animation_timer", "_blood_particles", "_blood_trail")
+
+    def __init__(self, x, y, rng=None):
+        super().__init__(x, y, rng)
         self.dx, self.dy = 0, 0
         self.score = 0
         self.super_timer = 0
         self.is_dying = False
         self.death_animation_timer = 0
-        self.blood_particles = []
-        self.blood_trail = collections.deque(maxlen=100)
+        # Os efeitos de sangue são criados no primeiro uso, para criar um jogador sair barato
+        self._blood_particles = self._blood_trail = None
+
+    @property
+    def blood_particles(self):
+        if self._blood_particles is None: self._blood_particles = ParticleSystem(capacity=1000)
+        return self._blood_particles
+
+    @property
+    def blood_trail(self):
+        if self._blood_trail is None: self._blood_trail = ParticleSystem(capacity=100)
+        return self._blood_trail
 
     def try_set_direction(self, ndx, ndy, maze):
         nx, ny = self.x + ndx, self.y + ndy
-        if 0 <= nx < COLS and 0 <= ny < ROWS and maze[ny][nx] != 1:
+        if 0 <= nx < len(maze[0]) and 0 <= ny < len(maze) and maze[ny][nx] != 1:
             self.dx, self.dy = ndx, ndy
 
     def move(self, maze):
         nx, ny = self.x + self.dx, self.y + self.dy
-        if 0 <= nx < COLS and 0 <= ny < ROWS and maze[ny][nx] != 1:
+        if 0 <= nx < len(maze[0]) and 0 <= ny < len(maze) and maze[ny][nx] != 1:
             self.x, self.y = nx, ny
             cell_type = maze[ny][nx]
             if cell_type == 2:
@@ -66,69 +105,108 @@ class Player(GameObject):
                 if self.super_timer == 0:
                     self.blood_trail.clear()
                 if frame % 3 == 0:
-                    x_pix, y_pix = self.get_pixel_pos()
-                    self.blood_trail.appendleft({'pos': (x_pix + random.randint(-2, 2), y_pix + random.randint(-2, 2)), 'age': 0})
-                for drop in self.blood_trail:
-                    drop['age'] += 1
+                    x_pix, y_pix = self.world_pixel_pos()
+                    # A gota some quando o alfa chega a zero (255 - idade * 5)
+                    self.blood_trail.emit(x_pix + self.rng.randint(-2, 2), y_pix + self.rng.randint(-2, 2), life=51)
+                self.blood_trail.update()
 
     def start_dying(self):
         self.is_dying = True
         self.death_animation_timer = 60
-        self.blood_particles = []
-        px, py = self.get_pixel_pos()
+        self.blood_particles.clear()
+        px, py = self.world_pixel_pos()
         for _ in range(40):
-            angle = random.uniform(0, 2 * math.pi)
-            speed = random.uniform(1, 5)
-            self.blood_particles.append({'x': px, 'y': py, 'dx': math.cos(angle) * speed, 'dy': math.sin(angle) * speed, 'life': random.randint(15, 30)})
+            angle = self.rng.uniform(0, 2 * math.pi)
+            speed = self.rng.uniform(1, 5)
+            self.blood_particles.emit(px, py, math.cos(angle) * speed, math.sin(angle) * speed, self.rng.randint(15, 30))
 
     def update_death_animation(self):
         if not self.is_dying: return
         self.death_animation_timer -= 1
-        for p in self.blood_particles:
-            p['x'] += p['dx']; p['y'] += p['dy']; p['life'] -= 1
-        self.blood_particles = [p for p in self.blood_particles if p['life'] > 0]
+        self.blood_particles.update()
         if self.death_animation_timer <= 0:
             self.is_dying = False
 
-    def draw(self, screen, frame):
+    def draw(self, screen, frame, camera=(0, 0)):
         """Método draw (POLIMORFISMO)."""
-        x_pix, y_pix = self.get_pixel_pos()
+        x_pix, y_pix = self.get_pixel_pos(camera)
         
         # Desenha rastro de sangue no chão
-        for drop in self.blood_trail:
-            alpha = max(0, 255 - drop['age'] * 5)
-            radius = max(1, 5 - drop['age'] // 8)
-            if alpha > 0 and radius > 0:
-                s = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
-                pygame.draw.circle(s, (*COLOR_BLOOD, alpha), (radius, radius), radius)
-                screen.blit(s, (int(drop['pos'][0] - radius), int(drop['pos'][1] - radius)))
+        self.blood_trail.draw(screen, self._drop_sprite, camera)
         
         if self.is_dying:
-            self._draw_death_effect(screen, x_pix, y_pix)
+            self._draw_death_effect(screen, x_pix, y_pix, camera)
         elif self.super_timer > 0:
             self._draw_jason_mode(screen, x_pix, y_pix, frame)
         else:
             self._draw_normal_mode(screen, x_pix, y_pix)
 
-    def _draw_death_effect(self, screen, x_pix, y_pix):
+    def draw_rects(self, camera=(0, 0)):
+        # O facão do modo Jason passa bem da célula do jogador
+        rect = pygame.Rect(0, 0, 4 * CELL_SIZE, 4 * CELL_SIZE)
+        rect.center = self.get_pixel_pos(camera)
+        rects = [rect]
+        cam_x, cam_y = camera
+        for x, y in self.blood_trail.positions():
+            rects.append(pygame.Rect(int(x - cam_x) - 6, int(y - cam_y) - 6, 12, 12))
+        return rects
+
+    @staticmethod
+    def _drop_sprite(age):
+        alpha = alpha_bucket(max(0, 255 - age * 5))
+        radius = max(1, 5 - age // 8)
+        if alpha <= 0: return None
+        return sprite_cache.get(("drop", None, radius, alpha, None), lambda: _render_circle(COLOR_BLOOD, radius, alpha)), radius
+
+    @staticmethod
+    def _particle_sprite(age):
+        # Variação só visual: usa o random global para não desviar o gerador do jogo,
+        # senão um replay sem tela divergiria do jogo desenhado.
+        r = random.randint(2, 4)
+        return sprite_cache.get(("particle", None, r, 255, None), lambda: _render_circle(COLOR_RED, r)), r
+
+    def _draw_death_effect(self, screen, x_pix, y_pix, camera):
         pygame.draw.circle(screen, COLOR_RED, (x_pix, y_pix), CELL_SIZE // 2 - 2)
-        for p in self.blood_particles:
-            pygame.draw.circle(screen, COLOR_RED, (int(p['x']), int(p['y'])), random.randint(2, 4))
+        self.blood_particles.draw(screen, self._particle_sprite, camera)
     
     def _draw_normal_mode(self, screen, x_pix, y_pix):
-        angle_ampl = 30 * (0.5 + 0.5 * math.sin(self.anim_phase))
+        # A abertura da boca é arredondada para graus inteiros para reaproveitar os sprites
+        angle_ampl = round(30 * (0.5 + 0.5 * math.sin(self.anim_phase)))
         if self.dx == 1: base = 0
         elif self.dx == -1: base = 180
         elif self.dy == -1: base = 90
         else: base = 270
-        pygame.draw.circle(screen, COLOR_YELLOW, (x_pix, y_pix), CELL_SIZE // 2 - 2)
+        s = sprite_cache.get(("pacman", angle_ampl, CELL_SIZE // 2 - 2, 255, base), lambda: self._render_pacman(angle_ampl, base))
+        screen.blit(s, (x_pix - CELL_SIZE, y_pix - CELL_SIZE))
+
+    @staticmethod
+    def _render_pacman(angle_ampl, base):
+        s = pygame.Surface((2 * CELL_SIZE + 2, 2 * CELL_SIZE + 2), pygame.SRCALPHA)
+        x_pix = y_pix = CELL_SIZE
+        pygame.draw.circle(s, COLOR_YELLOW, (x_pix, y_pix), CELL_SIZE // 2 - 2)
         a1 = math.radians(base - angle_ampl); a2 = math.radians(base + angle_ampl)
         p1 = (x_pix + math.cos(a1) * CELL_SIZE, y_pix - math.sin(a1) * CELL_SIZE)
         p2 = (x_pix + math.cos(a2) * CELL_SIZE, y_pix - math.sin(a2) * CELL_SIZE)
-        pygame.draw.polygon(screen, COLOR_BLACK, [(x_pix, y_pix), p1, p2])
+        pygame.draw.polygon(s, COLOR_BLACK, [(x_pix, y_pix), p1, p2])
+        return s
 
     def _draw_jason_mode(self, screen, x_pix, y_pix, frame):
-        
+        half = 2 * CELL_SIZE
+        sprite, tip_pos = sprite_cache.get(("jason", "super", CELL_SIZE // 2, 255, None), lambda: self._render_jason(half))
+        screen.blit(sprite, (x_pix - half, y_pix - half))
+        tip_x, tip_y = x_pix - half + tip_pos[0], y_pix - half + tip_pos[1]
+
+        if frame % 20 < 10: 
+            pygame.draw.circle(screen, COLOR_BLOOD, (int(tip_x), int(tip_y + 2)), 2)
+        else: 
+            drop_offset = (frame % 10) * 1.5
+            pygame.draw.circle(screen, COLOR_BLOOD, (int(tip_x), int(tip_y + 2 + drop_offset)), 2)
+
+    @staticmethod
+    def _render_jason(half):
+        """Máscara, mão e facão (tudo estático); retorna o sprite e a ponta da lâmina."""
+        screen = pygame.Surface((2 * half, 2 * half), pygame.SRCALPHA)
+        x_pix = y_pix = half
         pygame.draw.circle(screen, COLOR_YELLOW, (x_pix, y_pix), CELL_SIZE // 2)
         mask_rect = (x_pix - 9, y_pix - 9, 18, 18)
         pygame.draw.ellipse(screen, COLOR_JASON_MASK, mask_rect)
@@ -196,89 +274,88 @@ class Player(GameObject):
              pygame.draw.line(screen, c_edge, transformed_blade[1], transformed_blade[2], 2)
              pygame.draw.line(screen, c_edge, transformed_blade[2], transformed_blade[3], 2)
 
-        if frame % 20 < 10: 
-            pygame.draw.circle(screen, COLOR_BLOOD, (int(tip_pos[0]), int(tip_pos[1] + 2)), 2)
-        else: 
-            drop_offset = (frame % 10) * 1.5
-            pygame.draw.circle(screen, COLOR_BLOOD, (int(tip_pos[0]), int(tip_pos[1] + 2 + drop_offset)), 2)
-
         pygame.draw.circle(screen, COLOR_YELLOW, handle_start, 4)
+        return screen, tip_pos
 
 class Ghost(GameObject):
+    __slots__ = ("spawn_x", "spawn_y", "color", "type", "state", "vul_timer")
+    font_rip = None  # Compartilhada por todos os fantasmas; carregada no primeiro túmulo desenhado
 
-    def __init__(self, x, y, color, gtype):
-        super().__init__(x, y)
+    def __init__(self, x, y, color, gtype, rng=None):
+        super().__init__(x, y, rng)
         self.spawn_x, self.spawn_y = x, y
         self.color = color
         self.type = gtype
         self.state = "house"
         self.vul_timer = 0
-        self.font_rip = pygame.font.SysFont("Arial", 9, bold=True)
 
-    def update(self, maze, player, ghosts, blinky_ref):
+    def update(self, maze, player, ghosts, blinky_ref, distance_field=None, nearest=None, occupancy=None):
         if self.state == "house": return
         if self.state == "vulnerable":
             self.vul_timer -= 1
             if self.vul_timer <= 0: self.state = "chase"
         
-        target = self._get_target_tile(player, blinky_ref, maze)
-        ideal_dx, ideal_dy = bfs_next_step((self.x, self.y), target, maze)
+        target = self._get_target_tile(player, blinky_ref, maze, nearest)
+        if distance_field is not None:
+            ideal_dx, ideal_dy = distance_field.next_step((self.x, self.y), target)
+        else:
+            ideal_dx, ideal_dy = bfs_next_step((self.x, self.y), target, maze)
         next_x, next_y = self.x + ideal_dx, self.y + ideal_dy
+        # Com o índice de ocupação só os fantasmas da célula são verificados
+        others = (lambda x, y: occupancy.at(x, y)) if occupancy is not None else (lambda x, y: ghosts)
+        is_blocked = lambda x, y: any(g is not self and g.state != "eaten" and (g.x, g.y) == (x, y) for g in others(x, y))
         is_stuck = (ideal_dx, ideal_dy) == (0,0)
-        is_cong = any(g is not self and g.state != "eaten" and (g.x, g.y) == (next_x, next_y) for g in ghosts)
+        is_cong = is_blocked(next_x, next_y)
         
         if is_stuck or is_cong:
             moves = []
-            for rdx, rdy in random.sample([(0,1),(0,-1),(1,0),(-1,0)], 4):
+            for rdx, rdy in self.rng.sample([(0,1),(0,-1),(1,0),(-1,0)], 4):
                 nx, ny = self.x + rdx, self.y + rdy
-                if 0 <= nx < COLS and 0 <= ny < ROWS and maze[ny][nx] != 1 and not any(g is not self and g.state!="eaten" and (g.x,g.y) == (nx,ny) for g in ghosts):
+                if 0 <= nx < len(maze[0]) and 0 <= ny < len(maze) and maze[ny][nx] != 1 and not is_blocked(nx, ny):
                     moves.append((rdx, rdy))
             final_dx, final_dy = moves[0] if moves else (0, 0)
         else:
             final_dx, final_dy = ideal_dx, ideal_dy
             
+        old_x, old_y = self.x, self.y
         self.x += final_dx; self.y += final_dy
+        if occupancy is not None: occupancy.move(self, old_x, old_y)
         
         if self.state == "eaten" and (self.x, self.y) == (self.spawn_x, self.spawn_y):
             self.state = "chase"
 
-    def _get_target_tile(self, player, blinky_ref, maze):
+    def _get_target_tile(self, player, blinky_ref, maze, nearest=None):
         if self.state == "eaten": return self.spawn_x, self.spawn_y
+        # Os cantos vêm da área coberta por nearest (no mapa grande, a região ativa)
+        corners = nearest.corners if nearest is not None else CANTOS
         if self.state == "vulnerable":
-            corners = [(1, 1), (COLS - 2, 1), (1, ROWS - 2), (COLS - 2, ROWS - 2)]
             return max(corners, key=lambda c: abs(c[0] - player.x) + abs(c[1] - player.y))
-        if self.type == "blinky": return find_nearest_walkable_global(maze, player.x, player.y)
+        if nearest is not None:
+            walkable = nearest.lookup
+        else:
+            walkable = lambda x, y: find_nearest_walkable_global(maze, x, y)
+        if self.type == "blinky": return walkable(player.x, player.y)
         if self.type == "pinky":
             tx, ty = player.x + 4 * player.dx, player.y + 4 * player.dy
-            return find_nearest_walkable_global(maze, tx, ty)
+            return walkable(tx, ty)
         if self.type == "inky":
             if blinky_ref:
                 vx = player.x + (player.x - blinky_ref.x)
                 vy = player.y + (player.y - blinky_ref.y)
-                return find_nearest_walkable_global(maze, vx, vy)
-            return find_nearest_walkable_global(maze, player.x, player.y)
+                return walkable(vx, vy)
+            return walkable(player.x, player.y)
         if self.type == "clyde":
             dist = abs(self.x - player.x) + abs(self.y - player.y)
-            return find_nearest_walkable_global(maze, player.x, player.y) if dist > 8 else (1, ROWS - 2)
+            return walkable(player.x, player.y) if dist > 8 else corners[2]
         return player.x, player.y
 
-    def draw(self, screen, frame):
+    def draw(self, screen, frame, camera=(0, 0)):
         offset = int(math.sin((frame + self.anim_phase) * 0.25) * 2)
-        cx, cy = self.get_pixel_pos(); cy += offset
+        cx, cy = self.get_pixel_pos(camera); cy += offset
         
         if self.state == "eaten":
-        
-            tomb_color = (120, 120, 120)
-            rect_w, rect_h = 14, 14
-            
-            pygame.draw.circle(screen, tomb_color, (cx, cy - 4), 7)
-            # Base retangular
-            pygame.draw.rect(screen, tomb_color, (cx - 7, cy - 4, 14, 12))
-            
-            rip_surf = self.font_rip.render("RIP", True, (0, 0, 0)) # Texto preto
-            rip_rect = rip_surf.get_rect(center=(cx, cy + 1))
-            screen.blit(rip_surf, rip_rect)
-            
+            s = sprite_cache.get(("tomb", "eaten", 7, 255, None), self._render_tomb)
+            screen.blit(s, (cx - CELL_SIZE, cy - CELL_SIZE))
             return
 
         if self.state == "vulnerable":
@@ -286,9 +363,34 @@ class Ghost(GameObject):
         else:
             color = self.color
         
-        pygame.draw.circle(screen, color, (cx, cy - 4), CELL_SIZE // 2 - 3)
-        pygame.draw.rect(screen, color, (cx - CELL_SIZE // 2 + 3, cy - 4, CELL_SIZE - 6, CELL_SIZE // 2))
+        s = sprite_cache.get(("ghost", color, CELL_SIZE // 2 - 3, 255, None), lambda: self._render_body(color))
+        screen.blit(s, (cx - CELL_SIZE, cy - CELL_SIZE))
+
+    @staticmethod
+    def _render_body(color):
+        s = pygame.Surface((2 * CELL_SIZE, 2 * CELL_SIZE), pygame.SRCALPHA)
+        cx = cy = CELL_SIZE
+        pygame.draw.circle(s, color, (cx, cy - 4), CELL_SIZE // 2 - 3)
+        pygame.draw.rect(s, color, (cx - CELL_SIZE // 2 + 3, cy - 4, CELL_SIZE - 6, CELL_SIZE // 2))
         
         for i in [-1, 1]:
-            pygame.draw.circle(screen, COLOR_WHITE, (cx + i * 4, cy - 6), 4)
-            pygame.draw.circle(screen, COLOR_BLACK, (cx + i * 4, cy - 6), 2)
\ No newline at end of file
+            pygame.draw.circle(s, COLOR_WHITE, (cx + i * 4, cy - 6), 4)
+            pygame.draw.circle(s, COLOR_BLACK, (cx + i * 4, cy - 6), 2)
+        return s
+
+    @classmethod
+    def _render_tomb(cls):
+        s = pygame.Surface((2 * CELL_SIZE, 2 * CELL_SIZE), pygame.SRCALPHA)
+        cx = cy = CELL_SIZE
+        tomb_color = (120, 120, 120)
+        
+        pygame.draw.circle(s, tomb_color, (cx, cy - 4), 7)
+        # Base retangular
+        pygame.draw.rect(s, tomb_color, (cx - 7, cy - 4, 14, 12))
+        
+        if cls.font_rip is None:
+            cls.font_rip = pygame.font.SysFont("Arial", 9, bold=True)
+        rip_surf = cls.font_rip.render("RIP", True, (0, 0, 0)) # Texto preto
+        rip_rect = rip_surf.get_rect(center=(cx, cy + 1))
+        s.blit(rip_surf, rip_rect)
+        return s
\ No newline at end of file
@@ -0,0 +1,81 @@
+"""
+Grade compacta do labirinto.
+
+Cada linha é um bytearray (1 byte por célula), então maze[y][x] continua
+funcionando como na lista de listas usada por Player.move e pelos testes.
+Escritas passam pelo MazeGrid, que mantém os contadores de pontos e as
+coordenadas das células especiais sem precisar varrer a grade.
+"""
+
+WALL, EMPTY, PELLET, SPECIAL, GHOST_HOUSE = 1, 0, 2, 3, 4
+
+class _Row(bytearray):
+    """Linha do labirinto: leitura direta do bytearray, escrita avisa a grade."""
+    __slots__ = ("grid", "y")
+
+    def __setitem__(self, x, value):
+        if isinstance(x, slice):
+            raise TypeError("A linha do labirinto não aceita atribuição por fatia")
+        if x < 0: x += len(self)
+        old = self[x]
+        if old != value:
+            bytearray.__setitem__(self, x, value)
+            self.grid._cell_changed(x, self.y, old, value)
+
+class MazeGrid:
+    """Labirinto com contagem incremental de pontos e células especiais em cache."""
+    def __init__(self, cells):
+        self.rows, self.cols = len(cells), len(cells[0])
+        self._rows = []
+        for y, values in enumerate(cells):
+            row = _Row(values)
+            row.grid, row.y = self, y
+            self._rows.append(row)
+        self.pellets = sum(row.count(PELLET) for row in self._rows)
+        self.specials = sum(row.count(SPECIAL) for row in self._rows)
+        self.houses = {(x, y) for y, row in enumerate(self._rows) for x, c in enumerate(row) if c == GHOST_HOUSE}
+        # Células alteradas desde a última leitura (usado pelo desenho incremental)
+        self.changes = []
+
+    def __getitem__(self, y):
+        return self._rows[y]
+
+    def __len__(self):
+        return self.rows
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def __eq__(self, other):
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    @property
+    def pellets_left(self):
+        """Pontos normais + especiais restantes, em O(1)."""
+        return self.pellets + self.specials
+
+    @property
+    def ghost_house(self):
+        """Primeira célula da casa dos fantasmas (na ordem de leitura), ou None."""
+        return min(self.houses, key=lambda p: (p[1], p[0])) if self.houses else None
+
+    def _cell_changed(self, x, y, old, new):
+        if old == PELLET: self.pellets -= 1
+        elif old == SPECIAL: self.specials -= 1
+        elif old == GHOST_HOUSE: self.houses.discard((x, y))
+        if new == PELLET: self.pellets += 1
+        elif new == SPECIAL: self.specials += 1
+        elif new == GHOST_HOUSE: self.houses.add((x, y))
+        self.changes.append((x, y))
+
+    def pop_changes(self):
+        """Retorna e limpa a lista de células alteradas."""
+        changes, self.changes = self.changes, []
+        return changes
+
+    def tobytes(self):
+        """Conteúdo da grade como bytes contíguos (linha a linha, uint8)."""
+        return b"".join(self._rows)
+
+    def to_list(self):
+        return [list(row) for row in self._rows]
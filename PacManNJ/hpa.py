@@ -0,0 +1,258 @@
+"""
+Busca de caminhos hierárquica (HPA*) para labirintos grandes do PacManNJ.
+
+bfs_next_step percorre o labirinto inteiro a cada consulta e o DistanceField
+guarda uma tabela do tamanho do labirinto por alvo: nenhum dos dois serve numa
+grade de milhões de células. HierarchicalPlanner divide a grade em clusters de
+tamanho_cluster x tamanho_cluster células e, na construção:
+
+- acha as entradas entre clusters vizinhos (trechos da borda caminháveis dos
+  dois lados; um nó no meio de cada trecho curto, um em cada ponta dos longos);
+- liga cada entrada à do outro lado com custo 1 e, dentro de cada cluster,
+  liga as entradas entre si com a distância de uma BFS restrita ao cluster;
+- guarda a distância de n_marcos entradas (marcos) a todas as outras no grafo
+  abstrato. Num labirinto a distância de Manhattan subestima muito o caminho;
+  pela desigualdade triangular, |d(marco, alvo) - d(marco, nó)| é um limite
+  inferior bem mais justo, e o A* expande muito menos nós (ALT).
+
+Uma consulta liga a origem e o alvo às entradas dos seus clusters (BFS dentro
+de um cluster só), roda A* no grafo abstrato e refina só o primeiro trecho do
+caminho, que é o que o fantasma precisa para dar o próximo passo. O caminho é
+quase mínimo (passa pelas entradas escolhidas), e seguir next_step a cada tick
+sempre chega ao alvo: o custo abstrato restante cai a cada passo.
+"""
+import heapq
+import collections
+from array import array
+from pathfinding import DIRECOES
+
+TAMANHO_CLUSTER = 16
+TRECHO_LONGO = 6  # Trechos de borda a partir deste tamanho ganham duas entradas
+N_MARCOS = 8
+CLUSTERS_GUARDADOS = 64  # Vizinhanças de cluster guardadas para as consultas (os fantasmas ficam perto uns dos outros)
+
+class HierarchicalPlanner:
+    """Grafo abstrato de entradas entre clusters com consultas A* (mesma interface next_step do DistanceField)."""
+    def __init__(self, maze, tamanho_cluster=TAMANHO_CLUSTER, n_marcos=N_MARCOS):
+        self.rows, self.cols = len(maze), len(maze[0])
+        self.k = tamanho_cluster
+        self.walkable = bytearray(1 if cell != 1 else 0 for row in maze for cell in row)
+        # As entradas são numeradas 0..n-1: célula de cada uma e entradas de cada cluster
+        self._celulas = array('i')
+        self._entradas = {}
+        self._cache_vizinhos = collections.OrderedDict()
+        arestas = []  # Durante a construção: lista de (entrada, custo) por entrada
+        self.buscas = 0  # Consultas A* feitas
+        self.expandidos = 0  # Nós abstratos expandidos por todas as consultas
+        self._achar_entradas(arestas)
+        celulas = self._celulas
+        for cluster, entradas in self._entradas.items():
+            vizinhos = self._vizinhos_cluster(cluster)
+            for e in entradas:
+                dist = self._bfs(celulas[e], vizinhos)[0]
+                arestas[e] += [(o, dist[celulas[o]]) for o in entradas if o != e and celulas[o] in dist]
+        # Grafo compacto: as arestas da entrada e são destino[inicio[e]:inicio[e + 1]], com o custo ao lado
+        self._inicio, self._destino, self._custo = array('i', [0]), array('i'), array('i')
+        for lista in arestas:
+            for v, c in lista: self._destino.append(v); self._custo.append(c)
+            self._inicio.append(len(self._destino))
+        del arestas
+        self._marcos = self._escolher_marcos(n_marcos)
+
+    def _cluster(self, i):
+        y, x = divmod(i, self.cols)
+        return x // self.k, y // self.k
+
+    def _limites(self, cluster):
+        cx, cy = cluster
+        k = self.k
+        return cx * k, cy * k, min((cx + 1) * k, self.cols), min((cy + 1) * k, self.rows)
+
+    def _arestas(self, u):
+        inicio, fim = self._inicio[u], self._inicio[u + 1]
+        return zip(self._destino[inicio:fim], self._custo[inicio:fim])
+
+    def _achar_entradas(self, arestas):
+        cols, k, livre = self.cols, self.k, self.walkable
+        ids = {}  # Célula -> número da entrada (só durante a construção)
+
+        def entrada(celula):
+            e = ids.get(celula)
+            if e is None:
+                e = ids[celula] = len(self._celulas)
+                self._celulas.append(celula)
+                arestas.append([])
+                self._entradas.setdefault(self._cluster(celula), []).append(e)
+            return e
+
+        # Bordas verticais (cluster à esquerda | à direita) e horizontais (em cima / embaixo)
+        bordas = [((x, y), (x + 1, y)) for x in range(k - 1, cols - 1, k) for y in range(self.rows)]
+        bordas += [((x, y), (x, y + 1)) for y in range(k - 1, self.rows - 1, k) for x in range(cols)]
+        trecho = []
+        for (ax, ay), (bx, by) in bordas + [((-1, -1), (-1, -1))]:  # Sentinela fecha o último trecho
+            a, b = ay * cols + ax, by * cols + bx
+            continua = ax >= 0 and livre[a] and livre[b]
+            # O trecho quebra ao mudar de cluster ao longo da borda ou de borda
+            if trecho and (not continua or self._cluster(a) != self._cluster(trecho[-1][0])
+                           or abs(a - trecho[-1][0]) not in (1, cols)):
+                if len(trecho) >= TRECHO_LONGO: escolhidas = (trecho[0], trecho[-1])
+                else: escolhidas = (trecho[len(trecho) // 2],)
+                for u, v in escolhidas:
+                    eu, ev = entrada(u), entrada(v)
+                    arestas[eu].append((ev, 1)); arestas[ev].append((eu, 1))
+                trecho = []
+            if continua: trecho.append((a, b))
+
+    def _vizinhos_cluster(self, cluster):
+        """Célula caminhável do cluster -> vizinhas caminháveis dentro dele (os últimos usados ficam guardados)."""
+        vizinhos = self._cache_vizinhos.get(cluster)
+        if vizinhos is not None:
+            self._cache_vizinhos.move_to_end(cluster)
+            return vizinhos
+        x0, y0, x1, y1 = self._limites(cluster)
+        cols, livre = self.cols, self.walkable
+        vizinhos = {}
+        for y in range(y0, y1):
+            for x in range(x0, x1):
+                i = y * cols + x
+                if livre[i]:
+                    vizinhos[i] = [ny * cols + nx for nx, ny in ((x + dx, y + dy) for dx, dy in DIRECOES)
+                                   if x0 <= nx < x1 and y0 <= ny < y1 and livre[ny * cols + nx]]
+        self._cache_vizinhos[cluster] = vizinhos
+        if len(self._cache_vizinhos) > CLUSTERS_GUARDADOS: self._cache_vizinhos.popitem(last=False)
+        return vizinhos
+
+    def _bfs(self, origem, vizinhos=None):
+        """BFS a partir de origem sem sair do cluster dela: (distâncias, pais)."""
+        if vizinhos is None: vizinhos = self._vizinhos_cluster(self._cluster(origem))
+        dist, pai = {origem: 0}, {origem: -1}
+        fronteira, d = [origem], 0
+        while fronteira:
+            d += 1
+            proxima = []
+            for atual in fronteira:
+                for viz in vizinhos[atual]:
+                    if viz not in dist:
+                        dist[viz], pai[viz] = d, atual
+                        proxima.append(viz)
+            fronteira = proxima
+        return dist, pai
+
+    def _dijkstra(self, origem):
+        """Distâncias no grafo abstrato da entrada origem a todas (-1 = inalcançável)."""
+        dist = array('i', [-1]) * len(self._celulas)
+        dist[origem] = 0
+        heap = [(0, origem)]
+        arestas = self._arestas
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d != dist[u]: continue
+            for v, c in arestas(u):
+                if dist[v] < 0 or d + c < dist[v]:
+                    dist[v] = d + c
+                    heapq.heappush(heap, (d + c, v))
+        return dist
+
+    def _escolher_marcos(self, n):
+        """Marcos espalhados: cada um é a entrada mais longe dos já escolhidos."""
+        if not self._celulas: return []
+        marcos = []
+        longe = self._dijkstra(0)
+        for _ in range(n):
+            m = max(range(len(longe)), key=longe.__getitem__)
+            if longe[m] <= 0: break
+            dist = self._dijkstra(m)
+            marcos.append(dist)
+            longe = array('i', (min(a, b) if b >= 0 else a for a, b in zip(longe, dist)))
+        return marcos
+
+    def _indice(self, pos):
+        x, y = pos
+        if 0 <= x < self.cols and 0 <= y < self.rows and self.walkable[y * self.cols + x]:
+            return y * self.cols + x
+        return -1
+
+    def _buscar(self, s, t):
+        """A* abstrato da célula s à célula t: (custo, nós do caminho, pais da BFS de s) ou None sem caminho."""
+        self.buscas += 1
+        celulas = self._celulas
+        origem, alvo = len(celulas), len(celulas) + 1  # Números temporários de s e t no grafo
+        dist_s, pai_s = self._bfs(s)
+        saida = [(e, dist_s[celulas[e]]) for e in self._entradas.get(self._cluster(s), ()) if celulas[e] in dist_s]
+        if t in dist_s: saida.append((alvo, dist_s[t]))
+        dist_t = self._bfs(t)[0]
+        chegada = {e: dist_t[celulas[e]] for e in self._entradas.get(self._cluster(t), ()) if celulas[e] in dist_t}
+        # Distância de cada marco ao alvo passando pelas entradas do cluster dele
+        limites = []
+        for dist in self._marcos:
+            ate_alvo = [dist[e] + c for e, c in chegada.items() if dist[e] >= 0]
+            if ate_alvo: limites.append((min(ate_alvo), dist))
+        cols = self.cols
+        ty, tx = divmod(t, cols)
+
+        def h(e):
+            c = celulas[e]
+            melhor = abs(c % cols - tx) + abs(c // cols - ty)
+            for d_alvo, dist in limites:
+                d = dist[e]
+                if d >= 0 and abs(d_alvo - d) > melhor: melhor = abs(d_alvo - d)
+            return melhor
+
+        custo, pai = {origem: 0}, {origem: -1}
+        heap = [(0, 0, origem)]
+        arestas = self._arestas
+        while heap:
+            _, g, u = heapq.heappop(heap)
+            if g != custo[u]: continue
+            if u == alvo: break
+            self.expandidos += 1
+            vizinhos = saida if u == origem else arestas(u)
+            if u in chegada: vizinhos = [*vizinhos, (alvo, chegada[u])]
+            for v, c in vizinhos:
+                ng = g + c
+                if ng < custo.get(v, ng + 1):
+                    custo[v], pai[v] = ng, u
+                    heapq.heappush(heap, (ng + (0 if v == alvo else h(v)), ng, v))
+        else:
+            return None
+        caminho = [alvo]
+        while caminho[-1] != origem: caminho.append(pai[caminho[-1]])
+        caminho = [s] + [celulas[e] for e in reversed(caminho[1:-1])] + [t]
+        return custo[alvo], caminho, pai_s
+
+    def begin_tick(self):
+        """Sem tabelas entre ticks: existe só para ter a interface do GhostPlanner."""
+
+    def next_step(self, start, target):
+        """(dx, dy) do próximo passo de start a target, refinando só o primeiro trecho do caminho abstrato."""
+        s, t = self._indice(start), self._indice(target)
+        if s < 0 or t < 0 or s == t: return (0, 0)
+        busca = self._buscar(s, t)
+        if busca is None: return (0, 0)
+        _, caminho, pai_s = busca
+        passo = caminho[1]
+        if passo == s: passo = caminho[2]  # A origem já é uma entrada: o trecho até ela tem custo 0
+        if passo in pai_s:  # Mesmo cluster: volta pelos pais da BFS até a célula vizinha da origem
+            while pai_s[passo] != s: passo = pai_s[passo]
+        return (passo % self.cols - s % self.cols, passo // self.cols - s // self.cols)
+
+    def distance(self, start, target):
+        """Custo do caminho hierárquico de start a target (>= a distância mínima), ou -1 se não houver."""
+        s, t = self._indice(start), self._indice(target)
+        if s < 0 or t < 0: return -1
+        if s == t: return 0
+        busca = self._buscar(s, t)
+        return -1 if busca is None else busca[0]
+
+    def stats(self):
+        """Tamanho do grafo abstrato e trabalho médio por consulta."""
+        return {
+            "clusters": len(self._entradas),
+            "entradas": len(self._celulas),
+            "arestas": len(self._destino),
+            "marcos": len(self._marcos),
+            # Memória das tabelas guardadas (grade caminhável, grafo abstrato e distâncias dos marcos)
+            "bytes": sum(memoryview(a).nbytes for a in
+                         [self.walkable, self._celulas, self._inicio, self._destino, self._custo] + self._marcos),
+            "expandidos_por_busca": self.expandidos / max(self.buscas, 1),
+        }
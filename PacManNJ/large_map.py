@@ -0,0 +1,433 @@
+"""
+Modo de mapa grande do PacManNJ.
+
+ChunkedMaze monta um labirinto de milhões de células a partir de pedaços
+(chunks) de TAMANHO_CHUNK x TAMANHO_CHUNK células. Cada pedaço é um
+gerar_labirinto próprio, com seed derivada da seed do mapa e da posição do
+pedaço, e as bordas entre pedaços vizinhos ganham aberturas sorteadas a partir
+da seed da borda (os dois lados concordam sem precisar um do outro). Os
+pedaços são gerados só quando alguém os lê e ficam num arquivo mapeado em
+memória (mmap): o sistema operacional mantém em RAM só as páginas em uso.
+
+LargeMapEngine roda a lógica do jogo sobre esse labirinto. Não há tabelas
+pré-calculadas do mapa inteiro (DistanceField, NearestWalkableMap): os
+fantasmas usam uma BFS limitada a uma janela ao redor deles, e só os
+fantasmas perto da câmera (que segue o jogador) são simulados a cada tick;
+os de longe ficam parados até a câmera chegar perto. Os alvos dos fantasmas
+(inclusive os cantos de fuga e o Blinky de referência de Inky) ficam dentro
+da região ativa, então só ela é lida e nenhum pedaço fora dela é gerado.
+Cada pedaço gerado além do inicial traz um fantasma no centro. Assim o
+trabalho por tick e a memória dependem do tamanho da tela, não do mapa.
+
+O desenho (câmera, só os pedaços visíveis) fica em StreamingGame
+(streaming_game.py) e ChunkLayer (render.py); este módulo não carrega pygame.
+"""
+import os
+import mmap
+import random
+import tempfile
+import collections
+from config import *
+from grid import WALL, PELLET, SPECIAL
+from maze_generator import gerar_labirinto
+from pathfinding import DIRECOES, find_nearest_walkable_global
+from engine import GameEngine
+from simulation import HeadlessGame
+from entities import Ghost
+
+TAMANHO_CHUNK = 31  # Ímpar: gerar_labirinto só gera dimensões ímpares
+RAIO_BUSCA = 40  # Passos que a BFS local dos fantasmas explora
+CHUNKS_ATIVOS = 1  # Pedaços além dos visíveis em que os fantasmas andam a cada tick
+
+class _ChunkRow:
+    """Linha y do ChunkedMaze, para manter maze[y][x] funcionando como na MazeGrid."""
+    __slots__ = ("maze", "y")
+
+    def __init__(self, maze, y):
+        self.maze, self.y = maze, y
+
+    def __getitem__(self, x):
+        return self.maze.cell(x, self.y)
+
+    def __setitem__(self, x, value):
+        self.maze.set_cell(x, self.y, value)
+
+    def __len__(self):
+        return self.maze.cols
+
+class ChunkedMaze:
+    """
+    Labirinto de chunks_y x chunks_x pedaços, gerados sob demanda e guardados num
+    arquivo mapeado em memória (path; padrão: arquivo temporário apagado no close()).
+    Tem a interface de leitura e escrita da MazeGrid usada pela lógica do jogo.
+    """
+    def __init__(self, chunks_x, chunks_y, seed=0, path=None):
+        self.chunks_x, self.chunks_y = chunks_x, chunks_y
+        self.seed = seed
+        self.chunk_size = TAMANHO_CHUNK
+        self.rows, self.cols = chunks_y * TAMANHO_CHUNK, chunks_x * TAMANHO_CHUNK
+        self.area_chunk = TAMANHO_CHUNK * TAMANHO_CHUNK
+        self._temporario = path is None
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix="pacmannj-mapa-", suffix=".bin")
+            os.close(fd)
+        self.path = path
+        with open(path, "r+b" if os.path.exists(path) else "w+b") as f:
+            f.truncate(chunks_x * chunks_y * self.area_chunk)  # Arquivo esparso: só os pedaços gerados ocupam disco
+        self._arquivo = open(path, "r+b")
+        self._mm = mmap.mmap(self._arquivo.fileno(), 0)
+        self.gerados = bytearray(chunks_x * chunks_y)
+        self.novos_chunks = []  # Pedaços gerados desde a última leitura (LargeMapEngine põe fantasmas neles)
+        self.pellets = self.specials = 0
+        self.eaten = 0  # Pontos (normais e especiais) que viraram célula vazia
+        self.changes = []
+        cx, cy = TAMANHO_CHUNK // 2, TAMANHO_CHUNK // 2
+        self.ghost_house = (cx, cy)  # Centro do pedaço (0, 0)
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, y):
+        return _ChunkRow(self, y)
+
+    @property
+    def pellets_left(self):
+        """Pontos restantes nos pedaços já gerados."""
+        return self.pellets + self.specials
+
+    def _rng_borda(self, cx, cy, lado):
+        return random.Random(f"{self.seed}:{cx}:{cy}:{lado}")
+
+    def _aberturas(self, cx, cy, lado):
+        """Linhas (borda leste, lado 'h') ou colunas (borda sul, lado 'v') abertas entre o pedaço e o vizinho."""
+        rng = self._rng_borda(cx, cy, lado)
+        return rng.sample(range(1, TAMANHO_CHUNK - 1, 2), 2)
+
+    def _gerar(self, cx, cy):
+        s = TAMANHO_CHUNK
+        maze = gerar_labirinto(s, s, rng=random.Random(f"{self.seed}:{cx}:{cy}"))
+        if (cx, cy) != (0, 0): maze[s // 2][s // 2] = 0  # A casa dos fantasmas existe só no pedaço inicial
+        # Aberturas nas quatro bordas; as de oeste e norte são as bordas leste/sul dos vizinhos
+        if cx + 1 < self.chunks_x:
+            for r in self._aberturas(cx, cy, "h"): maze[r][s - 1] = PELLET
+        if cx > 0:
+            for r in self._aberturas(cx - 1, cy, "h"): maze[r][0] = PELLET
+        if cy + 1 < self.chunks_y:
+            for c in self._aberturas(cx, cy, "v"): maze[s - 1][c] = PELLET
+        if cy > 0:
+            for c in self._aberturas(cx, cy - 1, "v"): maze[0][c] = PELLET
+        dados = b"".join(bytes(row) for row in maze)
+        inicio = (cy * self.chunks_x + cx) * self.area_chunk
+        self._mm[inicio:inicio + self.area_chunk] = dados
+        self.pellets += dados.count(PELLET)
+        self.specials += dados.count(SPECIAL)
+        self.gerados[cy * self.chunks_x + cx] = 1
+        self.novos_chunks.append((cx, cy))
+
+    def chunk(self, cx, cy):
+        """Garante que o pedaço (cx, cy) existe e retorna o deslocamento dele no arquivo."""
+        i = cy * self.chunks_x + cx
+        if not self.gerados[i]: self._gerar(cx, cy)
+        return i * self.area_chunk
+
+    def _offset(self, x, y):
+        cy, ly = divmod(y, TAMANHO_CHUNK)
+        cx, lx = divmod(x, TAMANHO_CHUNK)
+        return self.chunk(cx, cy) + ly * TAMANHO_CHUNK + lx
+
+    def cell(self, x, y):
+        if not (0 <= x < self.cols and 0 <= y < self.rows): raise IndexError((x, y))
+        return self._mm[self._offset(x, y)]
+
+    def set_cell(self, x, y, value):
+        if not (0 <= x < self.cols and 0 <= y < self.rows): raise IndexError((x, y))
+        i = self._offset(x, y)
+        old = self._mm[i]
+        if old == value: return
+        self._mm[i] = value
+        if old == PELLET: self.pellets -= 1
+        elif old == SPECIAL: self.specials -= 1
+        if old in (PELLET, SPECIAL) and value not in (PELLET, SPECIAL): self.eaten += 1
+        if value == PELLET: self.pellets += 1
+        elif value == SPECIAL: self.specials += 1
+        self.changes.append((x, y))
+
+    def chunk_bytes(self, cx, cy):
+        """Conteúdo do pedaço (cx, cy) linha a linha, um byte por célula (gera se preciso)."""
+        inicio = self.chunk(cx, cy)
+        return self._mm[inicio:inicio + self.area_chunk]
+
+    def pop_changes(self):
+        changes, self.changes = self.changes, []
+        return changes
+
+    def pop_new_chunks(self):
+        novos, self.novos_chunks = self.novos_chunks, []
+        return novos
+
+    def generate_region(self, x0, y0, x1, y1):
+        """Gera os pedaços que cobrem as células x0..x1, y0..y1 (limitadas ao mapa)."""
+        s = TAMANHO_CHUNK
+        for cy in range(max(y0, 0) // s, min(y1, self.rows - 1) // s + 1):
+            for cx in range(max(x0, 0) // s, min(x1, self.cols - 1) // s + 1):
+                self.chunk(cx, cy)
+
+    def close(self):
+        if self._mm is None: return
+        self._mm.close(); self._arquivo.close()
+        self._mm = None
+        if self._temporario: os.remove(self.path)
+
+class LocalPlanner:
+    """
+    Próximo passo por uma BFS limitada a RAIO_BUSCA passos a partir do fantasma
+    (mesma interface next_step do DistanceField). A BFS roda sobre uma grade
+    plana dos pedaços carregados ao redor da câmera, com os vizinhos de cada
+    célula já listados, refeita só quando a região muda. Se o alvo está além do
+    raio, o fantasma anda até a célula alcançada mais próxima dele; fora da
+    região não há caminho ((0, 0)) e o fantasma só vagueia.
+    """
+    def __init__(self, maze, raio=RAIO_BUSCA):
+        self.maze, self.raio = maze, raio
+        self.regiao = None
+        self.buscas = 0
+
+    def set_region(self, cx0, cy0, cx1, cy1):
+        """Monta a grade da busca a partir dos pedaços cx0..cx1, cy0..cy1 (já gerados)."""
+        if self.regiao == (cx0, cy0, cx1, cy1): return
+        self.regiao = (cx0, cy0, cx1, cy1)
+        s = self.maze.chunk_size
+        self.x0, self.y0 = cx0 * s, cy0 * s
+        w, h = self.largura, self.altura = (cx1 - cx0 + 1) * s, (cy1 - cy0 + 1) * s
+        livre = self.livre = bytearray(w * h)
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                dados = self.maze.chunk_bytes(cx, cy).translate(_CAMINHAVEL)
+                for ly in range(s):
+                    i = ((cy - cy0) * s + ly) * w + (cx - cx0) * s
+                    livre[i:i + s] = dados[ly * s:(ly + 1) * s]
+        # Como no DistanceField: para cada célula, (vizinho caminhável, código da direção)
+        deltas = [(code, dx, dy, dx + dy * w) for code, (dx, dy) in enumerate(DIRECOES, 1)]
+        vazio = ()
+        self._vizinhos = [
+            tuple((i + d, code) for code, dx, dy, d in deltas
+                  if 0 <= i % w + dx < w and 0 <= i // w + dy < h and livre[i + d]) if livre[i] else vazio
+            for i in range(w * h)
+        ]
+
+    def begin_tick(self):
+        """Sem tabelas entre ticks: existe só para ter a interface do GhostPlanner."""
+
+    def next_step(self, start, target):
+        if start == target or self.regiao is None: return (0, 0)
+        w, h = self.largura, self.altura
+        sx, sy = start[0] - self.x0, start[1] - self.y0
+        if not (0 <= sx < w and 0 <= sy < h): return (0, 0)
+        self.buscas += 1
+        # Alvo projetado na região: fora dela não há nada a buscar
+        tx, ty = min(max(target[0] - self.x0, 0), w - 1), min(max(target[1] - self.y0, 0), h - 1)
+        vizinhos = self._vizinhos
+        origem = sy * w + sx
+        primeiro = {origem: 0}  # Célula -> código da primeira direção do caminho até ela
+        fronteira = [origem]
+        melhor, melhor_dist = origem, abs(sx - tx) + abs(sy - ty)
+        for _ in range(self.raio):
+            proxima = []
+            for atual in fronteira:
+                codigo_pai = primeiro[atual]
+                for viz, codigo in vizinhos[atual]:
+                    if viz not in primeiro:
+                        primeiro[viz] = codigo_pai or codigo
+                        proxima.append(viz)
+            if not proxima: break
+            for i in proxima:
+                dist = abs(i % w - tx) + abs(i // w - ty)
+                if dist < melhor_dist:
+                    melhor, melhor_dist = i, dist
+            if melhor_dist == 0: break
+            fronteira = proxima
+        codigo = primeiro[melhor]
+        return DIRECOES[codigo - 1] if codigo else (0, 0)
+
+# Tabela para bytes.translate: parede -> 0, qualquer outra célula -> 1
+_CAMINHAVEL = bytes(0 if c == WALL else 1 for c in range(256))
+
+class LocalNearest:
+    """
+    Célula caminhável mais próxima dentro da região carregada do LocalPlanner:
+    o ponto é projetado na região e a BFS anda só na grade dela, então nunca
+    gera pedaços. corners são os cantos de fuga (e o de Clyde) da região.
+    """
+    def __init__(self, planner):
+        self.planner = planner
+        self._cantos = (None, None)  # (região, cantos)
+
+    def lookup(self, x, y):
+        p = self.planner
+        w, h = p.largura, p.altura
+        lx = min(max(int(x) - p.x0, 0), w - 1)
+        ly = min(max(int(y) - p.y0, 0), h - 1)
+        livre = p.livre
+        inicio = ly * w + lx
+        q, vistos = collections.deque([inicio]), {inicio}
+        while q:
+            atual = q.popleft()
+            if livre[atual]: return atual % w + p.x0, atual // w + p.y0
+            ax, ay = atual % w, atual // w
+            for dx, dy in DIRECOES:
+                nx, ny = ax + dx, ay + dy
+                if 0 <= nx < w and 0 <= ny < h and ny * w + nx not in vistos:
+                    vistos.add(ny * w + nx); q.append(ny * w + nx)
+        return lx + p.x0, ly + p.y0
+
+    @property
+    def corners(self):
+        p = self.planner
+        regiao, cantos = self._cantos
+        if regiao != p.regiao:
+            x1, y1 = p.x0 + p.largura - 2, p.y0 + p.altura - 2
+            # Mesma ordem de CANTOS: o terceiro (embaixo à esquerda) é o de Clyde
+            cantos = [self.lookup(x, y) for x, y in ((p.x0 + 1, p.y0 + 1), (x1, p.y0 + 1), (p.x0 + 1, y1), (x1, y1))]
+            self._cantos = (p.regiao, cantos)
+        return cantos
+
+class LargeMapEngine(GameEngine):
+    """
+    GameEngine sobre um ChunkedMaze de chunks x chunks pedaços. A câmera (em
+    células) segue o jogador; a região ativa são os pedaços que a tela cobre
+    mais CHUNKS_ATIVOS pedaços em volta. Ela é gerada antes de o jogador chegar,
+    e só os fantasmas dentro dela são simulados: cada pedaço guarda a lista dos
+    seus fantasmas, e o tick só passa pelas listas da região.
+    maze_pool e swarm não existem aqui (o labirinto é gerado por pedaço e os
+    fantasmas andam pelo LocalPlanner); passá-los levanta ValueError.
+    """
+    def __init__(self, player_name, seed=None, record=False, maze_pool=None, profiler=None, n_ghosts=4, swarm=False,
+                 chunks=64, viewport=(COLS, ROWS)):
+        if maze_pool is not None: raise ValueError("O mapa grande gera o labirinto por pedaço: maze_pool não se aplica")
+        if swarm: raise ValueError("O mapa grande simula os fantasmas por região: swarm não se aplica")
+        self.chunks = chunks
+        self.viewport = viewport
+        self.camera = (0, 0)
+        self.region = None
+        self.active_ghosts = 0
+        super().__init__(player_name, seed, record, None, profiler, n_ghosts, False)
+
+    def _instrument(self):
+        p = self.profiler
+        p.instrument(self, ["_update_player", "_update_ghosts", "_check_collisions"])
+        p.track("buscas_bfs", lambda: self.planner.buscas)
+        p.track("fantasmas_ativos", lambda: self.active_ghosts)
+        p.track("chunks_gerados", lambda: sum(self.maze.gerados))
+
+    def _new_game(self):
+        if getattr(self, "maze", None) is not None: self.maze.close()
+        self.maze = ChunkedMaze(self.chunks, self.chunks, self.seed)
+        self.rng = random.Random(self.seed + 1)
+        self.distance_field = None  # Sem tabelas do mapa inteiro: os fantasmas usam o LocalPlanner
+        self.planner = LocalPlanner(self.maze)
+        self.nearest_walkable = LocalNearest(self.planner)
+        self.region = None
+        self.maze.chunk(0, 0)
+        self._create_entities()
+        self._rebuild_chunk_lists()
+        self.maze.pop_new_chunks()
+        self.lives = INITIAL_LIVES
+        self.game_over = False; self.win = False; self.started = False
+        self.is_paused_for_death = False; self.death_countdown = 0
+        self.super_intro_countdown = 0; self.player_move_timer = 0; self.ghost_move_timer = 0
+        self._update_camera()
+
+    def _player_start(self):
+        # Fora da região ativa (início do jogo, volta após uma morte): a busca fica no pedaço (0, 0), que sempre existe
+        return find_nearest_walkable_global(self.maze, COLS // 2, ROWS - 5)
+
+    def _update_camera(self):
+        """Centraliza a câmera no jogador (sem sair do mapa) e gera os pedaços ao redor da área ativa."""
+        w, h = self.viewport
+        x = min(max(self.player.x - w // 2, 0), max(self.maze.cols - w, 0))
+        y = min(max(self.player.y - h // 2, 0), max(self.maze.rows - h, 0))
+        self.camera = (x, y)
+        s, ultimo = TAMANHO_CHUNK, self.chunks - 1
+        region = (max(x // s - CHUNKS_ATIVOS, 0), max(y // s - CHUNKS_ATIVOS, 0),
+                  min((x + w - 1) // s + CHUNKS_ATIVOS, ultimo), min((y + h - 1) // s + CHUNKS_ATIVOS, ultimo))
+        if region == self.region: return
+        self.region = region
+        cx0, cy0, cx1, cy1 = region
+        self.maze.generate_region(cx0 * s, cy0 * s, (cx1 + 1) * s - 1, (cy1 + 1) * s - 1)
+        self.planner.set_region(*region)
+        for cx, cy in self.maze.pop_new_chunks(): self._spawn_chunk_ghost(cx, cy)
+
+    def _spawn_chunk_ghost(self, cx, cy):
+        """Fantasma que mora no centro de um pedaço novo; já começa perseguindo."""
+        tipo, cor = [("blinky", COLOR_BLINKY), ("pinky", COLOR_PINKY), ("inky", COLOR_INKY), ("clyde", COLOR_CLYDE)][len(self.ghosts) % 4]
+        s = TAMANHO_CHUNK
+        g = Ghost(cx * s + s // 2, cy * s + s // 2, cor, tipo, self.rng)
+        g.state = "chase"
+        self.ghosts.append(g)
+        self.ghosts_by_chunk[(cx, cy)].append(g)
+        self.occupancy.add(g)
+
+    def _rebuild_chunk_lists(self):
+        s = TAMANHO_CHUNK
+        self.ghosts_by_chunk = collections.defaultdict(list)
+        for g in self.ghosts: self.ghosts_by_chunk[(g.x // s, g.y // s)].append(g)
+
+    def region_ghosts(self):
+        """Fantasmas dos pedaços da região ativa, sem passar pelos de fora."""
+        cx0, cy0, cx1, cy1 = self.region
+        por_chunk = self.ghosts_by_chunk
+        return [g for cy in range(cy0, cy1 + 1) for cx in range(cx0, cx1 + 1) for g in por_chunk.get((cx, cy), ())]
+
+    def _in_region(self, x, y):
+        cx0, cy0, cx1, cy1 = self.region
+        s = TAMANHO_CHUNK
+        return cx0 * s < x < (cx1 + 1) * s - 1 and cy0 * s < y < (cy1 + 1) * s - 1
+
+    def is_active(self, g):
+        """
+        O fantasma está na região ativa (pedaços visíveis e vizinhos), sem contar a
+        última célula da borda: os vizinhos que ele consulta ao andar já estão gerados.
+        """
+        return self._in_region(g.x, g.y)
+
+    def _update_player(self):
+        super()._update_player()
+        self._update_camera()
+
+    def _update_ghosts(self):
+        for i, g in enumerate(self.ghosts[:self.n_ghosts]):
+            if g.state == "house" and self.frame > ((i % 4) * 90 + 60 + (i // 4) * GHOST_MOVE_DELAY): g.state = "chase"
+        self.ghost_move_timer += 1
+        if self.ghost_move_timer < GHOST_MOVE_DELAY: return
+        self.ghost_move_timer = 0
+        ativos = [g for g in self.region_ghosts() if self.is_active(g)]
+        # Inky usa um Blinky da região: o original pode estar dormindo longe, no pedaço (0, 0)
+        blinky = next((g for g in ativos if g.type == "blinky"), None)
+        s = TAMANHO_CHUNK
+        for g in ativos:
+            if g.state == "eaten" and not self._in_region(g.spawn_x, g.spawn_y):
+                # A casa ficou fora da região: o fantasma volta para o centro do pedaço onde está
+                g.spawn_x, g.spawn_y = self.nearest_walkable.lookup(g.x // s * s + s // 2, g.y // s * s + s // 2)
+            antes = (g.x // s, g.y // s)
+            g.update(self.maze, self.player, self.ghosts, blinky, self.planner, self.nearest_walkable, self.occupancy)
+            if (g.x // s, g.y // s) != antes:
+                self.ghosts_by_chunk[antes].remove(g)
+                self.ghosts_by_chunk[(g.x // s, g.y // s)].append(g)
+        self.active_ghosts = len(ativos)
+
+    def _reset_positions(self):
+        super()._reset_positions()
+        for g in self.ghosts[self.n_ghosts:]: g.state = "chase"
+        self._rebuild_chunk_lists()
+        self._update_camera()
+
+    def close(self):
+        self.maze.close()
+
+class HeadlessLargeMap(HeadlessGame, LargeMapEngine):
+    """Mapa grande sem tela (testes e benchmarks): HeadlessGame com a lógica do LargeMapEngine."""
+    def result(self):
+        r = super().result()
+        r["pellets_eaten"] = self.maze.eaten  # Os pedaços novos trazem pontos: a contagem inicial não serve
+        r["chunks"] = sum(self.maze.gerados)
+        return r
@@ -0,0 +1,21 @@
+"""
+Importação adiada de módulos pesados (pygame), sem dependências: a lógica do
+jogo pode referenciar o módulo sem carregá-lo, e simulações sem tela nunca
+pagam o custo do import.
+"""
+import importlib
+
+class _LazyModule:
+    """Módulo que só é importado no primeiro acesso a um atributo."""
+    def __init__(self, nome):
+        self._nome = nome
+        self._modulo = None
+
+    def __getattr__(self, atributo):
+        if self._modulo is None:
+            self._modulo = importlib.import_module(self._nome)
+        return getattr(self._modulo, atributo)
+
+def lazy_import(nome):
+    """Módulo nome, importado só quando um atributo dele for usado."""
+    return _LazyModule(nome)
@@ -1,11 +1,22 @@
 import random
 from config import ROWS, COLS
 
-def gerar_labirinto(linhas=ROWS, colunas=COLS):
-    """Gera um labirinto aleatório usando DFS e remove becos sem saída."""
+# Muda sempre que a mesma seed passar a gerar outro labirinto (invalida caches)
+VERSAO_GERADOR = 2
+
+def gerar_labirinto(linhas=ROWS, colunas=COLS, rng=None):
+    """
+    Gera um labirinto aleatório usando DFS e remove becos sem saída.
+    rng: gerador random.Random do jogo (padrão: módulo random global).
+
+    A DFS usa uma pilha explícita (sem recursão), então não esbarra no limite de
+    recursão do Python em grades grandes, e os becos são eliminados numa única
+    passada guiada por uma lista de trabalho. O tempo é linear no número de células.
+    """
+    if rng is None: rng = random
     if linhas % 2 == 0: linhas -= 1
     if colunas % 2 == 0: colunas -= 1
-    maze = [[1 for _ in range(colunas)] for _ in range(linhas)]
+    maze = [[1] * colunas for _ in range(linhas)]
 
     def vizinhos_validos(x, y):
         v = []
@@ -13,47 +24,49 @@ def gerar_labirinto(linhas=ROWS, colunas=COLS):
         if x < colunas - 2: v.append((x + 2, y))
         if y > 1: v.append((x, y - 2))
         if y < linhas - 2: v.append((x, y + 2))
-        random.shuffle(v)
-        return v
+        rng.shuffle(v)
+        return iter(v)
 
-    def dfs(x, y):
-        maze[y][x] = 0
-        for nx, ny in vizinhos_validos(x, y):
+    # Mesma ordem de visita (e de sorteios) da DFS recursiva: cada célula
+    # embaralha seus vizinhos ao ser visitada e a pilha guarda onde ela parou.
+    start_x = rng.randrange(1, colunas, 2)
+    start_y = rng.randrange(1, linhas, 2)
+    maze[start_y][start_x] = 0
+    pilha = [(start_x, start_y, vizinhos_validos(start_x, start_y))]
+    while pilha:
+        x, y, vizinhos = pilha[-1]
+        for nx, ny in vizinhos:
             if maze[ny][nx] == 1:
                 maze[(y + ny) // 2][(x + nx) // 2] = 0
-                dfs(nx, ny)
+                maze[ny][nx] = 0
+                pilha.append((nx, ny, vizinhos_validos(nx, ny)))
+                break
+        else:
+            pilha.pop()
 
-    start_x = random.randrange(1, colunas, 2)
-    start_y = random.randrange(1, linhas, 2)
-    dfs(start_x, start_y)
+    def abertos(x, y):
+        return (maze[y - 1][x] == 0) + (maze[y + 1][x] == 0) + (maze[y][x - 1] == 0) + (maze[y][x + 1] == 0)
 
-    alterado = True
-    while alterado:
-        alterado = False
-        for y in range(1, linhas - 1):
-            for x in range(1, colunas - 1):
-                if maze[y][x] == 0:
-                    vizinhos = sum(
-                        maze[yy][xx] == 0
-                        for yy, xx in [(y - 1, x), (y + 1, x), (y, x - 1), (y, x + 1)]
-                    )
-                    if vizinhos <= 1:
-                        direcoes = [(0, 1), (0, -1), (1, 0), (-1, 0)]
-                        random.shuffle(direcoes)
-                        for dx, dy in direcoes:
-                            nx, ny = x + dx, y + dy
-                            if 0 < nx < colunas - 1 and 0 < ny < linhas - 1 and maze[ny][nx] == 1:
-                                maze[ny][nx] = 0
-                                alterado = True
-                                break
+    # Abrir uma parede só aumenta o número de vizinhos abertos das outras células,
+    # então o único beco novo possível é a própria célula aberta: ela entra na lista.
+    becos = [(x, y) for y in range(1, linhas - 1) for x in range(1, colunas - 1)
+             if maze[y][x] == 0 and abertos(x, y) <= 1]
+    while becos:
+        x, y = becos.pop()
+        if abertos(x, y) > 1: continue
+        direcoes = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+        rng.shuffle(direcoes)
+        for dx, dy in direcoes:
+            nx, ny = x + dx, y + dy
+            if 0 < nx < colunas - 1 and 0 < ny < linhas - 1 and maze[ny][nx] == 1:
+                maze[ny][nx] = 0
+                if abertos(nx, ny) <= 1: becos.append((nx, ny))
+                break
 
-    for y in range(linhas):
-        for x in range(colunas):
-            if maze[y][x] == 0:
-                if random.random() < 0.02:
-                    maze[y][x] = 3
-                else:
-                    maze[y][x] = 2
+    for row in maze:
+        for x, cell in enumerate(row):
+            if cell == 0:
+                row[x] = 3 if rng.random() < 0.02 else 2
 
     mid_y, mid_x = linhas // 2, colunas // 2
     for i in range(-2, 3):
@@ -0,0 +1,171 @@
+"""
+Reserva de labirintos pré-gerados do PacManNJ.
+
+Um labirinto depende só da seed e do tamanho, então pode ser gerado antes de
+ser preciso e reaproveitado depois. MazePool mantém alguns labirintos prontos
+em memória, gerados por uma thread em segundo plano, e guarda cada labirinto
+pedido por seed no banco (tabela 'labirintos' do scores.db) como um blob de 1
+byte por célula, indexado por (seed, linhas, colunas, versão do gerador).
+
+Só os labirintos pedidos por seed (lotes, replays) vão para o disco: os da
+reserva usam seeds sorteadas, que quase nunca se repetem, e gravá-los só faria
+o banco crescer a cada sessão. A tabela guarda no máximo max_cache labirintos
+e descarta os gravados há mais tempo.
+"""
+import random
+import sqlite3
+import threading
+import collections
+from config import ROWS, COLS, DATABASE_FILE
+from maze_generator import gerar_labirinto, VERSAO_GERADOR
+
+MAX_CACHE = 1000  # Labirintos guardados no banco
+
+def empacotar(maze):
+    """Labirinto (lista de linhas) -> blob com um uint8 por célula."""
+    return b"".join(bytes(row) for row in maze)
+
+def desempacotar(blob, colunas):
+    return [list(blob[i:i + colunas]) for i in range(0, len(blob), colunas)]
+
+def _tamanho_real(linhas, colunas):
+    """gerar_labirinto usa dimensões ímpares; a chave do cache usa as dimensões finais."""
+    return linhas - (linhas % 2 == 0), colunas - (colunas % 2 == 0)
+
+class MazePool:
+    """
+    Labirintos prontos por seed. get(seed) devolve uma cópia nova (o jogo altera
+    o labirinto ao comer pontos); take_seed() escolhe uma seed já gerada.
+    """
+    def __init__(self, linhas=ROWS, colunas=COLS, tamanho=4, db_path=DATABASE_FILE, background=True, max_cache=MAX_CACHE):
+        self.linhas, self.colunas = linhas, colunas
+        self.tamanho = tamanho
+        self.db_path = db_path
+        self.max_cache = max_cache
+        self._prontos = collections.OrderedDict()  # seed -> blob, em ordem de geração
+        self._lock = threading.Lock()
+        self._pedido = threading.Condition(self._lock)
+        self._db_lock = threading.Lock()
+        self._conn = None
+        self._worker = None
+        self._parar = False
+        self._abrir_banco()
+        if background: self.start()
+
+    def _abrir_banco(self):
+        if self.db_path is None: return
+        try:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=5)
+            self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS labirintos (
+                seed INTEGER NOT NULL,
+                linhas INTEGER NOT NULL,
+                colunas INTEGER NOT NULL,
+                versao INTEGER NOT NULL,
+                dados BLOB NOT NULL,
+                PRIMARY KEY (seed, linhas, colunas, versao)
+            );
+            """)
+            self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"Aviso: cache de labirintos desativado ({e})")
+            self._conn = None
+
+    def _ler_cache(self, seed):
+        if self._conn is None: return None
+        linhas, colunas = _tamanho_real(self.linhas, self.colunas)
+        try:
+            with self._db_lock:
+                row = self._conn.execute(
+                    "SELECT dados FROM labirintos WHERE seed = ? AND linhas = ? AND colunas = ? AND versao = ?",
+                    (seed, linhas, colunas, VERSAO_GERADOR)).fetchone()
+        except sqlite3.Error as e:
+            print(f"Erro ao ler o cache de labirintos: {e}")
+            return None
+        return row[0] if row else None
+
+    def _gravar_cache(self, seed, blob):
+        if self._conn is None: return
+        linhas, colunas = _tamanho_real(self.linhas, self.colunas)
+        try:
+            with self._db_lock:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO labirintos (seed, linhas, colunas, versao, dados) VALUES (?, ?, ?, ?, ?)",
+                    (seed, linhas, colunas, VERSAO_GERADOR, blob))
+                # Sem AUTOINCREMENT o rowid cresce a cada gravação: os menores são os mais antigos
+                self._conn.execute("DELETE FROM labirintos WHERE rowid <= (SELECT MAX(rowid) FROM labirintos) - ?",
+                                   (self.max_cache,))
+                self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"Erro ao gravar o cache de labirintos: {e}")
+
+    def _gerar(self, seed):
+        return empacotar(gerar_labirinto(self.linhas, self.colunas, rng=random.Random(seed)))
+
+    def _pedido_por_seed(self, seed):
+        """Blob de uma seed pedida fora da reserva: do cache em disco ou gerado agora (e gravado)."""
+        blob = self._ler_cache(seed)
+        if blob is None:
+            blob = self._gerar(seed)
+            self._gravar_cache(seed, blob)
+        return blob
+
+    def get(self, seed):
+        """Labirinto da seed, igual a gerar_labirinto(linhas, colunas, rng=random.Random(seed))."""
+        with self._lock:
+            blob = self._prontos.pop(seed, None)
+            if blob is not None: self._pedido.notify()
+        if blob is None: blob = self._pedido_por_seed(seed)
+        return desempacotar(blob, _tamanho_real(self.linhas, self.colunas)[1])
+
+    def take_seed(self):
+        """
+        Seed de um labirinto já pronto. Com a reserva vazia o labirinto de uma seed
+        nova é gerado agora e entra na reserva, então get() não o grava no disco.
+        """
+        with self._lock:
+            if self._prontos: return next(iter(self._prontos))
+        seed = random.randrange(2**63)
+        blob = self._gerar(seed)
+        with self._lock:
+            self._prontos[seed] = blob
+        return seed
+
+    def prontos(self):
+        with self._lock:
+            return len(self._prontos)
+
+    def fill(self):
+        """Completa a reserva na thread atual (usado pela thread de fundo e sem background)."""
+        while not self._parar and self.prontos() < self.tamanho:
+            seed = random.randrange(2**63)
+            blob = self._gerar(seed)
+            with self._lock:
+                self._prontos[seed] = blob
+
+    def _loop(self):
+        while not self._parar:
+            self.fill()
+            with self._lock:
+                while not self._parar and len(self._prontos) >= self.tamanho:
+                    self._pedido.wait()
+
+    def start(self):
+        if self._worker is not None: return
+        self._parar = False
+        self._worker = threading.Thread(target=self._loop, name="MazePool", daemon=True)
+        self._worker.start()
+
+    def stop(self):
+        with self._lock:
+            self._parar = True
+            self._pedido.notify_all()
+        if self._worker is not None:
+            self._worker.join()
+            self._worker = None
+
+    def close(self):
+        self.stop()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
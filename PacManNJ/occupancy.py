@@ -0,0 +1,41 @@
+"""
+Índice espacial das entidades do PacManNJ.
+
+OccupancyGrid responde "quem está na célula (x, y)" com um acesso a dict, em
+vez de percorrer a lista inteira de fantasmas. O Game mantém o índice
+atualizado: cada fantasma avisa quando muda de célula e as reposições em
+massa (início de jogo, volta após uma morte) reconstroem o índice inteiro.
+"""
+
+_VAZIO = ()
+
+class OccupancyGrid:
+    """Mapa (x, y) -> lista das entidades naquela célula."""
+    def __init__(self, entities=()):
+        self.rebuild(entities)
+
+    def rebuild(self, entities):
+        self._cells = {}
+        for e in entities: self.add(e)
+
+    def add(self, entity):
+        self._cells.setdefault((entity.x, entity.y), []).append(entity)
+
+    def remove(self, entity, x=None, y=None):
+        """Remove a entidade da célula (x, y) (padrão: a posição atual dela)."""
+        pos = (entity.x, entity.y) if x is None else (x, y)
+        cell = self._cells[pos]
+        cell.remove(entity)
+        if not cell: del self._cells[pos]
+
+    def move(self, entity, old_x, old_y):
+        """Atualiza o índice depois que a entidade andou de (old_x, old_y) para a posição atual."""
+        if (old_x, old_y) == (entity.x, entity.y): return
+        self.remove(entity, old_x, old_y)
+        self.add(entity)
+
+    def at(self, x, y):
+        return self._cells.get((x, y), _VAZIO)
+
+    def __len__(self):
+        return sum(len(cell) for cell in self._cells.values())
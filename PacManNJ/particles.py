@@ -0,0 +1,89 @@
+"""
+Sistema de partículas em estrutura de arrays.
+
+Em vez de um dict por partícula, cada campo fica num array compacto: posição
+e velocidade iniciais, tick de nascimento e tick de morte. As partículas andam
+em linha reta, então a posição é calculada só na hora de desenhar
+(x0 + vx * idade) e a atualização de um tick não percorre as partículas: só
+avança o relógio e conta quantas morreram naquele tick. O espaço das mortas é
+recuperado de uma vez (itertools.compress) quando elas passam de metade do
+total, e o desenho é feito em lote com Surface.blits.
+"""
+import collections
+from array import array
+from itertools import compress, repeat
+from operator import add, lt, mul, sub
+
+_FIELDS = (("x0", 'd'), ("y0", 'd'), ("vx", 'd'), ("vy", 'd'), ("birth", 'q'), ("death", 'q'))
+
+class ParticleSystem:
+    """Conjunto de partículas com até capacity itens vivos; as mais antigas saem primeiro."""
+    def __init__(self, capacity=10_000):
+        self.capacity = capacity
+        self.clear()
+
+    def clear(self):
+        for name, typecode in _FIELDS:
+            setattr(self, name, array(typecode))
+        self.tick = 0
+        self.dead = 0
+        self._deaths = collections.Counter()  # tick -> partículas que morrem nele
+
+    def __len__(self):
+        return len(self.death) - self.dead
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def emit(self, x, y, vx=0.0, vy=0.0, life=30):
+        """Adiciona uma partícula que vive life ticks; se o sistema estiver cheio, descarta a mais antiga."""
+        if len(self) >= self.capacity:
+            self._compact()
+            self._deaths[self.death[0]] -= 1
+            for name, _ in _FIELDS: del getattr(self, name)[0]
+        self.x0.append(x); self.y0.append(y)
+        self.vx.append(vx); self.vy.append(vy)
+        self.birth.append(self.tick); self.death.append(self.tick + life)
+        self._deaths[self.tick + life] += 1
+
+    def update(self):
+        """Avança um tick; O(1) exceto quando as partículas mortas precisam ser compactadas."""
+        self.tick += 1
+        self.dead += self._deaths.pop(self.tick, 0)
+        if self.dead and 2 * self.dead >= len(self.death):
+            self._compact()
+
+    def _compact(self):
+        if not self.dead: return
+        alive = [d > self.tick for d in self.death]
+        for name, typecode in _FIELDS:
+            setattr(self, name, array(typecode, compress(getattr(self, name), alive)))
+        self.dead = 0
+
+    def _alive(self):
+        """(x, y, idade) de cada partícula viva, calculados campo a campo com map()."""
+        tick = self.tick
+        ages = list(map(sub, repeat(tick), self.birth))
+        xs = map(add, self.x0, map(mul, self.vx, ages))
+        ys = map(add, self.y0, map(mul, self.vy, ages))
+        items = zip(xs, ys, ages)
+        if self.dead: items = compress(items, map(lt, repeat(tick), self.death))
+        return items
+
+    def positions(self):
+        return [(x, y) for x, y, _ in self._alive()]
+
+    def draw(self, screen, sprite_for, offset=(0, 0)):
+        """
+        Desenha todas as partículas vivas com um único Surface.blits.
+        sprite_for(idade) retorna (superfície, raio), ou None para não desenhar;
+        offset é subtraído das posições (câmera do modo de mapa grande).
+        """
+        batch = []
+        ox, oy = offset
+        for x, y, age in self._alive():
+            sprite = sprite_for(age)
+            if sprite is not None:
+                surface, radius = sprite
+                batch.append((surface, (int(x - radius - ox), int(y - radius - oy))))
+        if batch: screen.blits(batch, doreturn=False)
@@ -1,4 +1,13 @@
+import heapq
 import collections
+from array import array
+from config import ROWS, COLS
+
+# Direções na mesma ordem usada pelo BFS; o código de passo é índice + 1 (0 = parado).
+DIRECOES = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+OPOSTO = [0, 2, 1, 4, 3]
+# Cantos para onde os fantasmas fogem (e o de Clyde, o terceiro), em coordenadas de config
+CANTOS = [(1, 1), (COLS - 2, 1), (1, ROWS - 2), (COLS - 2, ROWS - 2)]
 
 def bfs_next_step(start, target, maze):
     """Encontra o próximo passo do caminho mais curto de start a target usando BFS."""
@@ -27,14 +36,17 @@ def bfs_next_step(start, target, maze):
 def find_nearest_walkable_global(maze, x, y):
     """Encontra a célula caminhável mais próxima de (x, y)."""
     rows, cols = len(maze), len(maze[0])
-    ix, iy = int(x), int(y)
-    if 0 <= ix < cols and 0 <= iy < rows and maze[iy][ix] != 1:
+    # Pontos fora do labirinto são projetados na borda: em distância de Manhattan,
+    # a célula mais próxima do ponto projetado também é a mais próxima do original.
+    ix = min(max(int(x), 0), cols - 1)
+    iy = min(max(int(y), 0), rows - 1)
+    if maze[iy][ix] != 1:
         return ix, iy
     q = collections.deque([(ix, iy)])
     visited = {(ix, iy)}
     while q:
         cx, cy = q.popleft()
-        for dx, dy in [(1,0),(-1,0),(0,1),(-1,0)]:
+        for dx, dy in DIRECOES:
             nx, ny = cx + dx, cy + dy
             if 0 <= nx < cols and 0 <= ny < rows and (nx, ny) not in visited:
                 if maze[ny][nx] != 1: return (nx, ny)
@@ -42,3 +54,269 @@ def find_nearest_walkable_global(maze, x, y):
                 q.append((nx, ny))
     return (cols//2, rows//2)
 
+class NearestWalkableMap:
+    """
+    Mapa pré-calculado da célula caminhável mais próxima de cada posição.
+
+    Substitui as chamadas repetidas a find_nearest_walkable_global: a busca é
+    feita uma vez por célula na construção e cada consulta vira um acesso direto.
+    Posições fora do labirinto (alvos projetados de Pinky e Inky) são projetadas
+    na borda antes da consulta, com o mesmo resultado da função original.
+    corners são os cantos de fuga e de Clyde na área coberta (Ghost._get_target_tile).
+    """
+    corners = CANTOS
+
+    def __init__(self, maze):
+        self.rows, self.cols = len(maze), len(maze[0])
+        self._tabela = [
+            find_nearest_walkable_global(maze, x, y)
+            for y in range(self.rows) for x in range(self.cols)
+        ]
+
+    def lookup(self, x, y):
+        ix = min(max(int(x), 0), self.cols - 1)
+        iy = min(max(int(y), 0), self.rows - 1)
+        return self._tabela[iy * self.cols + ix]
+
+class DistanceField:
+    """
+    Tabela de distâncias e próximos passos pré-calculada para um labirinto.
+
+    As paredes não mudam depois de gerar_labirinto, então cada alvo precisa de
+    uma única busca reversa (do alvo para todo o labirinto). A partir daí,
+    "próximo passo de A até B" é uma consulta O(1) na tabela do alvo B.
+    As tabelas são montadas sob demanda, ou todas de uma vez com precalcular_tudo().
+    Em labirintos grandes, max_tabelas limita quantas ficam guardadas (descarta a
+    usada há mais tempo), já que cada tabela ocupa memória proporcional ao labirinto.
+    """
+    def __init__(self, maze, precalcular=False, max_tabelas=None):
+        self.rows, self.cols = len(maze), len(maze[0])
+        cols = self.cols
+        self.walkable = bytearray(1 if cell != 1 else 0 for row in maze for cell in row)
+        # Para cada célula: tuplas (vizinho caminhável, código da direção até ele)
+        self._vizinhos = [self._calcular_vizinhos(i) for i in range(self.rows * cols)]
+        self._tabelas = collections.OrderedDict()
+        self.max_tabelas = max_tabelas
+        self.buscas = 0  # Buscas reversas feitas até agora
+        if precalcular:
+            self.precalcular_tudo()
+
+    def _calcular_vizinhos(self, i):
+        if not self.walkable[i]: return ()
+        cols = self.cols
+        y, x = divmod(i, cols)
+        viz = []
+        for code, (dx, dy) in enumerate(DIRECOES, 1):
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < cols and 0 <= ny < self.rows and self.walkable[ny * cols + nx]:
+                viz.append((ny * cols + nx, code))
+        return tuple(viz)
+
+    def _indice(self, pos):
+        x, y = pos
+        if 0 <= x < self.cols and 0 <= y < self.rows:
+            return y * self.cols + x
+        return -1
+
+    def _tabela(self, alvo):
+        """Retorna (distâncias, passos) do alvo, fazendo a busca reversa se necessário."""
+        tabela = self._tabelas.get(alvo)
+        if tabela is not None:
+            if self.max_tabelas is not None: self._tabelas.move_to_end(alvo)
+        else:
+            self.buscas += 1
+            n = self.rows * self.cols
+            dist = array('i', [-1]) * n
+            passos = bytearray(n)
+            dist[alvo] = 0
+            q = collections.deque([alvo])
+            vizinhos = self._vizinhos
+            while q:
+                atual = q.popleft()
+                d = dist[atual] + 1
+                for viz, code in vizinhos[atual]:
+                    if dist[viz] < 0:
+                        dist[viz] = d
+                        passos[viz] = OPOSTO[code]
+                        q.append(viz)
+            tabela = self._tabelas[alvo] = (dist, passos)
+            if self.max_tabelas is not None and len(self._tabelas) > self.max_tabelas:
+                self._tabelas.popitem(last=False)
+        return tabela
+
+    def precalcular_tudo(self):
+        """Monta as tabelas de todas as células caminháveis (todos os pares)."""
+        for i, livre in enumerate(self.walkable):
+            if livre:
+                self._tabela(i)
+
+    def next_step(self, start, target):
+        """Alternativa O(1) ao bfs_next_step: (dx, dy) do próximo passo de start a target."""
+        if start == target:
+            return (0, 0)
+        s, t = self._indice(start), self._indice(target)
+        if s < 0 or t < 0 or not self.walkable[t]:
+            return (0, 0)
+        code = self._tabela(t)[1][s]
+        return DIRECOES[code - 1] if code else (0, 0)
+
+    def distance(self, start, target):
+        """Distância em passos de start a target, ou -1 se não houver caminho."""
+        s, t = self._indice(start), self._indice(target)
+        if s < 0 or t < 0 or not self.walkable[t]:
+            return -1
+        return self._tabela(t)[0][s]
+
+class DynamicDistanceField(DistanceField):
+    """
+    DistanceField para labirintos que mudam (paredes destrutíveis, portas).
+
+    set_wall() troca uma célula entre parede e caminho e conserta as tabelas já
+    guardadas no lugar, no estilo do LPA*/D* Lite, em vez de refazer as buscas
+    reversas do labirinto inteiro:
+
+    - parede removida: a célula pega a menor distância dos vizinhos + 1 e a
+      melhora se espalha numa BFS que para onde ninguém fica mais perto;
+    - parede nova: só as células cujo caminho até o alvo passava por ela (a
+      subárvore dela na tabela de passos) perdem a distância; elas voltam a ser
+      calculadas por Dijkstra a partir da borda da região, com as distâncias
+      de fora como estão.
+
+    Cada tabela continua sendo uma árvore de caminhos mínimos; em empates o
+    passo escolhido pode ser outro que o de uma busca do zero. As tabelas são
+    alteradas no lugar, então os GhostPlanner que as guardam seguem válidos.
+    """
+    def __init__(self, maze, precalcular=False, max_tabelas=None):
+        super().__init__(maze, precalcular, max_tabelas)
+        self.reparos = 0  # Células recalculadas pelos consertos até agora
+
+    def set_wall(self, pos, parede=True):
+        """Põe (parede=True) ou tira uma parede em pos e conserta as tabelas guardadas."""
+        c = self._indice(pos)
+        if c < 0: raise IndexError(pos)
+        if bool(self.walkable[c]) != parede: return
+        antigos = self._vizinhos[c]
+        self.walkable[c] = 0 if parede else 1
+        for i in (c,) + tuple(c + dx + dy * self.cols for dx, dy in DIRECOES):
+            if 0 <= i < len(self.walkable) and abs(i % self.cols - c % self.cols) <= 1:
+                self._vizinhos[i] = self._calcular_vizinhos(i)
+        if parede: self._tabelas.pop(c, None)  # O alvo virou parede: a tabela dele não serve mais
+        for dist, passos in self._tabelas.values():
+            if parede: self._bloquear(c, antigos, dist, passos)
+            else: self._liberar(c, dist, passos)
+
+    def _liberar(self, c, dist, passos):
+        melhor, codigo = -1, 0
+        for viz, code in self._vizinhos[c]:
+            if dist[viz] >= 0 and (melhor < 0 or dist[viz] < melhor): melhor, codigo = dist[viz], code
+        if melhor < 0: return  # Nenhum vizinho chega ao alvo
+        dist[c], passos[c] = melhor + 1, codigo
+        self._espalhar(collections.deque([c]), dist, passos)
+
+    def _espalhar(self, fila, dist, passos):
+        """BFS de melhoria: a partir das células da fila, baixa a distância dos vizinhos que ficam mais perto."""
+        vizinhos = self._vizinhos
+        reparos = 0
+        while fila:
+            atual = fila.popleft()
+            d = dist[atual] + 1
+            for viz, code in vizinhos[atual]:
+                if dist[viz] < 0 or dist[viz] > d:
+                    dist[viz] = d
+                    passos[viz] = OPOSTO[code]
+                    fila.append(viz)
+                    reparos += 1
+        self.reparos += reparos + 1
+
+    def _bloquear(self, c, antigos, dist, passos):
+        """antigos: os vizinhos de c de antes de ele virar parede."""
+        if dist[c] < 0: return
+        vizinhos = self._vizinhos
+        # Subárvore de c: as células cujo passo leva a uma célula já afetada
+        afetadas = [c]
+        dist[c], passos[c] = -1, 0
+        for atual in afetadas:
+            for viz, code in (antigos if atual == c else vizinhos[atual]):
+                if passos[viz] == OPOSTO[code]:
+                    dist[viz], passos[viz] = -1, 0
+                    afetadas.append(viz)
+        # Borda: cada célula afetada começa com a melhor distância por um vizinho não afetado
+        heap = []
+        for atual in afetadas[1:]:
+            for viz, code in vizinhos[atual]:
+                if dist[viz] >= 0 and (dist[atual] < 0 or dist[viz] + 1 < dist[atual]):
+                    dist[atual], passos[atual] = dist[viz] + 1, code
+            if dist[atual] >= 0: heap.append((dist[atual], atual))
+        heapq.heapify(heap)
+        while heap:
+            d, atual = heapq.heappop(heap)
+            if d != dist[atual]: continue
+            for viz, code in vizinhos[atual]:
+                if dist[viz] < 0 or dist[viz] > d + 1:
+                    dist[viz], passos[viz] = d + 1, OPOSTO[code]
+                    heapq.heappush(heap, (d + 1, viz))
+        self.reparos += len(afetadas)
+
+class GhostPlanner:
+    """
+    Planejamento dos fantasmas em lote, um tick por vez.
+
+    Todos os fantasmas perseguem alvos perto do jogador, então vários pedem o
+    caminho até o mesmo alvo. Dentro de um tick o planejador busca a tabela de
+    cada alvo distinto uma única vez (reaproveitando as do DistanceField e
+    fazendo no máximo uma busca reversa por alvo novo) e responde o próximo
+    passo de cada fantasma a partir dela. Tem a mesma interface next_step do
+    DistanceField, então é passado no lugar dele para Ghost.update.
+    """
+    def __init__(self, distance_field):
+        self.field = distance_field
+        self._passos = {}
+        self.ticks = 0
+        self.ultimo = {"consultas": 0, "alvos": 0, "buscas": 0}
+        self.total = dict(self.ultimo)
+
+    def begin_tick(self):
+        """Começa um novo tick: as tabelas do anterior deixam de valer como atalho."""
+        self._passos = {}
+        self.ultimo = {"consultas": 0, "alvos": 0, "buscas": 0}
+        self.ticks += 1
+
+    def _contar(self, chave, n=1):
+        self.ultimo[chave] += n; self.total[chave] += n
+
+    def passos(self, target):
+        """
+        Tabela de passos até target (índice da célula -> código da direção), ou
+        None se target não for caminhável. Usada direto pelo motor em lote (swarm.py).
+        """
+        field = self.field
+        t = field._indice(target)
+        if t < 0 or not field.walkable[t]:
+            return None
+        passos = self._passos.get(t)
+        if passos is None:
+            buscas = field.buscas
+            passos = self._passos[t] = field._tabela(t)[1]
+            self._contar("alvos")
+            if field.buscas > buscas: self._contar("buscas")
+        return passos
+
+    def next_step(self, start, target):
+        self._contar("consultas")
+        if start == target:
+            return (0, 0)
+        s = self.field._indice(start)
+        passos = self.passos(target) if s >= 0 else None
+        if passos is None:
+            return (0, 0)
+        code = passos[s]
+        return DIRECOES[code - 1] if code else (0, 0)
+
+    def stats(self):
+        """Trabalho do último tick e médias por tick (consultas, alvos distintos e buscas reversas)."""
+        ticks = max(self.ticks, 1)
+        return {
+            "ticks": self.ticks,
+            "ultimo": dict(self.ultimo),
+            "por_tick": {k: v / ticks for k, v in self.total.items()},
+        }
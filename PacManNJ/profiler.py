@@ -0,0 +1,124 @@
+"""
+Instrumentação de desempenho do PacManNJ.
+
+Profiler troca métodos de um objeto (na instância, sem mexer na classe) por
+versões que medem o tempo de cada chamada. Cada seção guarda as últimas
+janela amostras para os percentis p50/p95/p99 e acumula contagem e tempo
+total desde o início. Contadores externos (por exemplo, as buscas reversas do
+DistanceField) são lidos por funções registradas com track().
+
+O resultado pode ser desenhado por cima do jogo (ProfilerOverlay, tecla F3)
+ou exportado em CSV/JSON, inclusive de simulações sem tela.
+"""
+import csv
+import json
+import time
+import functools
+import collections
+
+class Profiler:
+    """Tempos por seção (janela móvel + totais) e contadores monitorados."""
+    def __init__(self, janela=300):
+        self.janela = janela
+        self.amostras = {}
+        self.chamadas = collections.Counter()
+        self.tempo_total = collections.Counter()
+        self._contadores = {}
+
+    def record(self, secao, segundos):
+        amostras = self.amostras.get(secao)
+        if amostras is None: amostras = self.amostras[secao] = collections.deque(maxlen=self.janela)
+        amostras.append(segundos)
+        self.chamadas[secao] += 1
+        self.tempo_total[secao] += segundos
+
+    def wrap(self, secao, func):
+        """Versão de func que registra o tempo de cada chamada em secao."""
+        record, perf_counter = self.record, time.perf_counter
+        @functools.wraps(func)
+        def medido(*args, **kwargs):
+            t0 = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(secao, perf_counter() - t0)
+        return medido
+
+    def instrument(self, obj, metodos, secao=None):
+        """Instrumenta os métodos de obj; secao agrupa vários objetos numa só seção (ex.: todos os fantasmas)."""
+        for nome in metodos:
+            setattr(obj, nome, self.wrap(secao or nome.lstrip("_"), getattr(obj, nome)))
+
+    def track(self, nome, leitor):
+        """Registra um contador externo: leitor() retorna o valor acumulado atual."""
+        self._contadores[nome] = leitor
+
+    def contadores(self):
+        return {nome: leitor() for nome, leitor in self._contadores.items()}
+
+    def stats(self):
+        """Por seção: chamadas, média total e p50/p95/p99 da janela recente (em ms)."""
+        resultado = {}
+        for secao, amostras in self.amostras.items():
+            ordenadas = sorted(amostras)
+            pct = lambda p: ordenadas[min(len(ordenadas) - 1, int(p / 100 * len(ordenadas)))] * 1000
+            resultado[secao] = {
+                "chamadas": self.chamadas[secao],
+                "media_ms": self.tempo_total[secao] * 1000 / self.chamadas[secao],
+                "p50_ms": pct(50), "p95_ms": pct(95), "p99_ms": pct(99),
+            }
+        return resultado
+
+    def to_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"secoes": self.stats(), "contadores": self.contadores()}, f, indent=2, ensure_ascii=False)
+
+    def to_csv(self, path):
+        campos = ["secao", "chamadas", "media_ms", "p50_ms", "p95_ms", "p99_ms"]
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(campos)
+            for secao, s in self.stats().items():
+                writer.writerow([secao] + [s[c] for c in campos[1:]])
+            for nome, valor in self.contadores().items():
+                writer.writerow([nome, valor, "", "", "", ""])
+
+    def export(self, path):
+        """Exporta em JSON ou CSV conforme a extensão do arquivo."""
+        (self.to_csv if path.endswith(".csv") else self.to_json)(path)
+
+class ProfilerOverlay:
+    """Painel com os tempos do Profiler desenhado no canto da tela."""
+    def __init__(self, profiler, font, refresh_frames=15):
+        self.profiler = profiler
+        self.font = font
+        self.refresh_frames = refresh_frames
+        self.visible = False
+        self.surface = None
+        self._frames = 0
+
+    def toggle(self):
+        self.visible = not self.visible
+        self._frames = 0
+
+    def _render(self):
+        import pygame
+        linhas = [f"{'seção':<16}{'p50':>7}{'p95':>7}{'p99':>7} ms"]
+        for secao, s in self.profiler.stats().items():
+            linhas.append(f"{secao:<16}{s['p50_ms']:7.2f}{s['p95_ms']:7.2f}{s['p99_ms']:7.2f}")
+        linhas += [f"{nome}: {valor}" for nome, valor in self.profiler.contadores().items()]
+        textos = [self.font.render(linha, True, (0, 255, 0)) for linha in linhas]
+        # O painel só cresce: assim o quadro parcial nunca deixa restos de um painel maior
+        largura = max(max(t.get_width() for t in textos) + 10, self.surface.get_width() if self.surface else 0)
+        altura = max(sum(t.get_height() for t in textos) + 10, self.surface.get_height() if self.surface else 0)
+        self.surface = pygame.Surface((largura, altura))
+        self.surface.fill((0, 0, 0))
+        y = 5
+        for t in textos:
+            self.surface.blit(t, (5, y)); y += t.get_height()
+
+    def draw(self, screen, pos):
+        """Desenha o painel (refeito a cada refresh_frames quadros) e retorna o retângulo ocupado."""
+        if self._frames % self.refresh_frames == 0: self._render()
+        self._frames += 1
+        return screen.blit(self.surface, pos)
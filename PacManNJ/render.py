@@ -0,0 +1,169 @@
+"""
+Camadas de desenho pré-renderizadas do PacManNJ.
+
+As paredes e a casa dos fantasmas nunca mudam, então são desenhadas uma única
+vez numa superfície de fundo. Os pontos normais ficam numa segunda camada que
+só é corrigida nas células que mudaram (pontos comidos); os pontos especiais,
+que piscam, são desenhados por cima a cada quadro.
+
+Overlays translúcidos e textos do HUD também ficam em cache: um overlay por
+(tamanho, cor) e um texto que só é renderizado de novo quando o valor muda.
+"""
+import pygame
+from config import *
+from sprites import SpriteCache
+
+overlay_cache = SpriteCache(max_size=16)
+
+SUPER_DIM_ALPHA = 150  # Escurecimento do labirinto durante o super modo
+
+def _dim_color(color, alpha=SUPER_DIM_ALPHA):
+    """Cor resultante de um overlay preto com o alfa dado por cima de color."""
+    return tuple(c * (255 - alpha) // 255 for c in color)
+
+def _dim_surface(surface, alpha=SUPER_DIM_ALPHA):
+    dimmed = surface.copy()
+    overlay = pygame.Surface(surface.get_size(), pygame.SRCALPHA)
+    overlay.fill((0, 0, 0, alpha))
+    dimmed.blit(overlay, (0, 0))
+    return dimmed
+
+def get_overlay(size, color):
+    """Superfície SRCALPHA do tamanho dado preenchida com color (RGBA), criada uma vez."""
+    def factory():
+        overlay = pygame.Surface(size, pygame.SRCALPHA)
+        overlay.fill(color)
+        return overlay
+    return overlay_cache.get(("overlay", tuple(color), tuple(size)), factory)
+
+class CachedText:
+    """Texto de uma fonte e cor fixas; só chama font.render quando o valor muda."""
+    def __init__(self, font, color, fmt="{}"):
+        self.font, self.color, self.fmt = font, color, fmt
+        self._value = object()
+        self.surface = None
+        self.renders = 0
+
+    def get(self, value):
+        if value != self._value:
+            self._value = value
+            self.surface = self.font.render(self.fmt.format(value), True, self.color)
+            self.renders += 1
+        return self.surface
+
+def cell_rect(x, y):
+    return pygame.Rect(x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE)
+
+class MazeLayer:
+    """Labirinto pré-renderizado, com versão normal e escurecida (super modo)."""
+    def __init__(self, maze):
+        size = (len(maze[0]) * CELL_SIZE, len(maze) * CELL_SIZE)
+        self.background = pygame.Surface(size)
+        self.background.fill(COLOR_BLACK)
+        for y, row in enumerate(maze):
+            for x, cell in enumerate(row):
+                if cell == 1: pygame.draw.rect(self.background, COLOR_WALL, cell_rect(x, y))
+                elif cell == 4: pygame.draw.rect(self.background, COLOR_GHOST_HOUSE, cell_rect(x, y))
+        self.surface = self.background.copy()
+        self.specials = set()
+        for y, row in enumerate(maze):
+            for x, cell in enumerate(row):
+                if cell == 2: self._draw_pellet(self.surface, x, y, COLOR_WHITE)
+                elif cell == 3: self.specials.add((x, y))
+        self.background_dim = _dim_surface(self.background)
+        self.surface_dim = _dim_surface(self.surface)
+
+    def _draw_pellet(self, surface, x, y, color):
+        center = (x * CELL_SIZE + CELL_SIZE // 2, y * CELL_SIZE + CELL_SIZE // 2)
+        pygame.draw.circle(surface, color, center, 3)
+
+    def get(self, dimmed):
+        return self.surface_dim if dimmed else self.surface
+
+    def apply_changes(self, maze, changes):
+        """Atualiza as camadas nas células alteradas e retorna os retângulos afetados."""
+        rects = []
+        for x, y in changes:
+            rect = cell_rect(x, y)
+            self.surface.blit(self.background, rect, rect)
+            self.surface_dim.blit(self.background_dim, rect, rect)
+            cell = maze[y][x]
+            if cell == 2:
+                self._draw_pellet(self.surface, x, y, COLOR_WHITE)
+                self._draw_pellet(self.surface_dim, x, y, _dim_color(COLOR_WHITE))
+            if cell == 3: self.specials.add((x, y))
+            else: self.specials.discard((x, y))
+            rects.append(rect)
+        return rects
+
+    def draw_specials(self, target, frame, dimmed):
+        """Desenha os pontos especiais (que piscam) e retorna seus retângulos."""
+        color = COLOR_SPECIAL_DOT if (frame // 10) % 2 == 0 else COLOR_SPECIAL_DOT_BLINK
+        if dimmed: color = _dim_color(color)
+        rects = []
+        for x, y in self.specials:
+            rect = cell_rect(x, y)
+            pygame.draw.circle(target, color, rect.center, 6)
+            rects.append(rect)
+        return rects
+
+class ChunkLayer:
+    """
+    Labirinto do modo de mapa grande (ChunkedMaze): cada pedaço visível é
+    pré-renderizado numa superfície própria, guardada num SpriteCache (LRU) de
+    max_chunks pedaços, então a memória de vídeo não cresce com o mapa.
+    """
+    def __init__(self, maze, max_chunks=16):
+        self.maze = maze
+        self.cache = SpriteCache(max_size=max_chunks)
+
+    def _render_chunk(self, cx, cy):
+        s = self.maze.chunk_size
+        surface = pygame.Surface((s * CELL_SIZE, s * CELL_SIZE))
+        surface.fill(COLOR_BLACK)
+        dados = self.maze.chunk_bytes(cx, cy)
+        specials = set()
+        for i, cell in enumerate(dados):
+            y, x = divmod(i, s)
+            if cell == 1: pygame.draw.rect(surface, COLOR_WALL, cell_rect(x, y))
+            elif cell == 4: pygame.draw.rect(surface, COLOR_GHOST_HOUSE, cell_rect(x, y))
+            elif cell == 2: self._draw_pellet(surface, x, y)
+            elif cell == 3: specials.add((x, y))
+        return surface, specials
+
+    @staticmethod
+    def _draw_pellet(surface, x, y):
+        pygame.draw.circle(surface, COLOR_WHITE, cell_rect(x, y).center, 3)
+
+    def _chunk(self, cx, cy):
+        return self.cache.get(("chunk", cx, cy), lambda: self._render_chunk(cx, cy))
+
+    def apply_changes(self, changes):
+        """Corrige as células alteradas nos pedaços que estão no cache (os outros serão renderizados do zero)."""
+        s = self.maze.chunk_size
+        for x, y in changes:
+            entrada = self.cache.peek(("chunk", x // s, y // s))
+            if entrada is None: continue
+            surface, specials = entrada
+            lx, ly = x % s, y % s
+            surface.fill(COLOR_BLACK, cell_rect(lx, ly))
+            cell = self.maze.cell(x, y)
+            if cell == 2: self._draw_pellet(surface, lx, ly)
+            if cell == 3: specials.add((lx, ly))
+            else: specials.discard((lx, ly))
+
+    def draw(self, target, camera, frame, dimmed):
+        """Desenha em target os pedaços que aparecem com a câmera (canto superior esquerdo, em células)."""
+        s = self.maze.chunk_size
+        cam_x, cam_y = camera
+        w, h = target.get_width() // CELL_SIZE + 1, target.get_height() // CELL_SIZE + 1
+        color = COLOR_SPECIAL_DOT if (frame // 10) % 2 == 0 else COLOR_SPECIAL_DOT_BLINK
+        for cy in range(cam_y // s, min((cam_y + h) // s, self.maze.chunks_y - 1) + 1):
+            for cx in range(cam_x // s, min((cam_x + w) // s, self.maze.chunks_x - 1) + 1):
+                surface, specials = self._chunk(cx, cy)
+                ox, oy = (cx * s - cam_x) * CELL_SIZE, (cy * s - cam_y) * CELL_SIZE
+                target.blit(surface, (ox, oy))
+                for x, y in specials:
+                    rect = cell_rect(x, y)
+                    pygame.draw.circle(target, color, (rect.centerx + ox, rect.centery + oy), 6)
+        if dimmed: target.blit(get_overlay(target.get_size(), (0, 0, 0, SUPER_DIM_ALPHA)), (0, 0))
@@ -0,0 +1,90 @@
+"""
+Gravação e reprodução de partidas do PacManNJ.
+
+Como toda a aleatoriedade da lógica vem do gerador do jogo (random.Random(seed)),
+uma partida fica determinada pela seed e pela sequência de teclas de cada tick.
+O formato binário guarda só isso:
+
+    cabeçalho: b"PMRP", versão (u8), seed (u64), ticks (u32), score final (i32)
+    corpo:     zlib de códigos de 4 bits (dois por byte), cada tick sendo as
+               teclas daquele tick seguidas de 0 (fim do tick)
+"""
+import sys
+import zlib
+import struct
+import time
+
+MAGIC = b"PMRP"
+VERSION = 2  # 2: gerador de labirinto iterativo (as mesmas seeds geram outros labirintos)
+HEADER = struct.Struct("<4sBQIi")
+
+END_TICK = 0
+OTHER_KEY = 5  # Tecla sem direção (só inicia o jogo)
+KEY_CODES = {(0, -1): 1, (0, 1): 2, (-1, 0): 3, (1, 0): 4, None: OTHER_KEY}
+CODE_KEYS = {code: key for key, code in KEY_CODES.items()}
+
+class ReplayRecorder:
+    """Acumula as teclas de cada tick enquanto o jogo roda."""
+    def __init__(self, seed):
+        self.seed = seed
+        self.ticks = 0
+        self.codes = bytearray()
+
+    def key(self, direction):
+        self.codes.append(KEY_CODES[direction])
+
+    def end_tick(self):
+        self.codes.append(END_TICK)
+        self.ticks += 1
+
+    def to_bytes(self, score=0):
+        codes = self.codes + bytes(len(self.codes) % 2)
+        packed = bytes((codes[i] << 4) | codes[i + 1] for i in range(0, len(codes), 2))
+        return HEADER.pack(MAGIC, VERSION, self.seed, self.ticks, score) + zlib.compress(packed, 9)
+
+    def save(self, path, score=0):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes(score))
+
+class Replay:
+    """Partida gravada: seed, score final e as teclas de cada tick."""
+    def __init__(self, seed, ticks, score, tick_keys):
+        self.seed, self.ticks, self.score = seed, ticks, score
+        self.tick_keys = tick_keys
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, seed, ticks, score = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("Arquivo não é um replay do PacManNJ")
+        if version != VERSION:
+            raise ValueError(f"Versão de replay {version} não suportada (esperada {VERSION})")
+        packed = zlib.decompress(data[HEADER.size:])
+        tick_keys, current = [], []
+        for byte in packed:
+            for code in (byte >> 4, byte & 0x0F):
+                if code == END_TICK:
+                    if len(tick_keys) < ticks:
+                        tick_keys.append(tuple(current))
+                    current = []
+                else:
+                    current.append(CODE_KEYS[code])
+        return cls(seed, ticks, score, tick_keys)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+def reproduzir(replay):
+    """Re-simula a partida sem tela e retorna o resultado do HeadlessGame."""
+    from simulation import ReplayGame
+    return ReplayGame(replay).run()
+
+if __name__ == "__main__":
+    replay = Replay.load(sys.argv[1])
+    t0 = time.perf_counter()
+    result = reproduzir(replay)
+    elapsed = time.perf_counter() - t0
+    status = "OK" if result["score"] == replay.score else f"DIVERGIU (gravado {replay.score})"
+    print(f"seed={replay.seed} ticks={result['ticks']} score={result['score']} {status} em {elapsed * 1000:.1f} ms")
@@ -0,0 +1,137 @@
+"""
+Simulação sem tela do PacManNJ.
+
+HeadlessGame reaproveita toda a lógica do GameEngine (_update_player, _update_ghosts,
+_check_collisions, _check_win_condition), mas não abre janela, não carrega
+fontes e não espera pelo relógio: cada tick roda o mais rápido possível.
+A entrada vem de um controlador: qualquer chamável que recebe o jogo e
+retorna uma direção (dx, dy) ou None quando não há tecla naquele tick.
+"""
+import sys
+import time
+import collections
+from config import FPS
+from engine import GameEngine
+from profiler import Profiler
+
+DEFAULT_MAX_TICKS = 100_000
+
+class ScriptedController:
+    """Controlador que reproduz uma sequência fixa de entradas, uma por tick."""
+    def __init__(self, inputs):
+        self.inputs = list(inputs)
+        self.tick = 0
+
+    def __call__(self, game):
+        if self.tick >= len(self.inputs): return None
+        direction = self.inputs[self.tick]
+        self.tick += 1
+        return direction
+
+class GreedyController:
+    """IA simples: vai até o ponto mais próximo desviando dos fantasmas perigosos."""
+    def __init__(self):
+        self._last_pos = None
+
+    def __call__(self, game):
+        p = game.player
+        # Só decide quando o jogador muda de célula (ou precisa reiniciar após uma morte)
+        if game.started and (p.x, p.y) == self._last_pos: return None
+        self._last_pos = (p.x, p.y)
+        return self._direction_to_pellet(game)
+
+    def _direction_to_pellet(self, game):
+        maze, p = game.maze, game.player
+        rows, cols = len(maze), len(maze[0])
+        blocked = {(g.x, g.y) for g in game.ghosts if g.state not in ("vulnerable", "eaten")}
+        q = collections.deque()
+        first = {}
+        for dx, dy in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
+            nx, ny = p.x + dx, p.y + dy
+            if 0 <= nx < cols and 0 <= ny < rows and maze[ny][nx] != 1 and (nx, ny) not in blocked:
+                first[(nx, ny)] = (dx, dy)
+                q.append((nx, ny))
+        while q:
+            x, y = q.popleft()
+            if maze[y][x] in (2, 3): return first[(x, y)]
+            for dx, dy in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
+                nx, ny = x + dx, y + dy
+                if 0 <= nx < cols and 0 <= ny < rows and maze[ny][nx] != 1 and (nx, ny) not in first and (nx, ny) not in blocked:
+                    first[(nx, ny)] = first[(x, y)]
+                    q.append((nx, ny))
+        return next(iter(first.values()), None)
+
+class HeadlessGame(GameEngine):
+    """Jogo sem renderização: a lógica roda em ticks, sem janela e sem limite de FPS."""
+    def __init__(self, controller=None, player_name="headless", seed=None, record=False, maze_pool=None, profiler=None,
+                 n_ghosts=4, swarm=False, **engine_options):
+        self.controller = controller or GreedyController()
+        self.ticks = 0
+        self.elapsed = 0.0
+        self.deaths_by_ghost = collections.Counter()
+        super().__init__(player_name, seed, record, maze_pool, profiler, n_ghosts, swarm, **engine_options)
+        self.initial_pellets = self.maze.pellets_left
+
+    def _save_score(self):
+        """Simulações não gravam placar no banco."""
+
+    def _handle_player_death(self, killer=None):
+        if killer is not None: self.deaths_by_ghost[killer.type] += 1
+        super()._handle_player_death(killer)
+
+    def step(self):
+        """Executa um tick: entrada do controlador e atualização da lógica."""
+        if not self.game_over and not self.is_paused_for_death:
+            direction = self.controller(self)
+            if direction is not None: self._apply_input(direction)
+        self._update()
+        self.ticks += 1
+
+    def run(self, max_ticks=DEFAULT_MAX_TICKS):
+        """Roda até o fim do jogo (ou max_ticks) e retorna o resultado."""
+        t0 = time.perf_counter()
+        while not self.game_over and self.ticks < max_ticks:
+            self.step()
+        self.elapsed += time.perf_counter() - t0
+        return self.result()
+
+    def result(self):
+        return {
+            "score": self.player.score,
+            "ticks": self.ticks,
+            "frames": self.frame,
+            "win": self.win,
+            "lives": self.lives,
+            "pellets_eaten": self.initial_pellets - self.maze.pellets_left,
+            "deaths_by_ghost": dict(self.deaths_by_ghost),
+            "tps": self.ticks / self.elapsed if self.elapsed > 0 else 0.0,
+        }
+
+class ReplayGame(HeadlessGame):
+    """Re-simula um replay gravado aplicando as teclas de cada tick."""
+    def __init__(self, replay):
+        self.replay = replay
+        super().__init__(controller=None, seed=replay.seed)
+
+    def step(self):
+        for direction in self.replay.tick_keys[self.ticks]:
+            self._apply_input(direction)
+        self._update()
+        self.ticks += 1
+
+    def run(self, max_ticks=None):
+        return super().run(self.replay.ticks if max_ticks is None else min(max_ticks, self.replay.ticks))
+
+if __name__ == "__main__":
+    # Uso: python simulation.py [n_jogos] [perfil.json|perfil.csv]
+    n_jogos = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    perfil = sys.argv[2] if len(sys.argv) > 2 else None
+    profiler = Profiler(janela=100_000) if perfil else None
+    for i in range(n_jogos):
+        r = HeadlessGame(profiler=profiler).run()
+        real_time = r["tps"] / FPS
+        print(f"Jogo {i + 1}: score={r['score']} ticks={r['ticks']} vitória={r['win']} "
+              f"{r['tps']:,.0f} ticks/s ({real_time:,.0f}x tempo real)")
+    if profiler:
+        profiler.export(perfil)
+        print(f"Perfil salvo em {perfil}")
@@ -0,0 +1,48 @@
+"""
+Cache de sprites e glifos pré-renderizados.
+
+Os métodos draw das entidades pedem superfícies por chave
+(tipo, estado, raio, alfa, direção) em vez de redesenhar primitivas
+ou alocar superfícies a cada quadro. O cache tem tamanho limitado e
+descarta o item usado há mais tempo (LRU).
+"""
+import collections
+
+ALPHA_STEP = 16  # Alfas próximos dividem o mesmo sprite
+
+def alpha_bucket(alpha):
+    """Arredonda o alfa para o degrau mais próximo, limitando os sprites distintos."""
+    return min(255, round(alpha / ALPHA_STEP) * ALPHA_STEP)
+
+class SpriteCache:
+    """Cache LRU de superfícies (ou de qualquer valor caro de renderizar)."""
+    def __init__(self, max_size=512):
+        self.max_size = max_size
+        self._items = collections.OrderedDict()
+        self.hits = self.misses = 0
+
+    def get(self, key, factory):
+        """Retorna o item da chave, criando-o com factory() se ainda não existir."""
+        item = self._items.get(key)
+        if item is not None:
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item
+        self.misses += 1
+        item = self._items[key] = factory()
+        if len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+        return item
+
+    def peek(self, key):
+        """Item em cache (ou None), sem contar acerto nem mudar a ordem do LRU."""
+        return self._items.get(key)
+
+    def __len__(self):
+        return len(self._items)
+
+    def clear(self):
+        self._items.clear()
+
+# Cache compartilhado por todas as entidades
+sprite_cache = SpriteCache()
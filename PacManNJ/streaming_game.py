@@ -0,0 +1,67 @@
+"""
+Mapa grande com janela: StreamingGame junta o Game (janela, teclado, HUD) ao
+LargeMapEngine. Fica fora de game.py para que o jogo normal não carregue o
+mapa em pedaços.
+"""
+import pygame
+from config import *
+from game import Game
+from large_map import LargeMapEngine
+from render import ChunkLayer
+
+class StreamingGame(Game, LargeMapEngine):
+    """
+    Game sobre o mapa grande (LargeMapEngine): a câmera segue o jogador e só os
+    pedaços visíveis do labirinto e as entidades dentro da tela são desenhados.
+    Argumentos extras (chunks, viewport) vão para o LargeMapEngine.
+    """
+    def _create_maze_layer(self):
+        return ChunkLayer(self.maze)
+
+    def _draw_maze(self, full=True):
+        self.maze_layer.apply_changes(self.maze.pop_changes())
+        self.game_surface.fill(COLOR_BLACK)
+        self.maze_layer.draw(self.game_surface, self.camera, self.frame, self._dimmed)
+        return []
+
+    def _visible(self, entity):
+        (x, y), (w, h) = self.camera, self.viewport
+        return x - 1 <= entity.x <= x + w and y - 1 <= entity.y <= y + h
+
+    def _camera_pixels(self):
+        """Canto superior esquerdo da tela em pixels do mundo, passado ao desenho das entidades."""
+        return self.camera[0] * CELL_SIZE, self.camera[1] * CELL_SIZE
+
+    def _draw_player(self):
+        self.player.draw(self.game_surface, self.frame, self._camera_pixels())
+
+    def _draw_ghosts(self):
+        camera = self._camera_pixels()
+        for g in self.region_ghosts():
+            if self._visible(g): g.draw(self.game_surface, self.frame, camera)
+
+    def _draw(self):
+        """Com a câmera andando a tela inteira muda, então cada quadro é desenhado por completo."""
+        self._dimmed = self.player.super_timer > 0 and not self.is_paused_for_death
+        self._draw_maze()
+        self._draw_player(); self._draw_ghosts()
+        if self.is_paused_for_death: self._draw_death_screen()
+        self.screen.fill((10, 10, 25))
+        self.screen.blit(self.game_surface, (0, HUD_HEIGHT))
+        self._draw_hud()
+        if self.super_intro_countdown > 0: self._draw_super_intro()
+        if self.game_over: self._draw_game_over_screen()
+        if self.profiler_overlay.visible: self.profiler_overlay.draw(self.screen, (0, HUD_HEIGHT))
+        pygame.display.flip()
+
+    def run(self):
+        try:
+            return super().run()
+        finally:
+            self.close()
+
+if __name__ == "__main__":
+    # Uso: python streaming_game.py [chunks] -> mapa grande de chunks x chunks pedaços
+    import sys
+    chunks = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    StreamingGame("explorador", chunks=chunks).run()
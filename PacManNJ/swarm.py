@@ -0,0 +1,207 @@
+"""
+Motor em lote dos fantasmas do PacManNJ.
+
+GhostSwarm guarda o estado de todos os fantasmas em arrays (célula, tipo,
+estado, timer de vulnerabilidade, célula de origem) e avança todos de uma vez
+por tick, no lugar de um Ghost.update por fantasma:
+
+- os alvos são calculados por grupo: todos os Blinkys do enxame perseguem a
+  mesma célula, todos os vulneráveis fogem para o mesmo canto, e assim por
+  diante; só Inky (que depende do Blinky) e Clyde (que depende da própria
+  distância) variam, e mesmo assim repetem poucos valores;
+- cada alvo distinto pega sua tabela de passos no GhostPlanner uma única vez,
+  e o passo de cada fantasma vira um acesso ao array da tabela;
+- os bloqueios entre fantasmas usam uma contagem por célula, em vez de
+  procurar quem está na célula vizinha.
+
+Os fantasmas são avançados na mesma ordem e com os mesmos sorteios de
+Ghost.update, então com os quatro fantasmas de sempre o jogo é idêntico
+(GameEngine(..., swarm=True)). SwarmGhost dá a cada fantasma do enxame a
+interface de Ghost (desenho, colisões, controladores), lendo e escrevendo
+direto nos arrays, e o próprio GhostSwarm faz o papel do OccupancyGrid.
+"""
+from array import array
+from config import ROWS
+from pathfinding import DIRECOES, CANTOS
+from entities import Ghost
+
+TIPOS = ("blinky", "pinky", "inky", "clyde")
+ESTADOS = ("house", "chase", "vulnerable", "eaten")
+PINKY, INKY, CLYDE = 1, 2, 3
+CASA, PERSEGUICAO, VULNERAVEL, COMIDO = range(4)
+# Mesma ordem de Ghost.update, para rng.sample sortear igual
+DIRECOES_SORTEIO = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+
+class SwarmGhost(Ghost):
+    """Fantasma do enxame: mesma interface de Ghost, com o estado guardado nos arrays do GhostSwarm."""
+    __slots__ = ("_swarm", "_i")
+
+    def __init__(self, swarm, i, x, y, color, gtype, rng=None):
+        # A célula já está nos arrays (GhostSwarm.add); os setters de Ghost.__init__ só a confirmam
+        self._swarm, self._i = swarm, i
+        super().__init__(x, y, color, gtype, rng)
+
+    def update(self, *args, **kwargs):
+        raise TypeError("Fantasmas do enxame são avançados juntos por GhostSwarm.step")
+
+    x = property(lambda self: self._swarm.celula[self._i] % self._swarm.cols,
+                 lambda self, v: self._swarm._posicionar(self._i, v, self.y))
+    y = property(lambda self: self._swarm.celula[self._i] // self._swarm.cols,
+                 lambda self, v: self._swarm._posicionar(self._i, self.x, v))
+    spawn_x = property(lambda self: self._swarm.origem[self._i] % self._swarm.cols,
+                       lambda self, v: self._swarm._definir_origem(self._i, v, None))
+    spawn_y = property(lambda self: self._swarm.origem[self._i] // self._swarm.cols,
+                       lambda self, v: self._swarm._definir_origem(self._i, None, v))
+    type = property(lambda self: TIPOS[self._swarm.tipo[self._i]],
+                    lambda self, v: self._swarm.tipo.__setitem__(self._i, TIPOS.index(v)))
+    state = property(lambda self: ESTADOS[self._swarm.estado[self._i]],
+                     lambda self, v: self._swarm._mudar_estado(self._i, ESTADOS.index(v)))
+    vul_timer = property(lambda self: self._swarm.vul_timer[self._i],
+                         lambda self, v: self._swarm.vul_timer.__setitem__(self._i, v))
+
+class GhostSwarm:
+    """
+    Estado de todos os fantasmas em arrays, avançado em lote por step().
+    Também responde at(x, y) e rebuild() como o OccupancyGrid.
+    """
+    def __init__(self, distance_field, nearest, rng=None):
+        self.field = distance_field
+        self.nearest = nearest
+        self.rng = rng
+        self.cols = distance_field.cols
+        n = distance_field.rows * distance_field.cols
+        self.celula = array('i')
+        self.origem = array('i')
+        self.tipo = bytearray()
+        self.estado = bytearray()
+        self.vul_timer = array('i')
+        self.ocupacao = array('i', [0]) * n  # Fantasmas em cada célula
+        self.bloqueio = array('i', [0]) * n  # Fantasmas que bloqueiam a célula (os não comidos)
+        self.agentes = []
+        self._deslocamentos = [0] + [dx + dy * self.cols for dx, dy in DIRECOES]  # Código do passo -> delta da célula
+        self.blinky = -1  # Índice do Blinky de referência de Inky (o primeiro), ou -1
+
+    def add(self, x, y, color, gtype):
+        """Cria um fantasma no enxame e retorna o SwarmGhost dele."""
+        i = len(self.agentes)
+        c = y * self.cols + x
+        self.celula.append(c); self.origem.append(c)
+        self.tipo.append(TIPOS.index(gtype)); self.estado.append(CASA); self.vul_timer.append(0)
+        g = SwarmGhost(self, i, x, y, color, gtype, self.rng)
+        self.agentes.append(g)
+        self._contar(i, c, 1)
+        if gtype == "blinky" and self.blinky < 0: self.blinky = i
+        return g
+
+    def __len__(self):
+        return len(self.agentes)
+
+    def _contar(self, i, c, delta):
+        self.ocupacao[c] += delta
+        if self.estado[i] != COMIDO: self.bloqueio[c] += delta
+
+    def _posicionar(self, i, x, y):
+        antiga = self.celula[i]
+        if antiga >= 0: self._contar(i, antiga, -1)
+        c = self.celula[i] = y * self.cols + x
+        self._contar(i, c, 1)
+
+    def _definir_origem(self, i, x, y):
+        ox, oy = divmod(self.origem[i], self.cols)[::-1]
+        self.origem[i] = (oy if y is None else y) * self.cols + (ox if x is None else x)
+
+    def _mudar_estado(self, i, estado):
+        antes = self.estado[i] != COMIDO
+        self.estado[i] = estado
+        depois = estado != COMIDO
+        if antes != depois: self.bloqueio[self.celula[i]] += 1 if depois else -1
+
+    def em_casa(self):
+        """(índice, fantasma) dos que ainda estão na casa, achados direto no array de estados."""
+        estado = self.estado
+        i = estado.find(CASA)
+        while i >= 0:
+            yield i, self.agentes[i]
+            i = estado.find(CASA, i + 1)
+
+    # Interface do OccupancyGrid usada pelo GameEngine
+    def at(self, x, y):
+        c = y * self.cols + x
+        if not 0 <= c < len(self.ocupacao) or not self.ocupacao[c]: return ()
+        return [self.agentes[i] for i, ci in enumerate(self.celula) if ci == c]
+
+    def rebuild(self, entities=None):
+        """As posições já são mantidas pelos setters; só refaz as contagens a partir dos arrays."""
+        n = len(self.ocupacao)
+        self.ocupacao = array('i', [0]) * n
+        self.bloqueio = array('i', [0]) * n
+        for i, c in enumerate(self.celula): self._contar(i, c, 1)
+
+    def _alvo(self, i, cache, player):
+        """Alvo do fantasma i, como em Ghost._get_target_tile; cache guarda os alvos comuns do tick."""
+        estado = self.estado[i]
+        if estado == COMIDO:
+            return divmod(self.origem[i], self.cols)[::-1]
+        tipo = self.tipo[i]
+        if estado == VULNERAVEL: chave = "fuga"
+        elif tipo == PINKY: chave = "pinky"
+        elif tipo == INKY and self.blinky >= 0: chave = self.celula[self.blinky]  # Onde o Blinky está agora
+        elif tipo == CLYDE:
+            c = self.celula[i]
+            longe = abs(c % self.cols - player.x) + abs(c // self.cols - player.y) > 8
+            chave = "jogador" if longe else "canto"
+        else: chave = "jogador"  # Blinky e Inky sem Blinky
+        alvo = cache.get(chave)
+        if alvo is None:
+            walkable = self.nearest.lookup
+            px, py = player.x, player.y
+            if chave == "jogador": alvo = walkable(px, py)
+            elif chave == "fuga": alvo = max(CANTOS, key=lambda c: abs(c[0] - px) + abs(c[1] - py))
+            elif chave == "pinky": alvo = walkable(px + 4 * player.dx, py + 4 * player.dy)
+            elif chave == "canto": alvo = (1, ROWS - 2)
+            else:
+                by, bx = divmod(chave, self.cols)
+                alvo = walkable(px + (px - bx), py + (py - by))
+            cache[chave] = alvo
+        return alvo
+
+    def step(self, player, planner):
+        """Avança todos os fantasmas fora da casa um passo (um tick de movimento)."""
+        cols = self.cols
+        celula, estado, vul_timer, bloqueio, ocupacao = self.celula, self.estado, self.vul_timer, self.bloqueio, self.ocupacao
+        walkable, deslocamentos = self.field.walkable, self._deslocamentos
+        n = len(walkable)
+        alvos, tabelas = {}, {}
+        amostra = self.rng.sample
+        consultas = 0
+        for i in range(len(self.agentes)):
+            est = estado[i]
+            if est == CASA: continue
+            consultas += 1
+            if est == VULNERAVEL:
+                vul_timer[i] -= 1
+                if vul_timer[i] <= 0: estado[i] = est = PERSEGUICAO
+            alvo = self._alvo(i, alvos, player)
+            c = celula[i]
+            passos = tabelas.get(alvo, False)
+            if passos is False: passos = tabelas[alvo] = planner.passos(alvo)
+            codigo = passos[c] if passos is not None else 0
+            ideal = c + deslocamentos[codigo]
+            if not codigo or bloqueio[ideal]:
+                # Parado ou congestionado: primeira direção livre numa ordem sorteada
+                destino = c
+                x = c % cols
+                for dx, dy in amostra(DIRECOES_SORTEIO, 4):
+                    if not 0 <= x + dx < cols: continue
+                    d = c + dx + dy * cols
+                    if 0 <= d < n and walkable[d] and not bloqueio[d]:
+                        destino = d; break
+            else:
+                destino = ideal
+            if destino != c:
+                ocupacao[c] -= 1; ocupacao[destino] += 1
+                if est != COMIDO: bloqueio[c] -= 1; bloqueio[destino] += 1
+                celula[i] = destino
+            if est == COMIDO and destino == self.origem[i]:
+                self._mudar_estado(i, PERSEGUICAO)
+        planner._contar("consultas", consultas)
@@ -1,4 +1,8 @@
 from entities import Player, Ghost
+from grid import MazeGrid
+from sprites import SpriteCache
+from timing import FrameTimeHistogram, FixedTimestep
+from particles import ParticleSystem
 from config import COLOR_BLINKY, SUPER_MODE_DURATION
 
 def test_player_initialization():
@@ -71,6 +75,7 @@ def test_ghost_initialization():
     assert blinky.state == "house", "O estado inicial deve ser 'house'"
     assert blinky.vul_timer == 0, "O 'vul_timer' inicial deve ser 0"
     assert blinky.color == COLOR_BLINKY, "A cor do fantasma está incorreta"
+    assert not hasattr(blinky, "__dict__"), "As entidades usam __slots__ (sem __dict__ por instância)"
     print("   [OK] Inicialização do Ghost passou.")
 
 def test_ghost_state_changes():
@@ -115,6 +120,84 @@ def test_ghost_state_changes():
     assert ghost.state == "eaten", "Falha ao mudar para o estado 'eaten'"
     print("   [OK] Transição para o estado 'eaten'.")
 
+def test_maze_grid_counters():
+    """Testa a contagem incremental de pontos do MazeGrid usada pela condição de vitória."""
+    print("-> Testando os contadores do MazeGrid...")
+    maze = MazeGrid([
+        [1, 1, 1, 1, 1],
+        [1, 0, 2, 3, 1],
+        [1, 1, 4, 1, 1]
+    ])
+    assert maze.pellets_left == 2, "Deveria haver 2 pontos no início"
+    assert maze.ghost_house == (2, 2), "Casa dos fantasmas em posição incorreta"
+    assert maze[1][2] == 2 and 3 in maze[1], "A indexação maze[y][x] deve continuar funcionando"
+
+    player = Player(1, 1)
+    player.try_set_direction(1, 0, maze)
+    player.move(maze); player.move(maze)
+    assert player.score == 60, "A pontuação deveria ser 60 (10 + 50)"
+    assert maze.pellets_left == 0, "Todos os pontos deveriam ter sido comidos"
+    assert maze.pop_changes() == [(2, 1), (3, 1)], "As células alteradas deveriam ser registradas"
+    print("   [OK] Contadores do MazeGrid.")
+
+def test_sprite_cache_lru():
+    """Testa o cache de sprites: reaproveita itens e descarta o usado há mais tempo."""
+    print("-> Testando o SpriteCache...")
+    cache = SpriteCache(max_size=2)
+    criados = []
+    def factory(nome):
+        return lambda: criados.append(nome) or nome
+    assert cache.get(("a",), factory("a")) == "a"
+    cache.get(("b",), factory("b"))
+    cache.get(("a",), factory("a"))  # "a" passa a ser o mais recente
+    cache.get(("c",), factory("c"))  # Deve descartar "b"
+    assert len(cache) == 2, "O cache não deve passar do tamanho máximo"
+    assert criados == ["a", "b", "c"], "Itens em cache não devem ser recriados"
+    cache.get(("b",), factory("b"))
+    assert criados[-1] == "b" and cache.hits == 1, "O item descartado deveria ser recriado"
+    print("   [OK] SpriteCache.")
+
+def test_frame_time_histogram():
+    """Testa os percentis e a contagem de quadros acima do orçamento."""
+    print("-> Testando o FrameTimeHistogram...")
+    hist = FrameTimeHistogram(bucket_ms=1.0, max_ms=50.0, budget_ms=33.3)
+    for _ in range(98): hist.record(0.0045)  # 4.5 ms
+    hist.record(0.040); hist.record(0.250)    # Um quadro lento e um muito acima do máximo
+    assert hist.count == 100 and hist.over_budget == 2, "Deveria haver 2 quadros acima do orçamento"
+    assert hist.percentile(50) == 5.0, "O p50 deveria cair no balde de 4-5 ms"
+    assert hist.percentile(99) == 41.0, "O p99 deveria cair no balde de 40-41 ms"
+    assert hist.percentile(100) == 250.0, "O p100 deveria ser o maior tempo visto"
+    print("   [OK] FrameTimeHistogram.")
+
+def test_fixed_timestep():
+    """Testa o acumulador do passo fixo e o descarte de atraso acima do limite por quadro."""
+    print("-> Testando o FixedTimestep...")
+    agora = [0.0]
+    passo = FixedTimestep(tick_rate=10, max_ticks_per_frame=3, clock=lambda: agora[0])
+    ticks = []
+    for t in (0.0, 0.05, 0.1, 0.25, 0.26, 1.26):
+        agora[0] = t
+        ticks.append(passo.advance())
+    assert ticks == [0, 0, 1, 1, 0, 3], f"Ticks por quadro incorretos: {ticks}"
+    assert passo.ticks == 5 and passo.dropped_ticks == 7, "Os ticks além do limite deveriam ser descartados"
+    print("   [OK] FixedTimestep.")
+
+def test_particle_system():
+    """Testa o movimento, o descarte por tempo de vida e o limite de capacidade das partículas."""
+    print("-> Testando o ParticleSystem...")
+    system = ParticleSystem(capacity=3)
+    system.emit(10, 10, 1, -2, life=2)
+    system.emit(0, 0, life=5)
+    system.update()
+    assert system.positions() == [(11, 8), (0, 0)], "As partículas deveriam andar com a velocidade"
+    system.update()
+    assert len(system) == 1 and system.positions() == [(0, 0)], "A partícula sem vida deveria sumir"
+    for i in range(1, 4): system.emit(i, i)
+    assert len(system) == 3 and system.positions()[0] == (1, 1), "A mais antiga deveria sair primeiro"
+    system.clear()
+    assert not system, "O sistema deveria estar vazio"
+    print("   [OK] ParticleSystem.")
+
 
 def run_all_tests():
     """
@@ -132,6 +215,16 @@ def run_all_tests():
         test_ghost_initialization()
         print("-" * 40)
         test_ghost_state_changes()
+        print("-" * 40)
+        test_maze_grid_counters()
+        print("-" * 40)
+        test_sprite_cache_lru()
+        print("-" * 40)
+        test_frame_time_histogram()
+        print("-" * 40)
+        test_fixed_timestep()
+        print("-" * 40)
+        test_particle_system()
         
         print("\n===========================================")
         print(" [SUCESSO] Todos os testes passaram! ")
@@ -0,0 +1,140 @@
+import random
+from maze_generator import gerar_labirinto
+from hpa import HierarchicalPlanner
+from pathfinding import DIRECOES, bfs_next_step, find_nearest_walkable_global, DistanceField, NearestWalkableMap, GhostPlanner, DynamicDistanceField
+
+def _caminho_bfs(start, target, maze):
+    """Conta os passos seguindo bfs_next_step até o alvo."""
+    passos, pos = 0, start
+    while pos != target:
+        dx, dy = bfs_next_step(pos, target, maze)
+        if (dx, dy) == (0, 0):
+            return -1
+        pos = (pos[0] + dx, pos[1] + dy); passos += 1
+    return passos
+
+def test_distance_field_igual_ao_bfs():
+    """O DistanceField deve seguir caminhos mínimos com o mesmo tamanho do BFS."""
+    random.seed(1)
+    maze = gerar_labirinto()
+    field = DistanceField(maze)
+    livres = [(x, y) for y, r in enumerate(maze) for x, c in enumerate(r) if c != 1]
+    for _ in range(200):
+        a, b = random.choice(livres), random.choice(livres)
+        d = field.distance(a, b)
+        assert d == _caminho_bfs(a, b, maze), "Distância diferente do BFS"
+        if a != b:
+            dx, dy = field.next_step(a, b)
+            assert field.distance((a[0] + dx, a[1] + dy), b) == d - 1, "Passo fora do caminho mínimo"
+
+def test_distance_field_alvo_inalcancavel():
+    """Alvos em parede ou fora do labirinto retornam (0, 0), como o BFS."""
+    maze = [
+        [1, 1, 1, 1],
+        [1, 0, 0, 1],
+        [1, 1, 1, 1]
+    ]
+    field = DistanceField(maze)
+    assert field.next_step((1, 1), (0, 0)) == (0, 0)
+    assert field.next_step((1, 1), (9, 9)) == (0, 0)
+    assert field.next_step((1, 1), (2, 1)) == (1, 0)
+    assert field.distance((1, 1), (0, 0)) == -1
+
+def test_nearest_walkable_busca_em_todas_as_direcoes():
+    """A busca deve encontrar a célula livre logo abaixo (+y), que antes era ignorada."""
+    maze = [
+        [1, 1, 1],
+        [1, 1, 1],
+        [1, 0, 1]
+    ]
+    assert find_nearest_walkable_global(maze, 1, 1) == (1, 2)
+    assert NearestWalkableMap(maze).lookup(1, 1) == (1, 2)
+
+def test_nearest_walkable_map_igual_a_funcao():
+    """O mapa pré-calculado coincide com a busca, inclusive fora do labirinto."""
+    random.seed(2)
+    maze = gerar_labirinto()
+    mapa = NearestWalkableMap(maze)
+    rows, cols = len(maze), len(maze[0])
+    for y in range(-rows, 2 * rows):
+        for x in range(-cols, 2 * cols):
+            esperado = find_nearest_walkable_global(maze, x, y)
+            assert mapa.lookup(x, y) == esperado, f"Resultado diferente em ({x}, {y})"
+            assert maze[esperado[1]][esperado[0]] != 1, "A célula retornada deve ser caminhável"
+
+def test_labirinto_grande_sem_becos():
+    """Grades grandes não estouram a recursão, ficam conectadas e sem becos sem saída."""
+    maze = gerar_labirinto(201, 201, rng=random.Random(5))
+    rows, cols = len(maze), len(maze[0])
+    livres = {(x, y) for y, r in enumerate(maze) for x, c in enumerate(r) if c != 1}
+    vizinhos = lambda x, y: [(x + dx, y + dy) for dx, dy in [(1, 0), (-1, 0), (0, 1), (0, -1)] if (x + dx, y + dy) in livres]
+    for x, y in livres:
+        if 0 < x < cols - 1 and 0 < y < rows - 1:
+            assert len(vizinhos(x, y)) >= 2, f"Beco sem saída em ({x}, {y})"
+    inicio = next(iter(livres))
+    vistos, pilha = {inicio}, [inicio]
+    while pilha:
+        for v in vizinhos(*pilha.pop()):
+            if v not in vistos: vistos.add(v); pilha.append(v)
+    assert vistos == livres, "Todas as células livres deveriam estar conectadas"
+
+def test_planejador_uma_busca_por_alvo():
+    """O planejador responde como o DistanceField, com uma busca reversa por alvo distinto no tick."""
+    random.seed(3)
+    maze = gerar_labirinto()
+    livres = [(x, y) for y, r in enumerate(maze) for x, c in enumerate(r) if c != 1]
+    referencia = DistanceField(maze)
+    planner = GhostPlanner(DistanceField(maze, max_tabelas=2))
+    alvos = random.sample(livres, 3)
+    planner.begin_tick()
+    for i in range(30):
+        a, b = random.choice(livres), alvos[i % 3]
+        assert planner.next_step(a, b) == referencia.next_step(a, b)
+    assert planner.ultimo == {"consultas": 30, "alvos": 3, "buscas": 3}
+    assert len(planner.field._tabelas) == 2, "O DistanceField deveria guardar no máximo max_tabelas"
+    planner.begin_tick()
+    planner.next_step(livres[0], alvos[2])
+    assert planner.ultimo["buscas"] == 0, "A tabela do alvo mais recente deveria continuar guardada"
+
+def test_distance_field_dinamico_igual_a_recalcular():
+    """Depois de cada parede posta ou tirada, as tabelas consertadas têm as distâncias de uma busca do zero."""
+    rng = random.Random(4)
+    maze = [list(r) for r in gerar_labirinto(41, 41, rng=random.Random(2))]
+    field = DynamicDistanceField(maze)
+    livres = [(x, y) for y, r in enumerate(maze) for x, c in enumerate(r) if c != 1]
+    for alvo in rng.sample(livres, 4): field.distance(alvo, alvo)
+    for i in range(300):
+        x, y = rng.randrange(41), rng.randrange(41)
+        parede = maze[y][x] != 1
+        maze[y][x] = 1 if parede else 0
+        field.set_wall((x, y), parede)
+        if i % 25: continue
+        referencia = DistanceField(maze)
+        for alvo, (dist, passos) in field._tabelas.items():
+            assert dist == referencia._tabela(alvo)[0], f"Distâncias erradas após a edição {i}"
+            for c, d in enumerate(dist):
+                if d > 0:
+                    dx, dy = DIRECOES[passos[c] - 1]
+                    assert dist[c + dx + dy * 41] == d - 1, "Passo fora do caminho mínimo"
+    assert field.reparos > 0 and field.buscas <= 4, "As edições deveriam consertar as tabelas, não refazê-las"
+
+def test_planejador_hierarquico_chega_ao_alvo():
+    """O HPA* nunca promete menos que a distância mínima, e seguir next_step chega ao alvo nesse custo."""
+    rng = random.Random(6)
+    maze = gerar_labirinto(61, 61, rng=random.Random(6))
+    field, hpa = DistanceField(maze), HierarchicalPlanner(maze, tamanho_cluster=8)
+    livres = [(x, y) for y, r in enumerate(maze) for x, c in enumerate(r) if c != 1]
+    for _ in range(15):
+        a, b = rng.choice(livres), rng.choice(livres)
+        custo = hpa.distance(a, b)
+        assert field.distance(a, b) <= custo <= 1.2 * field.distance(a, b) + 2
+        pos, passos = a, 0
+        while pos != b and passos <= custo:
+            dx, dy = hpa.next_step(pos, b)
+            pos = (pos[0] + dx, pos[1] + dy); passos += 1
+            assert maze[pos[1]][pos[0]] != 1, "Passo para dentro da parede"
+        assert pos == b and passos <= custo
+    assert hpa.stats()["expandidos_por_busca"] < hpa.stats()["entradas"]
+    separado = HierarchicalPlanner([[1, 1, 1, 1], [0, 1, 0, 0], [1, 1, 1, 1]], tamanho_cluster=2)
+    assert separado.next_step((0, 1), (3, 1)) == (0, 0) and separado.distance((0, 1), (3, 1)) == -1
+    assert separado.next_step((2, 1), (3, 1)) == (1, 0)
@@ -0,0 +1,255 @@
+import os
+import sys
+import subprocess
+import json
+import random
+from maze_generator import gerar_labirinto
+from maze_pool import MazePool
+from profiler import Profiler
+from utils import ScoreStore
+from simulation import HeadlessGame, ScriptedController
+from batch import simular_lote, simular_jogo, COLUMNS
+from replay import Replay, reproduzir
+from vec_env import VecEnv, SubprocVecEnv, CANAL_LABIRINTO, CANAL_JOGADOR, CANAL_FANTASMAS, CANAL_COMIDOS
+from large_map import ChunkedMaze, HeadlessLargeMap, TAMANHO_CHUNK
+
+def test_jogo_headless_nao_comeca_sem_entrada():
+    """Sem nenhuma tecla o jogo não começa: ninguém se move e o frame não avança."""
+    game = HeadlessGame(controller=ScriptedController([]))
+    pos = (game.player.x, game.player.y)
+    result = game.run(max_ticks=50)
+    assert result["ticks"] == 50 and result["frames"] == 0
+    assert (game.player.x, game.player.y) == pos
+
+def test_jogo_headless_termina():
+    """Com o controlador guloso o jogo termina (vitória ou fim das vidas)."""
+    result = HeadlessGame(seed=3).run()
+    assert result["ticks"] > 0 and result["tps"] > 0
+    assert result["win"] or result["lives"] == 0
+    assert result["score"] >= 10 * result["pellets_eaten"] > 0
+
+def test_lote_guarda_uma_linha_por_jogo():
+    """O lote gera uma linha por seed, e a mesma seed repete o mesmo jogo."""
+    tabela = simular_lote(3, seed=10, processos=1)
+    assert len(tabela) == 3
+    assert list(tabela.column("seed")) == [10, 11, 12]
+    assert simular_jogo(10) == tuple(tabela.columns[name][0] for name in COLUMNS)
+
+def test_replay_reproduz_o_jogo():
+    """Gravar, serializar e reproduzir um jogo deve dar exatamente o mesmo resultado."""
+    game = HeadlessGame(seed=1234, record=True)
+    original = game.run()
+    replay = Replay.from_bytes(game.recorder.to_bytes(original["score"]))
+    assert replay.seed == 1234 and replay.ticks == original["ticks"]
+    result = reproduzir(replay)
+    for key in ("score", "ticks", "frames", "win", "lives", "pellets_eaten", "deaths_by_ghost"):
+        assert result[key] == original[key], f"Replay divergiu em '{key}'"
+
+def test_mesma_seed_mesmo_labirinto():
+    """A seed determina o labirinto e o jogo inteiro."""
+    a, b = HeadlessGame(seed=7), HeadlessGame(seed=7)
+    assert a.maze == b.maze
+    assert a.run() == {**b.run(), "tps": a.result()["tps"]}
+
+def test_reserva_de_labirintos(tmp_path):
+    """A reserva devolve o mesmo labirinto da seed; só as seeds pedidas vão para o cache em disco, limitado."""
+    db = str(tmp_path / "cache.db")
+    pool = MazePool(tamanho=2, db_path=db, background=False)
+    pool.fill()
+    seed = pool.take_seed()
+    assert pool.get(seed) == gerar_labirinto(rng=random.Random(seed))
+    assert pool.prontos() == 1, "O labirinto entregue deveria sair da reserva"
+    pool.close()
+
+    outro = MazePool(db_path=db, background=False, max_cache=3)
+    assert outro._ler_cache(seed) is None, "Labirintos da reserva (seeds sorteadas) não vão para o disco"
+    sorteada = outro.take_seed()  # Reserva vazia: a seed nova também não pode ir para o disco
+    assert outro.get(sorteada) == gerar_labirinto(rng=random.Random(sorteada))
+    assert outro._ler_cache(sorteada) is None and outro.prontos() == 0
+    assert HeadlessGame(seed=seed, maze_pool=outro).maze == HeadlessGame(seed=seed).maze
+    assert outro._ler_cache(seed) is not None, "O labirinto pedido por seed deveria estar no cache em disco"
+    for s in range(5): outro.get(s)
+    assert outro._conn.execute("SELECT COUNT(*) FROM labirintos").fetchone()[0] == 3
+    assert outro._ler_cache(seed) is None and outro._ler_cache(4) is not None, "Os mais antigos saem primeiro"
+    outro.close()
+
+def test_indice_de_ocupacao_acompanha_os_fantasmas():
+    """O índice de ocupação deve refletir a posição de cada fantasma durante o jogo."""
+    game = HeadlessGame(seed=21)
+    for _ in range(3000):
+        game.step()
+        for g in game.ghosts:
+            assert g in game.occupancy.at(g.x, g.y), f"{g.type} fora do índice em ({g.x}, {g.y})"
+        assert len(game.occupancy) == len(game.ghosts)
+        if game.game_over: break
+
+def test_enxame_em_lote_igual_aos_fantasmas_individuais():
+    """O GhostSwarm joga exatamente como os Ghost.update individuais, com 4 ou com dezenas de fantasmas."""
+    for seed, n in [(3, 4), (8, 4), (5, 40)]:
+        individual = HeadlessGame(seed=seed, n_ghosts=n).run()
+        lote = HeadlessGame(seed=seed, n_ghosts=n, swarm=True)
+        resultado = lote.run()
+        individual.pop("tps"); resultado.pop("tps")
+        assert resultado == individual, f"seed {seed} com {n} fantasmas"
+    contagem = sum(lote.swarm.ocupacao)
+    assert contagem == len(lote.ghosts) == 40
+    assert all(g in lote.occupancy.at(g.x, g.y) for g in lote.ghosts)
+
+def _passos_aleatorios(env, passos=300):
+    obs = env.reset(seed=7)
+    rng = random.Random(1)
+    historico = []
+    for _ in range(passos):
+        obs, recompensas, terminados, infos = env.step([rng.randrange(5) for _ in range(env.n_envs)])
+        historico.append((obs.tobytes(), list(recompensas), bytes(terminados), infos))
+    return obs, historico
+
+def test_ambiente_vetorizado_em_processo_e_em_subprocessos():
+    """As observações descrevem o jogo, e os dois backends dão os mesmos resultados para as mesmas ações."""
+    with VecEnv(3, max_ticks=200) as env:
+        obs, local = _passos_aleatorios(env)
+        assert obs.shape == env.observation_shape == (3, 5, 31, 27)
+        game, canais = env._jogos.games[1], obs.tolist()[1]
+        assert bytes(sum(canais[CANAL_LABIRINTO], [])) == game.maze.tobytes()
+        assert obs[1, CANAL_JOGADOR, game.player.y, game.player.x] > 0
+        fora_de_perigo = sum(g.state == "vulnerable" for g in game.ghosts)
+        assert sum(sum(canais[CANAL_FANTASMAS], []) + sum(canais[CANAL_COMIDOS], [])) == 4 - fora_de_perigo
+        assert any(infos[k] and infos[k]["truncado"] for *_, infos in local for k in range(3))
+    with SubprocVecEnv(3, processos=2, max_ticks=200) as env:
+        assert _passos_aleatorios(env)[1] == local
+
+def test_perfil_de_jogo_headless(tmp_path):
+    """O profiler mede os subsistemas da simulação e exporta o resultado em JSON e CSV."""
+    profiler = Profiler()
+    HeadlessGame(seed=5, profiler=profiler).run(max_ticks=600)
+    stats = profiler.stats()
+    for secao in ("update_player", "update_ghosts", "check_collisions"):
+        assert stats[secao]["chamadas"] > 0 and stats[secao]["p99_ms"] >= stats[secao]["p50_ms"]
+    assert profiler.contadores()["consultas_caminho"] > 0
+    profiler.export(str(tmp_path / "perfil.json"))
+    profiler.export(str(tmp_path / "perfil.csv"))
+    assert json.loads((tmp_path / "perfil.json").read_text())["secoes"].keys() == stats.keys()
+    assert (tmp_path / "perfil.csv").read_text().startswith("secao,chamadas")
+
+def test_ferramentas_sem_tela_nao_importam_graficos():
+    """Os módulos de simulação não podem carregar pygame nem PyQt6 ao serem importados e usados."""
+    codigo = ("import sys, simulation, batch, replay; simulation.HeadlessGame(seed=1).run(max_ticks=200); "
+              "print(','.join(m for m in ('pygame', 'PyQt6') if m in sys.modules))")
+    saida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True,
+                           cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert saida.returncode == 0, saida.stderr
+    assert saida.stdout.strip() == "", f"Módulos gráficos carregados: {saida.stdout.strip()}"
+    # As entidades adiam o pygame sem puxar o módulo de placares (sqlite3, threads)
+    codigo = "import sys, entities; print(','.join(m for m in ('pygame', 'sqlite3', 'utils') if m in sys.modules))"
+    saida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True,
+                           cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert saida.returncode == 0 and saida.stdout.strip() == "", saida.stdout + saida.stderr
+
+def test_placar_assincrono_em_lotes(tmp_path):
+    """O ScoreStore grava em segundo plano, mantém o maior score por nome e atualiza o top após cada gravação."""
+    store = ScoreStore(str(tmp_path / "placar.db"))
+    for i in range(2000): store.save(f"sim{i % 50}", i)
+    top = store.top(3)
+    assert top == [("sim49", 1999), ("sim48", 1998), ("sim47", 1997)]
+    assert store.top(3) is top, "Sem novas gravações o top deve vir do cache"
+    assert store.lotes < 2000, "As gravações deveriam ser agrupadas em lotes"
+    store.save("sim0", 5)  # Menor que o score atual: não muda nada
+    store.save("novo", 10_000)
+    assert store.top(2) == [("novo", 10_000), ("sim49", 1999)]
+    store.close()
+    reaberto = ScoreStore(str(tmp_path / "placar.db"))
+    assert reaberto.top(1) == [("novo", 10_000)], "Os placares deveriam estar no disco"
+    reaberto.save("grande", 2**70)  # Não cabe no SQLite: só esse placar se perde
+    reaberto.save("depois", 20_000)
+    assert reaberto.top(2) == [("depois", 20_000), ("novo", 10_000)]
+    reaberto._fila.put(None); reaberto._escritora.join()  # Escritora parada: as leituras não podem travar
+    reaberto.save("perdido", 30_000)
+    assert reaberto.top(1) == [("depois", 20_000)]
+    reaberto.close()
+
+def test_ranking_paginado_e_posicao(tmp_path):
+    """As páginas por chave cobrem o ranking sem repetir ninguém; rank e around concordam com a ordem das páginas."""
+    store = ScoreStore(str(tmp_path / "placar.db"))
+    for i in range(95): store.save(f"j{i}", i // 2)  # Empates: o primeiro a chegar fica na frente
+    ordem, cursor = [], None
+    while True:
+        pagina = store.page(10, after=cursor)
+        if not pagina: break
+        ordem += [nome for _, nome, _ in pagina]
+        cursor = (pagina[-1][2], pagina[-1][0])
+    assert len(ordem) == len(set(ordem)) == 95
+    assert ordem[:3] == ["j94", "j92", "j93"]
+    assert store.rank("j93") == (3, 46) and store.rank("ninguem") is None
+    assert [nome for _, nome, _ in store.around("j50", 2)] == ordem[ordem.index("j50") - 2:ordem.index("j50") + 3]
+    assert store.around("j94", 2)[0] == (1, "j94", 47)
+    assert [n for _, n, _ in store.page(3, periodo="dia")] == ordem[:3]
+    store.close()
+
+def test_mapa_grande_em_pedacos():
+    """Pedaços vizinhos concordam nas aberturas, o mapa é conexo e o jogo só gera e simula a área ao redor da câmera."""
+    s = TAMANHO_CHUNK
+    maze = ChunkedMaze(3, 3, seed=4)
+    for y in range(3 * s):
+        for x in (s - 1, 2 * s - 1):
+            assert (maze[y][x] == 1) == (maze[y][x + 1] == 1), f"Borda leste/oeste diferente em ({x}, {y})"
+    livres = {(x, y) for y in range(3 * s) for x in range(3 * s) if maze[y][x] != 1}
+    vistos, pilha = {(s // 2 - 1, s // 2)}, [(s // 2 - 1, s // 2)]
+    while pilha:
+        x, y = pilha.pop()
+        for viz in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if viz in livres and viz not in vistos: vistos.add(viz); pilha.append(viz)
+    assert vistos == livres, "Todas as células caminháveis deveriam estar ligadas"
+    path = maze.path
+    maze.close()
+    assert not os.path.exists(path), "O arquivo temporário deveria ser apagado no close()"
+
+    game = HeadlessLargeMap(seed=2, chunks=256)
+    resultado = game.run(max_ticks=1500)
+    assert resultado["pellets_eaten"] > 0
+    assert 0 < resultado["chunks"] < 100, "Só a região ao redor da câmera deveria ter sido gerada"
+    assert len(game.ghosts) == 4 + resultado["chunks"] - 1
+    assert 0 < game.active_ghosts <= len(game.ghosts)
+    listas = [(chunk, g) for chunk, fantasmas in game.ghosts_by_chunk.items() for g in fantasmas]
+    assert len(listas) == len(game.ghosts) and all(chunk == (g.x // s, g.y // s) for chunk, g in listas), \
+        "Cada fantasma deveria estar na lista do pedaço onde está"
+    path = game.maze.path
+    game.close()
+    assert not os.path.exists(path)
+    for opcao in ({"swarm": True}, {"maze_pool": object()}):
+        try: HeadlessLargeMap(seed=2, **opcao)
+        except ValueError: pass
+        else: raise AssertionError(f"O mapa grande deveria recusar {opcao}")
+
+def test_mapa_grande_alvos_dentro_da_regiao():
+    """Longe do início, os alvos dos fantasmas (perseguição, fuga, Clyde, Inky) ficam na região ativa e nada fora dela é gerado."""
+    from pathfinding import find_nearest_walkable_global
+    s = TAMANHO_CHUNK
+    game = HeadlessLargeMap(seed=2, chunks=256)
+    cobertos, alvos = set(), []
+    def cobrir():
+        cx0, cy0, cx1, cy1 = game.region
+        cobertos.update((cx, cy) for cx in range(cx0, cx1 + 1) for cy in range(cy0, cy1 + 1))
+    next_step = game.planner.next_step
+    def registrar(start, target):
+        alvos.append((target, game.region))
+        return next_step(start, target)
+    game.planner.next_step = registrar
+    cobrir()
+    game._check_collisions = lambda: None  # O jogador não morre: o jogo fica longe do pedaço (0, 0)
+    game.player.x, game.player.y = find_nearest_walkable_global(game.maze, 20 * s + s // 2, 20 * s + s // 2)
+    game._update_camera(); cobrir()
+    # Um fantasma original devorado, com a casa lá no pedaço (0, 0)
+    devorado = game.ghosts[1]
+    game.occupancy.remove(devorado)
+    devorado.x, devorado.y, devorado.state = game.player.x, game.player.y, "eaten"
+    game.occupancy.add(devorado)
+    for t in range(1500):
+        if t == 300:
+            for g in game.ghosts: g.state, g.vul_timer = "vulnerable", 300
+        game.step(); cobrir()
+    assert len(alvos) > 100 and game.active_ghosts > 0 and game.player.x // s >= 19
+    for (x, y), (cx0, cy0, cx1, cy1) in alvos:
+        assert cx0 * s <= x < (cx1 + 1) * s and cy0 * s <= y < (cy1 + 1) * s, f"Alvo ({x}, {y}) fora da região"
+    gerados = {(i % 256, i // 256) for i, v in enumerate(game.maze.gerados) if v}
+    assert gerados == cobertos, "Só os pedaços das regiões visitadas deveriam ser gerados"
+    game.close()
@@ -0,0 +1,118 @@
+"""
+Medição de tempo e passo fixo do laço do PacManNJ.
+
+FrameTimeHistogram guarda quanto cada quadro levou (eventos + lógica + desenho,
+sem a espera do clock.tick) em baldes de largura fixa, então o custo de memória
+não cresce com a duração da partida. Serve para conferir se o orçamento de
+1/FPS segundos por quadro está sendo cumprido com folga.
+
+FixedTimestep desacopla a simulação do desenho: o tempo real entra num
+acumulador e sai em ticks de duração fixa, então o jogo anda na mesma
+velocidade com qualquer taxa de quadros.
+"""
+import time
+from array import array
+from config import FPS, MAX_FRAME_SKIP
+
+class FrameTimeHistogram:
+    """Histograma de tempos de quadro em baldes de bucket_ms milissegundos."""
+    def __init__(self, bucket_ms=0.5, max_ms=100.0, budget_ms=1000.0 / FPS):
+        self.bucket_ms = bucket_ms
+        self.budget_ms = budget_ms
+        # O último balde acumula todos os quadros acima de max_ms
+        self.counts = array('L', [0] * (int(max_ms / bucket_ms) + 1))
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_seen_ms = 0.0
+        self.over_budget = 0
+
+    def record(self, seconds):
+        ms = seconds * 1000.0
+        self.counts[min(int(ms / self.bucket_ms), len(self.counts) - 1)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_seen_ms: self.max_seen_ms = ms
+        if ms > self.budget_ms: self.over_budget += 1
+
+    def percentile(self, p):
+        """Tempo (ms, limite superior do balde) abaixo do qual estão p% dos quadros."""
+        if self.count == 0: return 0.0
+        limite = p / 100.0 * self.count
+        acumulado = 0
+        for i, n in enumerate(self.counts):
+            acumulado += n
+            if acumulado >= limite and i < len(self.counts) - 1:
+                return min((i + 1) * self.bucket_ms, self.max_seen_ms)
+        return self.max_seen_ms
+
+    def mean(self):
+        return self.total_ms / self.count if self.count else 0.0
+
+    def summary(self):
+        return {
+            "frames": self.count,
+            "mean_ms": self.mean(),
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max_seen_ms,
+            "budget_ms": self.budget_ms,
+            "over_budget": self.over_budget,
+        }
+
+    def report(self):
+        s = self.summary()
+        folga = 100.0 * (1 - s["p99_ms"] / s["budget_ms"]) if s["budget_ms"] else 0.0
+        return (f"{s['frames']} quadros: média {s['mean_ms']:.2f} ms, p50 {s['p50_ms']:.2f} ms, "
+                f"p95 {s['p95_ms']:.2f} ms, p99 {s['p99_ms']:.2f} ms, máx {s['max_ms']:.2f} ms; "
+                f"orçamento {s['budget_ms']:.1f} ms (folga no p99: {folga:.0f}%), "
+                f"{s['over_budget']} quadros acima")
+
+class FixedTimestep:
+    """
+    Agendador de passo fixo com acumulador.
+
+    advance() diz quantos ticks simular antes do próximo quadro. Se o atraso
+    passar de max_ticks_per_frame ticks (máquina lenta, janela arrastada), o
+    excesso é descartado em vez de acumular: o jogo fica mais lento por um
+    instante, mas não tenta recuperar tudo de uma vez e travar de vez.
+    """
+    def __init__(self, tick_rate=FPS, max_ticks_per_frame=MAX_FRAME_SKIP, clock=time.perf_counter):
+        self.dt = 1.0 / tick_rate
+        self.max_ticks_per_frame = max_ticks_per_frame
+        self.clock = clock
+        self.accumulator = 0.0
+        self.ticks = self.frames = self.dropped_ticks = 0
+        self.max_ticks_in_frame = 0
+        self.start = self._last = None
+
+    def advance(self):
+        now = self.clock()
+        if self._last is None: self.start = self._last = now
+        self.accumulator += now - self._last
+        self._last = now
+        n = int(self.accumulator / self.dt)
+        if n > self.max_ticks_per_frame:
+            self.dropped_ticks += n - self.max_ticks_per_frame
+            self.accumulator -= (n - self.max_ticks_per_frame) * self.dt
+            n = self.max_ticks_per_frame
+        self.accumulator -= n * self.dt
+        self.ticks += n; self.frames += 1
+        if n > self.max_ticks_in_frame: self.max_ticks_in_frame = n
+        return n
+
+    def summary(self):
+        elapsed = (self._last - self.start) if self.start is not None else 0.0
+        return {
+            "ticks": self.ticks,
+            "frames": self.frames,
+            "dropped_ticks": self.dropped_ticks,
+            "max_ticks_in_frame": self.max_ticks_in_frame,
+            "tick_rate": self.ticks / elapsed if elapsed > 0 else 0.0,
+            "frame_rate": self.frames / elapsed if elapsed > 0 else 0.0,
+        }
+
+    def report(self):
+        s = self.summary()
+        return (f"{s['ticks']} ticks ({s['tick_rate']:.1f}/s), {s['frames']} quadros ({s['frame_rate']:.1f}/s), "
+                f"até {s['max_ticks_in_frame']} ticks num quadro, {s['dropped_ticks']} ticks descartados")
@@ -1,43 +1,89 @@
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QPushButton,
-    QLabel, QLineEdit, QMessageBox, QDialog, QTextEdit, QHBoxLayout
+    QLabel, QLineEdit, QMessageBox, QDialog, QTextEdit, QHBoxLayout, QComboBox
 )
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont
-from utils import carregar_placares
-from game import Game
+from utils import score_store
+from maze_pool import MazePool
 
 class PlacaresDialog(QDialog):
-    """Janela de diálogo para exibir os placares."""
-    def __init__(self, parent=None):
+    """Janela de diálogo para exibir os placares, 10 por página, já ordenados pelo banco."""
+    POR_PAGINA = 10
+    PERIODOS = [("Geral", None), ("Hoje", "dia"), ("Semana", "semana")]
+
+    def __init__(self, parent=None, nome=""):
         super().__init__(parent)
-        self.setWindowTitle("Placares - Top 10")
-        self.setFixedSize(360, 420)
+        self.setWindowTitle("Placares")
+        self.setFixedSize(360, 460)
         self.setStyleSheet("background-color: #0A0A0A; color: #FFD700;")
+        self.store = score_store()
+        self.nome = nome
         layout = QVBoxLayout()
         title = QLabel("🏆 Placar de Líderes")
         title.setFont(QFont("Impact", 20))
         title.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(title)
-        
-        entries = carregar_placares()
-        
-        if not entries:
-            txt = QLabel("Nenhum placar registado ainda.")
-            txt.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            layout.addWidget(txt)
-        else:
-            entries_sorted = sorted(entries, key=lambda x: x[1], reverse=True)[:10]
-            text_edit = QTextEdit(); text_edit.setReadOnly(True)
-            text_edit.setStyleSheet("background-color: #111; color: #FFD700; font-family: 'Courier New', monospace; border: 1px solid #FFD700; padding: 5px;")
-            content = "\n".join([f"{i+1:2d}. {n:<12}  {p:6d}" for i, (n, p) in enumerate(entries_sorted)])
-            text_edit.setText(content); layout.addWidget(text_edit)
-            
+
+        self.periodo = QComboBox()
+        self.periodo.addItems([rotulo for rotulo, _ in self.PERIODOS])
+        self.periodo.currentIndexChanged.connect(self._primeira_pagina)
+        layout.addWidget(self.periodo)
+
+        self.text_edit = QTextEdit(); self.text_edit.setReadOnly(True)
+        self.text_edit.setStyleSheet("background-color: #111; color: #FFD700; font-family: 'Courier New', monospace; border: 1px solid #FFD700; padding: 5px;")
+        layout.addWidget(self.text_edit)
+
+        # Paginação por chave: cursores[i] é a chave (score, id) de onde começa a página i
+        navegacao = QHBoxLayout()
+        self.btn_anterior = QPushButton("◀ Anterior"); self.btn_proxima = QPushButton("Próxima ▶")
+        for btn in (self.btn_anterior, self.btn_proxima):
+            btn.setStyleSheet("background-color:#222; color: yellow; border:1px solid yellow; padding:4px;")
+            navegacao.addWidget(btn)
+        self.btn_anterior.clicked.connect(self._pagina_anterior)
+        self.btn_proxima.clicked.connect(self._proxima_pagina)
+        layout.addLayout(navegacao)
+
+        self.posicao = QLabel(""); self.posicao.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.posicao)
+        if nome:
+            rank = self.store.rank(nome)
+            if rank is not None: self.posicao.setText(f"{nome}: {rank[0]}º lugar ({rank[1]} pontos)")
+
+        self._primeira_pagina()
+
         btn_close = QPushButton("Fechar")
         btn_close.setStyleSheet("background-color:#222; color: yellow; border:1px solid yellow; padding:8px;")
         btn_close.clicked.connect(self.accept); layout.addWidget(btn_close)
         self.setLayout(layout)
 
+    def _primeira_pagina(self):
+        self.cursores = [None]
+        self._mostrar()
+
+    def _proxima_pagina(self):
+        self.cursores.append(self._proximo_cursor)
+        self._mostrar()
+
+    def _pagina_anterior(self):
+        if len(self.cursores) > 1: self.cursores.pop()
+        self._mostrar()
+
+    def _mostrar(self):
+        periodo = self.PERIODOS[self.periodo.currentIndex()][1]
+        # Uma linha a mais só para saber se existe próxima página
+        linhas = self.store.page(self.POR_PAGINA + 1, after=self.cursores[-1], periodo=periodo)
+        pagina = linhas[:self.POR_PAGINA]
+        inicio = (len(self.cursores) - 1) * self.POR_PAGINA
+        if pagina:
+            content = "\n".join(f"{inicio+i+1:3d}. {n:<12}  {p:6d}" for i, (_, n, p) in enumerate(pagina))
+        else:
+            content = "Nenhum placar registado ainda."
+        self.text_edit.setText(content)
+        self._proximo_cursor = (pagina[-1][2], pagina[-1][0]) if pagina else None
+        self.btn_anterior.setEnabled(len(self.cursores) > 1)
+        self.btn_proxima.setEnabled(len(linhas) > self.POR_PAGINA)
+
 class MenuPrincipal(QWidget):
     """A janela principal do menu do jogo (DEPENDÊNCIA de Game)."""
     def __init__(self):
@@ -48,6 +94,8 @@ class MenuPrincipal(QWidget):
         self.btn_jogar.clicked.connect(self.on_jogar)
         self.btn_placares.clicked.connect(self.on_placares)
         self.btn_sair.clicked.connect(self.close)
+        # Gera labirintos em segundo plano enquanto o menu está aberto
+        self.maze_pool = MazePool()
 
     def _setup_ui(self):
         titulo = QLabel("PAC-MAN"); titulo.setFont(QFont("Impact", 48, QFont.Weight.Bold))
@@ -79,12 +127,17 @@ class MenuPrincipal(QWidget):
             
         self.hide()
         
-        game_instance = Game(nome)
+        from game import Game  # pygame só é carregado quando a primeira partida começa
+        game_instance = Game(nome, maze_pool=self.maze_pool)
         score = game_instance.run()
         
         QMessageBox.information(self, "Fim de jogo", f"{nome}, a sua pontuação final foi: {score}")
         self.show()
 
     def on_placares(self):
-        dlg = PlacaresDialog(self); dlg.exec()
+        dlg = PlacaresDialog(self, nome=self.nome_input.text().strip()); dlg.exec()
+
+    def closeEvent(self, event):
+        self.maze_pool.close()
+        super().closeEvent(event)
 
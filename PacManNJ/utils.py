@@ -1,73 +1,195 @@
 import sqlite3
-import os
+import queue
+import atexit
+import threading
 from config import DATABASE_FILE 
+from database_setup import SQL_CRIAR_PLACARES, SQL_INDICES_PLACARES
 
-def carregar_placares():
+SQL_UPSERT_PLACAR = """
+INSERT INTO placares (nome, score, data_registro) 
+VALUES (?, ?, CURRENT_TIMESTAMP)
+ON CONFLICT(nome) DO UPDATE SET
+    score = excluded.score,
+    data_registro = CURRENT_TIMESTAMP
+WHERE excluded.score > placares.score;
+"""
+
+# Janelas dos rankings por período (modificadores de datetime do SQLite)
+PERIODOS = {"dia": "-1 day", "semana": "-7 days"}
+
+class ScoreStore:
     """
-    Carrega os 10 maiores placares do banco de dados SQLite.
+    Placar persistente com escrita assíncrona.
+
+    - Uma conexão de leitura fica aberta, e o banco usa o modo WAL, então
+      leituras não esperam pelas escritas.
+    - save() só coloca o placar numa fila. Uma thread escritora, com a conexão
+      dela, grava o que acumulou em lotes (uma transação por lote).
+    - top(n) guarda o resultado em memória até o próximo save().
+    - As consultas do ranking (page, rank, around) usam os índices de score e
+      data, com paginação por chave (score, id) em vez de OFFSET.
     """
-    # Verifica se o banco de dados existe antes de tentar conectar
-    if not os.path.exists(DATABASE_FILE):
-        print(f"Aviso: Banco de dados '{DATABASE_FILE}' não encontrado.")
-        print("Execute 'python database_setup.py' para criar o banco.")
-        return []
+    def __init__(self, db_path=DATABASE_FILE, batch_size=1000):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self._fila = queue.Queue()
+        self._lock = threading.Lock()
+        self._geracao = 0  # Aumenta a cada save(); invalida o cache do top
+        self._cache = {}
+        self.lotes = 0
+        self._leitura = sqlite3.connect(db_path, check_same_thread=False)
+        self._leitura.execute("PRAGMA journal_mode=WAL")
+        self._leitura.execute(SQL_CRIAR_PLACARES)
+        for sql in SQL_INDICES_PLACARES: self._leitura.execute(sql)
+        self._leitura.commit()
+        self._escritora = threading.Thread(target=self._escrever, name="ScoreStore", daemon=True)
+        self._escritora.start()
 
-    try:
-        # Conecta ao banco de dados em modo somente leitura
-        conn = sqlite3.connect(f"file:{DATABASE_FILE}?mode=ro&immutable=1", uri=True)
-        cursor = conn.cursor()
-        
-        # Executa o comando SQL para selecionar e ordenar os placares
-        cursor.execute("""
-        SELECT nome, score 
-        FROM placares 
-        ORDER BY score DESC 
-        LIMIT 10;
-        """)
-        
-        entries = cursor.fetchall()
-        return entries
-        
-    except sqlite3.OperationalError as e:
-        print(f"Erro operacional ao carregar placares: {e}")
-        print("Certifique-se de que o banco de dados e a tabela 'placares' existem.")
-        return []
-    except sqlite3.Error as e:
-        print(f"Erro ao carregar placares do SQLite: {e}")
-        return []
-    finally:
-        if 'conn' in locals() and conn:
+    def _escrever(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA synchronous=NORMAL")  # Seguro em WAL; não faz fsync a cada transação
+        try:
+            while True:
+                item = self._fila.get()
+                lote = [item]
+                while item is not None and len(lote) < self.batch_size:
+                    try: item = self._fila.get_nowait()
+                    except queue.Empty: break
+                    lote.append(item)
+                placares = [p for p in lote if p is not None]
+                try:
+                    if placares: self._gravar_lote(conn, placares)
+                except Exception as e:  # A thread não pode morrer: flush() e as leituras esperam por ela
+                    print(f"Erro ao salvar/atualizar placares no SQLite: {e}")
+                finally:
+                    for _ in lote: self._fila.task_done()
+                if None in lote: return
+        finally:
             conn.close()
 
+    def _gravar_lote(self, conn, placares):
+        """Grava o lote numa transação; se ela falhar, grava um por um e avisa quais placares se perderam."""
+        try:
+            with conn: conn.executemany(SQL_UPSERT_PLACAR, placares)
+        except Exception:
+            for placar in placares:
+                try:
+                    with conn: conn.execute(SQL_UPSERT_PLACAR, placar)
+                except Exception as e:
+                    print(f"Erro ao salvar/atualizar placar {placar} no SQLite: {e}")
+        with self._lock: self.lotes += 1
+
+    def save(self, nome, score):
+        """Agenda a gravação (só atualiza se o novo score for maior) e retorna na hora."""
+        with self._lock:
+            self._geracao += 1
+            self._cache.clear()
+        self._fila.put((nome, score))
+
+    def flush(self):
+        """Espera até que todos os placares agendados estejam no banco (ou até a thread escritora parar)."""
+        fila = self._fila
+        with fila.all_tasks_done:
+            # Espera em fatias para notar uma escritora morta em vez de travar a tela para sempre
+            while fila.unfinished_tasks and self._escritora.is_alive():
+                fila.all_tasks_done.wait(0.1)
+
+    def top(self, n=10):
+        """Os n maiores placares, [(nome, score)], do cache ou do banco."""
+        with self._lock:
+            if n in self._cache: return self._cache[n]
+            geracao = self._geracao
+        self.flush()
+        try:
+            with self._lock:
+                entries = self._leitura.execute(
+                    "SELECT nome, score FROM placares ORDER BY score DESC, id LIMIT ?;", (n,)).fetchall()
+                if geracao == self._geracao: self._cache[n] = entries
+        except sqlite3.Error as e:
+            print(f"Erro ao carregar placares do SQLite: {e}")
+            return []
+        return entries
+
+    def _consultar(self, sql, params=()):
+        self.flush()
+        try:
+            with self._lock:
+                return self._leitura.execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            print(f"Erro ao consultar placares no SQLite: {e}")
+            return []
+
+    def page(self, limit=10, after=None, periodo=None):
+        """
+        Uma página do ranking: [(id, nome, score)] em ordem de score (empate: quem
+        chegou primeiro). after é a chave (score, id) da última linha da página
+        anterior; periodo ("dia" ou "semana") restringe aos placares recentes.
+        """
+        condicoes, params = [], []
+        if periodo is not None:
+            condicoes.append("data_registro >= datetime('now', ?)"); params.append(PERIODOS[periodo])
+        if after is not None:
+            score, id_ = after
+            # score <= ? separado do desempate para o SQLite buscar direto no índice
+            condicoes.append("score <= ? AND (score < ? OR id > ?)"); params += [score, score, id_]
+        where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+        return self._consultar(
+            f"SELECT id, nome, score FROM placares {where} ORDER BY score DESC, id LIMIT ?;", params + [limit])
+
+    def _posicao(self, nome):
+        """(posição, id, score) de nome no ranking geral, ou None se ele não tiver placar."""
+        linha = self._consultar("SELECT id, score FROM placares WHERE nome = ?;", (nome,))
+        if not linha: return None
+        id_, score = linha[0]
+        acima = self._consultar(
+            "SELECT COUNT(*) FROM placares WHERE score >= ? AND (score > ? OR id < ?);", (score, score, id_))[0][0]
+        return acima + 1, id_, score
+
+    def rank(self, nome):
+        """
+        Posição (1 = primeiro) e score de nome no ranking geral, ou None se ele não tiver placar.
+        A contagem percorre só o índice de score (sem ler a tabela), acima do jogador.
+        """
+        posicao = self._posicao(nome)
+        return None if posicao is None else (posicao[0], posicao[2])
+
+    def around(self, nome, n=5):
+        """Até n placares acima e n abaixo de nome: [(posição, nome, score)], incluindo o próprio."""
+        posicao = self._posicao(nome)
+        if posicao is None: return []
+        pos, id_, score = posicao
+        acima = self._consultar(
+            "SELECT nome, score FROM placares WHERE score >= ? AND (score > ? OR id < ?) "
+            "ORDER BY score, id DESC LIMIT ?;", (score, score, id_, n))
+        abaixo = self.page(n, after=(score, id_))
+        linhas = [(nome_, s) for nome_, s in reversed(acima)] + [(nome, score)] + [(nome_, s) for _, nome_, s in abaixo]
+        primeira = pos - len(acima)
+        return [(primeira + i, nome_, s) for i, (nome_, s) in enumerate(linhas)]
+
+    def close(self):
+        """Grava o que estiver pendente e fecha as conexões."""
+        if self._escritora.is_alive():
+            self._fila.put(None)
+            self._escritora.join()
+        self._leitura.close()
+
+_store = None
+
+def score_store():
+    """ScoreStore compartilhado do jogo (criado no primeiro uso e fechado na saída do programa)."""
+    global _store
+    if _store is None:
+        _store = ScoreStore()
+        atexit.register(_store.close)
+    return _store
+
 def salvar_placar(nome, score):
     """
-    Salva um novo placar no banco de dados.
+    Salva um novo placar no banco de dados, sem bloquear o jogo (a gravação é feita em segundo plano).
     - Se o nome não existir, cria um novo registro.
     - Se o nome existir e o novo score for MAIOR, atualiza o score.
     """
-    conn = None
     try:
-        conn = sqlite3.connect(DATABASE_FILE)
-        cursor = conn.cursor()
-        
-        # Tenta inserir o novo placar
-        # Se houver um CONFLITO (nome já existe), ele tenta o "DO UPDATE"
-        # A condição "WHERE excluded.score > placares.score" garante
-        # que a atualização só ocorra se o novo score for maior.
-        
-        cursor.execute("""
-        INSERT INTO placares (nome, score, data_registro) 
-        VALUES (?, ?, CURRENT_TIMESTAMP)
-        ON CONFLICT(nome) DO UPDATE SET
-            score = excluded.score,
-            data_registro = CURRENT_TIMESTAMP
-        WHERE excluded.score > placares.score;
-        """, (nome, score))
-        
-        conn.commit()
-        
+        score_store().save(nome, score)
     except sqlite3.Error as e:
         print(f"Erro ao salvar/atualizar placar no SQLite: {e}")
-    finally:
-        if conn:
-            conn.close()
\ No newline at end of file
@@ -0,0 +1,236 @@
+"""
+Ambiente vetorizado do PacManNJ para treinar e avaliar jogadores automáticos.
+
+VecEnv avança K jogos independentes (HeadlessGame) numa chamada, no estilo
+dos ambientes vetorizados do gym: reset() e step(acoes), com uma ação por
+jogo. A observação de todos os jogos fica num único buffer uint8 alocado uma
+vez, com forma (K, CANAIS, linhas, colunas); a cada passo só as células que
+mudaram são reescritas (pontos comidos e entidades), e step() devolve sempre a
+mesma memoryview (numpy.asarray(obs) a usa sem cópia). Quem precisar guardar
+uma observação deve copiá-la antes do próximo passo.
+
+SubprocVecEnv tem a mesma interface, mas divide os jogos entre processos
+trabalhadores que escrevem direto no buffer em memória compartilhada; só as
+ações, recompensas e fins de jogo passam pelos pipes.
+
+Um jogo que termina (fim do jogo ou max_ticks) recomeça sozinho com a
+próxima seed: o jogo k no episódio e usa a seed base + k + e * K, nos dois
+backends, então a mesma seed e as mesmas ações dão os mesmos resultados.
+"""
+import random
+import multiprocessing
+from array import array
+from multiprocessing import shared_memory
+from config import ROWS, COLS, SUPER_MODE_DURATION
+from pathfinding import DIRECOES
+from maze_pool import _tamanho_real
+from simulation import HeadlessGame, DEFAULT_MAX_TICKS
+
+# Ação 0 = nenhuma tecla; 1..4 = DIRECOES (direita, esquerda, baixo, cima)
+ACOES = [None] + DIRECOES
+CANAL_LABIRINTO, CANAL_JOGADOR, CANAL_FANTASMAS, CANAL_VULNERAVEIS, CANAL_COMIDOS = range(5)
+CANAIS = 5
+
+def forma_observacao(n_envs):
+    """(K, CANAIS, linhas, colunas) das observações de n_envs jogos."""
+    return (n_envs, CANAIS) + _tamanho_real(ROWS, COLS)
+
+class _ActionController:
+    """Controlador do HeadlessGame que devolve a ação escolhida para o tick."""
+    def __init__(self):
+        self.direcao = None
+
+    def __call__(self, game):
+        return self.direcao
+
+class _Jogos:
+    """
+    Os jogos inicio..fim-1 de um ambiente com n_envs jogos, escrevendo as
+    observações em buf (o buffer inteiro, de todos os jogos). Usado pelo
+    VecEnv no próprio processo e por cada trabalhador do SubprocVecEnv.
+    """
+    def __init__(self, buf, n_envs, inicio, fim, max_ticks=DEFAULT_MAX_TICKS, ticks_por_passo=1, n_ghosts=4, swarm=False):
+        self.buf = buf
+        self.n_envs = n_envs
+        self.indices = range(inicio, fim)
+        self.max_ticks, self.ticks_por_passo = max_ticks, ticks_por_passo
+        self.opcoes = {"n_ghosts": n_ghosts, "swarm": swarm}
+        _, _, self.linhas, self.colunas = forma_observacao(n_envs)
+        self.area = self.linhas * self.colunas
+        self.games, self.controles, self.episodios = {}, {}, {}
+        self.marcadas = {k: [] for k in self.indices}  # Posições do buffer com entidades no último passo
+        self.base = 0
+
+    def _novo_jogo(self, k):
+        controle = self.controles[k] = _ActionController()
+        seed = self.base + k + self.episodios[k] * self.n_envs
+        game = self.games[k] = HeadlessGame(controller=controle, seed=seed, **self.opcoes)
+        inicio = k * CANAIS * self.area
+        self.buf[inicio:inicio + self.area] = game.maze.tobytes()
+        game.maze.pop_changes()
+        self._escrever_entidades(k)
+
+    def _escrever_entidades(self, k):
+        buf, colunas, area = self.buf, self.colunas, self.area
+        inicio = k * CANAIS * area
+        marcadas = self.marcadas[k]
+        for i in marcadas: buf[i] = 0
+        marcadas.clear()
+        game = self.games[k]
+        p = game.player
+        i = inicio + CANAL_JOGADOR * area + p.y * colunas + p.x
+        buf[i] = 1 + p.super_timer * 254 // SUPER_MODE_DURATION
+        marcadas.append(i)
+        for g in game.ghosts:
+            celula = inicio + g.y * colunas + g.x
+            estado = g.state
+            if estado == "vulnerable":
+                i = celula + CANAL_VULNERAVEIS * area
+                buf[i] = max(buf[i], 1 + max(g.vul_timer, 0) * 254 // SUPER_MODE_DURATION)
+            else:
+                i = celula + (CANAL_COMIDOS if estado == "eaten" else CANAL_FANTASMAS) * area
+                buf[i] = min(buf[i] + 1, 255)
+            marcadas.append(i)
+
+    def reset(self, base):
+        self.base = base
+        for k in self.indices:
+            self.episodios[k] = 0
+            self._novo_jogo(k)
+
+    def step(self, acoes):
+        """acoes: uma por jogo deste grupo. Retorna (recompensas, terminados, infos) do grupo."""
+        recompensas, terminados, infos = [], [], []
+        for k, acao in zip(self.indices, acoes):
+            game = self.games[k]
+            self.controles[k].direcao = ACOES[acao]
+            score = game.player.score
+            for _ in range(self.ticks_por_passo):
+                game.step()
+                if game.game_over: break
+            recompensas.append(game.player.score - score)
+            fim = game.game_over or game.ticks >= self.max_ticks
+            terminados.append(fim)
+            if fim:
+                infos.append({"seed": game.seed, "score": game.player.score, "ticks": game.ticks,
+                              "win": game.win, "truncado": not game.game_over})
+                self.episodios[k] += 1
+                self._novo_jogo(k)
+            else:
+                infos.append(None)
+                inicio = k * CANAIS * self.area
+                maze = game.maze
+                for x, y in maze.pop_changes(): self.buf[inicio + y * self.colunas + x] = maze[y][x]
+                self._escrever_entidades(k)
+        return recompensas, terminados, infos
+
+class VecEnv:
+    """K jogos independentes no processo atual, com observações num buffer preparado uma vez."""
+    def __init__(self, n_envs, max_ticks=DEFAULT_MAX_TICKS, ticks_por_passo=1, n_ghosts=4, swarm=False):
+        self.n_envs = n_envs
+        self.observation_shape = forma_observacao(n_envs)
+        self._opcoes = dict(max_ticks=max_ticks, ticks_por_passo=ticks_por_passo, n_ghosts=n_ghosts, swarm=swarm)
+        self.recompensas = array('d', [0.0]) * n_envs
+        self.terminados = bytearray(n_envs)
+        self._abrir_buffer()
+
+    def _tamanho_buffer(self):
+        n = 1
+        for d in self.observation_shape: n *= d
+        return n
+
+    def _abrir_buffer(self):
+        self._buf = bytearray(self._tamanho_buffer())
+        self.obs = memoryview(self._buf).cast('B', self.observation_shape)
+        self._jogos = _Jogos(self._buf, self.n_envs, 0, self.n_envs, **self._opcoes)
+
+    def reset(self, seed=None):
+        """Recomeça todos os jogos (o jogo k com a seed seed + k) e retorna as observações."""
+        self._jogos.reset(random.randrange(2**62) if seed is None else seed)
+        return self.obs
+
+    def _step(self, acoes):
+        return self._jogos.step(acoes)
+
+    def step(self, acoes):
+        """
+        Aplica uma ação (índice de ACOES) em cada jogo. Retorna (obs, recompensas,
+        terminados, infos): recompensa = pontos ganhos no passo; info é None ou,
+        quando o jogo terminou e recomeçou, o resultado do episódio que acabou.
+        """
+        if len(acoes) != self.n_envs: raise ValueError(f"Esperava {self.n_envs} ações, recebeu {len(acoes)}")
+        recompensas, terminados, infos = self._step(acoes)
+        self.recompensas[:] = array('d', recompensas)
+        self.terminados[:] = bytes(terminados)
+        return self.obs, self.recompensas, self.terminados, infos
+
+    def close(self):
+        self.obs.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _trabalhador(conexao, nome_memoria, n_envs, inicio, fim, opcoes):
+    memoria = shared_memory.SharedMemory(name=nome_memoria)
+    jogos = _Jogos(memoria.buf, n_envs, inicio, fim, **opcoes)
+    try:
+        while True:
+            comando, dados = conexao.recv()
+            if comando == "reset": jogos.reset(dados); conexao.send(None)
+            elif comando == "step": conexao.send(jogos.step(dados))
+            else: break
+    finally:
+        del jogos
+        memoria.close()
+
+class SubprocVecEnv(VecEnv):
+    """VecEnv com os jogos divididos entre processos que escrevem as observações em memória compartilhada."""
+    def __init__(self, n_envs, processos=None, max_ticks=DEFAULT_MAX_TICKS, ticks_por_passo=1, n_ghosts=4, swarm=False):
+        self.processos = min(processos or multiprocessing.cpu_count(), n_envs)
+        super().__init__(n_envs, max_ticks, ticks_por_passo, n_ghosts, swarm)
+
+    def _abrir_buffer(self):
+        tamanho = self._tamanho_buffer()
+        self._memoria = shared_memory.SharedMemory(create=True, size=tamanho)
+        self._plano = self._memoria.buf[:tamanho]
+        self.obs = self._plano.cast('B', self.observation_shape)
+        self._grupos, self._conexoes, self._workers = [], [], []
+        for w in range(self.processos):
+            inicio, fim = w * self.n_envs // self.processos, (w + 1) * self.n_envs // self.processos
+            nossa, deles = multiprocessing.Pipe()
+            worker = multiprocessing.Process(
+                target=_trabalhador, args=(deles, self._memoria.name, self.n_envs, inicio, fim, self._opcoes),
+                name=f"VecEnv-{w}", daemon=True)
+            worker.start()
+            self._grupos.append((inicio, fim)); self._conexoes.append(nossa); self._workers.append(worker)
+
+    def reset(self, seed=None):
+        base = random.randrange(2**62) if seed is None else seed
+        for conexao in self._conexoes: conexao.send(("reset", base))
+        for conexao in self._conexoes: conexao.recv()
+        return self.obs
+
+    def _step(self, acoes):
+        # Manda as ações de todos os grupos antes de esperar: os processos trabalham ao mesmo tempo
+        for conexao, (inicio, fim) in zip(self._conexoes, self._grupos):
+            conexao.send(("step", list(acoes[inicio:fim])))
+        recompensas, terminados, infos = [], [], []
+        for conexao in self._conexoes:
+            r, t, i = conexao.recv()
+            recompensas += r; terminados += t; infos += i
+        return recompensas, terminados, infos
+
+    def close(self):
+        if self._memoria is None: return
+        for conexao in self._conexoes:
+            try: conexao.send(("close", None))
+            except (BrokenPipeError, OSError): pass
+        for worker in self._workers: worker.join(timeout=5)
+        super().close()
+        self._plano.release()
+        self._memoria.close()
+        self._memoria.unlink()
+        self._memoria = None